@@ -3,19 +3,22 @@ Script principal de ventas-plus.
 Este script procesa datos de ventas a partir de un archivo Excel comprimido en ZIP.
 """
 import os
-import sys
 import pandas as pd
 from datetime import datetime, timedelta
 import argparse
-import subprocess
 from ventas_plus.core_logic import (
-    process_zipped_sales_excel,
     process_sales_data,
     analyze_sales_data_basic,
     analyze_sales_data_detailed,
-    verify_invoice_consistency
+    verify_invoice_consistency,
+    verify_invoice_consistency_range
 )
 from ventas_plus.comparison import compare_siat_with_inventory
+from ventas_plus.importar_verificacion_contabilidad import main_import
+from ventas_plus.siat_cache import get_cache_dir, load_processed_sales
+from ventas_plus.data_ingestion import iter_zipped_sales_excel_chunks
+from ventas_plus.ventas_processing import analyze_sales_chunks
+from ventas_plus.branch_rules import BRANCH_RULES
 
 def get_month_year_input(month=None, year=None):
     """
@@ -74,7 +77,46 @@ def get_month_year_input(month=None, year=None):
                 
     return month, year
 
-def process_sales_data_basic(project_root, month=None, year=None):
+def process_sales_in_chunks(zip_file_path, output_file, chunksize):
+    """
+    Procesa el ZIP del SIAT por bloques, escribiendo el CSV de salida a medida que se leen.
+    
+    Args:
+        zip_file_path (str): Ruta al archivo ZIP del SIAT
+        output_file (str): Ruta del CSV de datos procesados
+        chunksize (int): Cantidad de filas por bloque
+        
+    Returns:
+        tuple: (muestra de datos, total de filas, columnas, análisis básico, análisis detallado),
+        o None si no se encontraron datos
+    """
+    state = {'sample': None, 'rows': 0, 'columns': None}
+    
+    def processed_chunks():
+        for chunk in iter_zipped_sales_excel_chunks(zip_file_path, sheet_name="hoja1", chunksize=chunksize):
+            processed = process_sales_data(chunk)
+            if processed.empty:
+                continue
+            first = state['sample'] is None
+            if first:
+                state['sample'] = processed.head()
+                state['columns'] = list(processed.columns)
+            processed.to_csv(output_file, index=False, mode='w' if first else 'a', header=first)
+            state['rows'] += len(processed)
+            print(f"\rFilas procesadas: {state['rows']:,}", end='', flush=True)
+            yield processed
+    
+    try:
+        results, detailed_results = analyze_sales_chunks(processed_chunks())
+    except Exception as e:
+        print(f"\nError al procesar el archivo ZIP por bloques: {e}")
+        return None
+    print()
+    if results is None:
+        return None
+    return state['sample'], state['rows'], state['columns'], results, detailed_results
+
+def process_sales_data_basic(project_root, month=None, year=None, use_cache=True, chunksize=None, excel_engine=None):
     """
     Procesa datos básicos de ventas desde un archivo ZIP.
     
@@ -82,6 +124,10 @@ def process_sales_data_basic(project_root, month=None, year=None):
         project_root (str): Directorio raíz del proyecto
         month (str, optional): Mes a procesar en formato '01', '02', etc.
         year (int, optional): Año a procesar
+        use_cache (bool): Si es True, reutiliza la caché de meses ya procesados
+        chunksize (int, optional): Si se indica, lee y analiza el Excel por bloques
+            de esa cantidad de filas para acotar el uso de memoria
+        excel_engine (str, optional): Motor de lectura del Excel ("openpyxl", "calamine" o "auto")
     """
     print("\n--- Procesando datos de ventas ---")
     
@@ -103,131 +149,125 @@ def process_sales_data_basic(project_root, month=None, year=None):
         print(f"2. El archivo {zip_file_name} está en la carpeta del año")
         return
     
-    # Procesar el archivo ZIP y obtener los datos de ventas
+    # Procesar el archivo ZIP (o reutilizar la caché) y obtener los datos de ventas
     print(f"Leyendo datos de ventas del mes: {month} y año: {year}")
     print(f"Archivo: {zip_file_path}")
-    sales_data = process_zipped_sales_excel(zip_file_path, sheet_name="hoja1")
     
-    if sales_data is not None and not sales_data.empty:
-        # Definir directorio de salida
-        output_dir = os.path.join(project_root, "data", "output")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        print(f"Recuperados con éxito {len(sales_data)} registros de ventas.")
-        print("Procesando datos de ventas...")
-        
-        # Procesar los datos de ventas
-        df_processed = process_sales_data(sales_data)
-        
-        # Mostrar información básica del DataFrame
-        print("\n=== INFORMACIÓN DEL DATAFRAME ===")
-        print(f"Filas: {df_processed.shape[0]}, Columnas: {df_processed.shape[1]}")
-        print("\nColumnas disponibles:")
-        for col in df_processed.columns:
-            print(f"  • {col}")
-        
-        # Mostrar muestra de los datos
-        print("\n=== MUESTRA DE DATOS (5 primeros registros) ===")
-        pd.set_option('display.max_columns', None)  # Mostrar todas las columnas
-        pd.set_option('display.width', None)        # Ancho automático
-        print(df_processed.head())
-        
-        # Realizar análisis básico
+    # Definir directorio de salida
+    output_dir = os.path.join(project_root, "data", "output")
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, f"ventas_procesadas_{month}_{year}.csv")
+    
+    if chunksize:
+        streamed = process_sales_in_chunks(zip_file_path, output_file, chunksize)
+        if streamed is None:
+            print("No se encontraron datos de ventas o hubo un error al procesar el archivo ZIP.")
+            return
+        df_sample, total_rows, columns, results, detailed_results = streamed
+    else:
+        df_processed = load_processed_sales(zip_file_path, cache_dir=get_cache_dir(project_root) if use_cache else None, sheet_name="hoja1", engine=excel_engine)
+        if df_processed is None or df_processed.empty:
+            print("No se encontraron datos de ventas o hubo un error al procesar el archivo ZIP.")
+            return
+        df_sample = df_processed.head()
+        total_rows = len(df_processed)
+        columns = list(df_processed.columns)
+        # Realizar análisis básico y detallado
         results = analyze_sales_data_basic(df_processed)
-        
-        # Mostrar resultados básicos
-        print("\n=== ANÁLISIS BÁSICO ===")
-        if 'total_ventas' in results:
-            print(f"Total de ventas: {results['total_ventas']:,.2f}")
-        if 'promedio_venta' in results:
-            print(f"Promedio por venta: {results['promedio_venta']:,.2f}")
-        if 'conteo_estados' in results:
-            print("\nDistribución por estado:")
-            for estado, conteo in results['conteo_estados'].items():
-                print(f"  • {estado}: {conteo}")
-        
-        # Mostrar información de las columnas extraídas del código de autorización
-        if 'conteo_sucursales' in results:
-            print("\nDistribución por sucursal:")
-            for sucursal, conteo in results['conteo_sucursales'].items():
-                if sucursal:  # Solo mostrar si hay un valor
-                    print(f"  • {sucursal}: {conteo}")
-        
-        if 'conteo_tipo_emision' in results:
-            print("\nDistribución por tipo de emisión:")
-            for tipo, conteo in results['conteo_tipo_emision'].items():
-                if tipo:  # Solo mostrar si hay un valor
-                    print(f"  • {tipo}: {conteo}")
-        
-        if 'conteo_sector' in results:
-            print("\nDistribución por sector:")
-            for sector, conteo in results['conteo_sector'].items():
-                if sector:  # Solo mostrar si hay un valor
-                    print(f"  • {sector}: {conteo}")
-        
-        # Realizar análisis detallado
         detailed_results = analyze_sales_data_detailed(df_processed)
+    
+    print(f"Recuperados con éxito {total_rows} registros de ventas.")
+    
+    # Mostrar información básica del DataFrame
+    print("\n=== INFORMACIÓN DEL DATAFRAME ===")
+    print(f"Filas: {total_rows}, Columnas: {len(columns)}")
+    print("\nColumnas disponibles:")
+    for col in columns:
+        print(f"  • {col}")
+    
+    # Mostrar muestra de los datos
+    print("\n=== MUESTRA DE DATOS (5 primeros registros) ===")
+    pd.set_option('display.max_columns', None)  # Mostrar todas las columnas
+    pd.set_option('display.width', None)        # Ancho automático
+    print(df_sample)
+    
+    # Mostrar resultados básicos
+    print("\n=== ANÁLISIS BÁSICO ===")
+    if 'total_ventas' in results:
+        print(f"Total de ventas: {results['total_ventas']:,.2f}")
+    if 'promedio_venta' in results:
+        print(f"Promedio por venta: {results['promedio_venta']:,.2f}")
+    if 'conteo_estados' in results:
+        print("\nDistribución por estado:")
+        for estado, conteo in results['conteo_estados'].items():
+            print(f"  • {estado}: {conteo}")
+    
+    # Mostrar información de las columnas extraídas del código de autorización
+    if 'conteo_sucursales' in results:
+        print("\nDistribución por sucursal:")
+        for sucursal, conteo in results['conteo_sucursales'].items():
+            if sucursal:  # Solo mostrar si hay un valor
+                print(f"  • {sucursal}: {conteo}")
+    
+    if 'conteo_tipo_emision' in results:
+        print("\nDistribución por tipo de emisión:")
+        for tipo, conteo in results['conteo_tipo_emision'].items():
+            if tipo:  # Solo mostrar si hay un valor
+                print(f"  • {tipo}: {conteo}")
+    
+    if 'conteo_sector' in results:
+        print("\nDistribución por sector:")
+        for sector, conteo in results['conteo_sector'].items():
+            if sector:  # Solo mostrar si hay un valor
+                print(f"  • {sector}: {conteo}")
+    
+    # Mostrar el análisis detallado
+    print("\n\n=== ANÁLISIS DETALLADO DE VENTAS ===")
+    
+    # Análisis de Alquileres
+    if 'alquileres' in detailed_results:
+        alq = detailed_results['alquileres']
+        print("\n--- ALQUILERES (SECTOR 02) ---")
+        print(f"Total facturado en alquileres: {alq['total_facturado']:,.2f}")
+        print(f"Cantidad de facturas válidas: {alq['cantidad_validas']}")
+        print(f"Cantidad de facturas anuladas: {alq['cantidad_anuladas']}")
+    
+    # Análisis General
+    if 'general' in detailed_results:
+        general = detailed_results['general']
+        print("\n--- FACTURACIÓN GENERAL ---")
+        print(f"Total facturado (estado VALIDA): {general['total_facturado_valida']:,.2f}")
+        print(f"Total facturado sin alquileres: {general['total_facturado_sin_alquiler']:,.2f}")
+        print(f"Cantidad de facturas válidas: {general['cantidad_validas']}")
+        print(f"Cantidad de facturas anuladas: {general['cantidad_anuladas']}")
+    
+    # Análisis por sucursal (según las reglas de branch_rules)
+    for rule in BRANCH_RULES:
+        if rule['clave'] not in detailed_results:
+            continue
+        sucursal = detailed_results[rule['clave']]
+        print(f"\n--- {rule['titulo']} (SUCURSAL {rule['sucursal']}) ---")
+        print(f"Total facturado: {sucursal['total_facturado']:,.2f}")
+        for campo, etiqueta in rule['sectores'].values():
+            if etiqueta:
+                print(f"Cantidad de facturas válidas ({etiqueta}): {sucursal[campo]}")
+            else:
+                print(f"Cantidad de facturas válidas: {sucursal[campo]}")
+        print(f"Cantidad de facturas anuladas: {sucursal['cantidad_anuladas']}")
+    
+    # Resumen total de facturas
+    if 'total_facturas_desglosado' in detailed_results:
+        print("\n--- RESUMEN TOTAL DE FACTURAS ---")
+        print(f"Total de facturas (desglosado): {detailed_results['total_facturas_desglosado']}")
+        print(f"Total de facturas (general): {detailed_results['general']['total_facturas']}")
         
-        # Mostrar el análisis detallado
-        print("\n\n=== ANÁLISIS DETALLADO DE VENTAS ===")
-        
-        # Análisis de Alquileres
-        if 'alquileres' in detailed_results:
-            alq = detailed_results['alquileres']
-            print("\n--- ALQUILERES (SECTOR 02) ---")
-            print(f"Total facturado en alquileres: {alq['total_facturado']:,.2f}")
-            print(f"Cantidad de facturas válidas: {alq['cantidad_validas']}")
-            print(f"Cantidad de facturas anuladas: {alq['cantidad_anuladas']}")
-        
-        # Análisis General
-        if 'general' in detailed_results:
-            general = detailed_results['general']
-            print("\n--- FACTURACIÓN GENERAL ---")
-            print(f"Total facturado (estado VALIDA): {general['total_facturado_valida']:,.2f}")
-            print(f"Total facturado sin alquileres: {general['total_facturado_sin_alquiler']:,.2f}")
-            print(f"Cantidad de facturas válidas: {general['cantidad_validas']}")
-            print(f"Cantidad de facturas anuladas: {general['cantidad_anuladas']}")
-        
-        # Análisis Central (La Paz)
-        if 'central' in detailed_results:
-            central = detailed_results['central']
-            print("\n--- CENTRAL LA PAZ (SUCURSAL 0000) ---")
-            print(f"Total facturado: {central['total_facturado']:,.2f}")
-            print(f"Cantidad de facturas válidas (CV - Sector 01): {central['cantidad_validas_cv']}")
-            print(f"Cantidad de facturas válidas (CVB - Sector 35): {central['cantidad_validas_cvb']}")
-            print(f"Cantidad de facturas anuladas: {central['cantidad_anuladas']}")
-        
-        # Análisis Potosí
-        if 'potosi' in detailed_results:
-            potosi = detailed_results['potosi']
-            print("\n--- POTOSÍ (SUCURSAL 0006) ---")
-            print(f"Total facturado: {potosi['total_facturado']:,.2f}")
-            print(f"Cantidad de facturas válidas: {potosi['cantidad_validas']}")
-            print(f"Cantidad de facturas anuladas: {potosi['cantidad_anuladas']}")
-        
-        # Análisis Santa Cruz
-        if 'santa_cruz' in detailed_results:
-            scz = detailed_results['santa_cruz']
-            print("\n--- SANTA CRUZ (SUCURSAL 0005) ---")
-            print(f"Total facturado: {scz['total_facturado']:,.2f}")
-            print(f"Cantidad de facturas válidas: {scz['cantidad_validas']}")
-            print(f"Cantidad de facturas anuladas: {scz['cantidad_anuladas']}")
-        
-        # Resumen total de facturas
-        if 'total_facturas_desglosado' in detailed_results:
-            print("\n--- RESUMEN TOTAL DE FACTURAS ---")
-            print(f"Total de facturas (desglosado): {detailed_results['total_facturas_desglosado']}")
-            print(f"Total de facturas (general): {detailed_results['general']['total_facturas']}")
-            
-        # Guardar una copia del DataFrame procesado para uso futuro
-        output_file = os.path.join(output_dir, f"ventas_procesadas_{month}_{year}.csv")
+    # Guardar una copia del DataFrame procesado para uso futuro
+    # (en modo por bloques el archivo ya se escribió durante la lectura)
+    if not chunksize:
         df_processed.to_csv(output_file, index=False)
-        print(f"\nDatos procesados guardados en: {output_file}")
-        
-    else:
-        print("No se encontraron datos de ventas o hubo un error al procesar el archivo ZIP.")
+    print(f"\nDatos procesados guardados en: {output_file}")
 
-def verify_invoices_consistency(project_root, month=None, year=None):
+def verify_invoices_consistency(project_root, month=None, year=None, use_cache=True, excel_engine=None, to_month=None, refresh=False, concurrent=False, export_verification_csv=True):
     """
     Verifica la consistencia entre las facturas del SIAT y el sistema de inventarios.
     
@@ -235,6 +275,20 @@ def verify_invoices_consistency(project_root, month=None, year=None):
         project_root (str): Directorio raíz del proyecto
         month (str, optional): Mes a procesar en formato '01', '02', etc.
         year (int, optional): Año a procesar
+        use_cache (bool): Si es True, reutiliza la caché de meses ya procesados
+        excel_engine (str, optional): Motor de lectura del Excel del SIAT
+        to_month (str, optional): Último mes del periodo (mismo año); el
+            inventario de todos los meses se consulta una sola vez
+        refresh (bool): Si es True, recarga completo el inventario del mes
+            en lugar de actualizar la instantánea local
+        concurrent (bool): Si es True, consulta el inventario mientras se
+            procesa el Excel del SIAT
+        export_verification_csv (bool): Si es False, no se escribe el CSV
+            de verificación completa
+
+    Returns:
+        dict: Resultados de la verificación del mes (None si no se pudo
+        verificar o si se verificó un rango de meses)
     """
     # Obtener mes y año a través de entrada interactiva si no se proporcionan
     month, year = get_month_year_input(month, year)
@@ -249,7 +303,20 @@ def verify_invoices_consistency(project_root, month=None, year=None):
         return
         
     # Ejecutar la verificación de consistencia
-    verify_invoice_consistency(project_root, config_file_path, month, year)
+    if to_month:
+        if int(to_month) < int(month):
+            print(f"\nError: el mes final ({int(to_month):02d}) es anterior al mes inicial ({int(month):02d}).")
+            return
+        verify_invoice_consistency_range(
+            project_root, config_file_path, (year, int(month)), (year, int(to_month)),
+            use_cache=use_cache, excel_engine=excel_engine
+        )
+        return
+    return verify_invoice_consistency(
+        project_root, config_file_path, month, year,
+        use_cache=use_cache, excel_engine=excel_engine, refresh_inventory=refresh,
+        concurrent=concurrent, export_verification_csv=export_verification_csv
+    )
 
 if __name__ == "__main__":
     print("""
@@ -264,43 +331,79 @@ if __name__ == "__main__":
     parser.add_argument('-y', '--year', help='Año a procesar (ej. 2025)', default=None)
     parser.add_argument('-v', '--verify', action='store_true', help='Verificar consistencia con sistema de inventarios')
     parser.add_argument('--upload-contable', action='store_true', help='Ofrecer subir los datos verificados a la base contable después de la verificación')
+    parser.add_argument('--no-csv', action='store_true',
+                        help='Con --upload-contable: no escribir verificacion_completa_MM_AAAA.csv; los datos pasan en memoria a la importación')
+    parser.add_argument('--no-cache', action='store_true', help='No usar la caché de meses SIAT ya procesados ni la instantánea del inventario')
+    parser.add_argument('--refresh', action='store_true', help='Con -v: recargar completo el inventario del mes en lugar de actualizar la instantánea local')
+    parser.add_argument('--chunksize', type=int, default=None, help='Leer y analizar el Excel por bloques de N filas para acotar el uso de memoria')
+    parser.add_argument('--excel-engine', choices=['openpyxl', 'calamine', 'auto'], default=None,
+                        help='Motor para leer el Excel del SIAT (por defecto VENTAS_EXCEL_ENGINE u openpyxl)')
+    parser.add_argument('--concurrent', action='store_true',
+                        help='Con -v: consultar el inventario en segundo plano mientras se procesa el Excel del SIAT')
+    parser.add_argument('--to-month', default=None,
+                        help='Con -v: verificar desde --month hasta este mes del mismo año con una sola consulta al inventario')
     args = parser.parse_args()
+    if args.to_month:
+        try:
+            to_month = int(args.to_month)
+        except ValueError:
+            parser.error("--to-month debe ser un mes entre 1 y 12")
+        if not 1 <= to_month <= 12:
+            parser.error("--to-month debe ser un mes entre 1 y 12")
+        if args.month and args.month.isdigit() and to_month < int(args.month):
+            parser.error(f"--to-month ({to_month:02d}) no puede ser anterior a --month ({int(args.month):02d})")
+        if args.refresh or args.concurrent:
+            parser.error("--refresh y --concurrent no se pueden combinar con --to-month")
 
     project_root = os.path.dirname(os.path.abspath(__file__))
 
     # Procesamiento y verificación
     if args.verify:
-        verify_invoices_consistency(
+        results = verify_invoices_consistency(
             project_root,
             args.month,
-            args.year
+            args.year,
+            use_cache=not args.no_cache,
+            excel_engine=args.excel_engine,
+            to_month=args.to_month,
+            refresh=args.refresh,
+            concurrent=args.concurrent,
+            export_verification_csv=not (args.no_csv and args.upload_contable)
         )
         # --- Subida condicional a contable ---
-        if args.upload_contable:
+        if args.upload_contable and args.to_month:
+            print("\nLa subida a la base contable se hace mes a mes; ejecútala sin --to-month.")
+        elif args.upload_contable:
             # Determinar mes y año (pueden venir como None)
             month, year = get_month_year_input(args.month, args.year)
-            # Archivo de verificación esperado
+            # Verificación en memoria; si no está, el archivo de verificación esperado
+            verif_df = (results or {}).get('verificacion_completa')
+            if not isinstance(verif_df, pd.DataFrame) or verif_df.empty:
+                verif_df = None
             verif_file = os.path.join(project_root, "data", "output", f"verificacion_completa_{int(month):02d}_{year}.csv")
-            if not os.path.exists(verif_file):
+            if verif_df is None and not os.path.exists(verif_file):
                 print(f"\nNo se encontró el archivo de verificación: {verif_file}\nNo se puede subir a la base contable.")
             else:
+                if verif_df is None:
+                    modified = datetime.fromtimestamp(os.path.getmtime(verif_file))
+                    print(f"\nAtención: la verificación no quedó en memoria; se importará el archivo {verif_file}")
+                    print(f"   (modificado el {modified:%d/%m/%Y %H:%M:%S}). Revisa que corresponda a esta verificación.")
                 respuesta = input(f"\n¿Deseas subir los datos verificados a la base contable? (s/N): ").strip().lower()
                 if respuesta == 's':
-                    # Llama al script de importación con los mismos mes y año
+                    # Importación en este mismo proceso, con la verificación en memoria
                     print("Ejecutando importación a la base contable...")
-                    subprocess.run([
-                        sys.executable,
-                        os.path.join(project_root, "ventas_plus", "importar_verificacion_contabilidad.py"),
-                        str(int(month)),
-                        str(int(year))
-                    ])
+                    if not main_import(int(month), int(year), verification_df=verif_df):
+                        print("La importación a la base contable no se completó.")
                 else:
                     print("No se subieron los datos a la base contable.")
     else:
         process_sales_data_basic(
             project_root,
             args.month,
-            args.year
+            args.year,
+            use_cache=not args.no_cache,
+            chunksize=args.chunksize,
+            excel_engine=args.excel_engine
         )
 
     print("\n--- Ventas-Plus: Procesamiento Finalizado ---")
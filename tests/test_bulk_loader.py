@@ -0,0 +1,110 @@
+from datetime import date
+
+import pytest
+
+from ventas_plus.bulk_loader import (
+    LocalInfileUnavailable,
+    bulk_insert,
+    load_data_local_infile,
+    multi_row_insert_sql,
+)
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params):
+        if self.conn.fail_at is not None and len(self.conn.statements) == self.conn.fail_at:
+            raise RuntimeError('paquete rechazado')
+        self.conn.statements.append((sql, list(params)))
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self, fail_at=None):
+        self.statements = []
+        self.commits = 0
+        self.fail_at = fail_at
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_multi_row_insert_sql():
+    assert multi_row_insert_sql('t', ['a', 'b'], 2) == 'INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'
+
+
+def test_rows_are_sent_in_batches_and_committed_per_batch():
+    conn = _Connection()
+    filas = ((i, f'f{i}') for i in range(5))
+    assert bulk_insert(conn, 't', ['a', 'b'], filas, batch_size=2, commit_mode='batch', total=5) == 5
+    assert [len(params) for _, params in conn.statements] == [4, 4, 2]
+    assert conn.statements[-1][1] == [4, 'f4']
+    assert conn.commits == 3
+
+
+def test_commit_per_run_by_default_and_resume():
+    conn = _Connection()
+    assert bulk_insert(conn, 't', ['a'], [(i,) for i in range(5)], batch_size=2, start_row=3) == 2
+    assert conn.statements[0][1] == [3, 4]
+    assert conn.commits == 1
+
+
+def test_error_reports_committed_rows():
+    conn = _Connection(fail_at=1)
+    with pytest.raises(RuntimeError) as error:
+        bulk_insert(conn, 't', ['a'], [(i,) for i in range(5)], batch_size=2, commit_mode='batch')
+    assert error.value.committed_rows == 2
+
+
+class _InfileCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        if sql.startswith('LOAD DATA'):
+            if self.conn.error is not None:
+                raise self.conn.error
+            with open(params[0], encoding='utf-8') as f:
+                self.conn.loaded = f.read()
+            self.conn.sql = sql
+            self.rowcount = self.conn.loaded.count('\n')
+
+    def fetchall(self):
+        return [('Warning', 1265, "Data truncated for column 'a' at row 1")]
+
+    def close(self):
+        pass
+
+
+class _InfileConnection(_Connection):
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+
+    def cursor(self):
+        return _InfileCursor(self)
+
+
+def test_load_data_local_infile_writes_escaped_rows_in_column_order():
+    conn = _InfileConnection()
+    filas = [(1, 'a\tb', None), (2, 'c\\d', date(2025, 1, 31))]
+    written, loaded, warnings = load_data_local_infile(conn, 't', ['a', 'b', 'c'], filas)
+    assert (written, loaded, len(warnings)) == (2, 2, 1)
+    assert conn.loaded == '1\ta\\tb\t\\N\n2\tc\\\\d\t2025-01-31\n'
+    assert conn.sql.endswith('(a, b, c)')
+    assert conn.commits == 1
+
+
+def test_load_data_local_infile_unavailable():
+    error = RuntimeError('Loading local data is disabled')
+    error.errno = 3948
+    with pytest.raises(LocalInfileUnavailable):
+        load_data_local_infile(_InfileConnection(error), 't', ['a'], [(1,)])
@@ -0,0 +1,135 @@
+import pandas as pd
+
+import numpy as np
+
+from ventas_plus.comparison import AUTH_KEY, _values_differ, compare_siat_with_inventory, partition_by_authorization
+
+
+def _siat(rows):
+    df = pd.DataFrame(rows, columns=[
+        'CODIGO DE AUTORIZACIÓN', 'FECHA DE LA FACTURA', 'Nº DE LA FACTURA', 'NIT / CI CLIENTE',
+        'NOMBRE O RAZON SOCIAL', 'IMPORTE TOTAL DE LA VENTA', 'ESTADO', 'SUCURSAL', 'SECTOR',
+    ])
+    df['Nº DE LA FACTURA'] = df['Nº DE LA FACTURA'].astype('Int64')
+    return df
+
+
+def _inventario(rows):
+    return pd.DataFrame(rows, columns=[
+        'autorizacion', 'fechaFac', 'nFactura', 'nit', 'razonSocial', 'importeTotal', 'estado', 'codigoSucursal',
+    ])
+
+
+def test_matched_invoice_without_number_in_siat():
+    siat = _siat([
+        ('AAA', '01/01/2025', None, '123', 'X', 10.0, 'VALIDA', '0000', '01'),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.0, 'VALIDA', '0005', '01'),
+    ])
+    inventario = _inventario([
+        ('AAA', '01/01/2025', 1, '123', 'X', 10.0, 'V', 0),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.0, 'V', 5),
+    ])
+    results = compare_siat_with_inventory(siat, inventario)
+    assert results['matching_invoices'] == 2
+    assert [d['autorizacion'] for d in results['field_discrepancies']] == ['AAA']
+    verificacion = results['verificacion_completa'].set_index('autorizacion')
+    assert verificacion.loc['AAA', 'OBSERVACIONES'] == 'Nº Factura: SIAT=, INV=1'
+    assert verificacion.loc['BBB', 'OBSERVACIONES'] == ''
+
+
+def test_field_discrepancies_are_listed_in_order():
+    siat = _siat([
+        ('AAA', '01/01/2025', 10, '123', 'X', 10.0, 'VALIDA', '0000', '01'),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.0, 'VALIDA', '0005', '02'),
+        ('CCC', '03/01/2025', 3, '789', 'Z', 30.0, 'ANULADA', '0006', '01'),
+    ])
+    inventario = _inventario([
+        ('AAA', '05/01/2025', '010', '123.0', 'X', 15.5, 'A', 5),
+        ('BBB', '02/01/2025', 9, '456', 'Y', 99.0, 'V', 5),
+        ('CCC', '03/01/2025', 3, '789', 'Z', 30.005, 'A', '0006'),
+        ('DDD', '04/01/2025', 4, '000', 'W', 40.0, 'V', 0),
+    ])
+    verificacion = compare_siat_with_inventory(siat, inventario)['verificacion_completa'].set_index('autorizacion')
+    assert verificacion.loc['AAA', 'OBSERVACIONES'] == (
+        "Sucursal: SIAT=0, INV=5; Fecha: SIAT=01/01/2025, INV=05/01/2025; "
+        "Importe: SIAT=10.0, INV=15.5; Estado: SIAT=VALIDA, INV=ANULADA"
+    )
+    # Los alquileres no se comparan campo a campo
+    assert verificacion.loc['BBB', 'OBSERVACIONES'] == 'Factura de alquiler (SECTOR 02)'
+    assert verificacion.loc['CCC', 'OBSERVACIONES'] == ''
+    # Las facturas que solo están en inventario no forman parte de la verificación completa
+    assert 'DDD' not in verificacion.index
+
+
+def test_invoice_numbers_are_reported_as_integers():
+    siat = _siat([('AAA', '01/01/2025', 3, '123', 'X', 10.0, 'VALIDA', '0000', '01')])
+    inventario = _inventario([('AAA', '01/01/2025', 4, '123', 'X', 12.0, 'V', 0)])
+    results = compare_siat_with_inventory(siat, inventario)
+    assert results['field_discrepancies'] == [
+        {'autorizacion': 'AAA', 'observaciones': 'Nº Factura: SIAT=3, INV=4; Importe: SIAT=10.0, INV=12.0'}
+    ]
+    detalle = results['amount_difference_details'][0]
+    assert (detalle['nfactura_siat'], detalle['nfactura_inv']) == (3, 4)
+    assert str(detalle['nfactura_siat']) == '3'
+
+
+def test_missing_in_inventory_is_tagged_after_rental():
+    siat = _siat([
+        ('AAA', '01/01/2025', 1, '123', 'X', 10.0, 'VALIDA', '0000', '02'),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.0, 'VALIDA', '0005', '01'),
+    ])
+    inventario = _inventario([('CCC', '03/01/2025', 3, '789', 'Z', 30.0, 'V', 6)])
+    verificacion = compare_siat_with_inventory(siat, inventario)['verificacion_completa']
+    assert verificacion.set_index('CODIGO DE AUTORIZACIÓN')['OBSERVACIONES'].to_dict() == {
+        'AAA': 'Factura de alquiler (SECTOR 02); No existe en inventarios',
+        'BBB': 'No existe en inventarios',
+    }
+
+
+def test_values_differ_like_row_comparison():
+    izquierda = pd.Series(['a', None, np.nan, 'b', None, 1.0], dtype=object)
+    derecha = pd.Series(['a', None, np.nan, 'c', np.nan, 1], dtype=object)
+    assert _values_differ(izquierda, derecha).tolist() == [a != b for a, b in zip(izquierda, derecha)]
+
+
+def test_matched_amount_differences_are_reported_once():
+    siat = _siat([
+        ('AAA', '01/01/2025', 1, '123', 'X', 10.0, 'VALIDA', '0000', '01'),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.0, 'VALIDA', '0005', '01'),
+    ])
+    inventario = _inventario([
+        ('AAA', '01/01/2025', 1, '123', 'X', 12.5, 'V', 0),
+        ('BBB', '02/01/2025', 2, '456', 'Y', 20.004, 'V', 5),
+    ])
+    results = compare_siat_with_inventory(siat, inventario)
+    assert results['field_discrepancies'] == [{'autorizacion': 'AAA', 'observaciones': 'Importe: SIAT=10.0, INV=12.5'}]
+    assert results['amount_differences_count'] == 1
+    assert results['amount_difference'] == -2.5
+    assert [d['OBSERVACIONES'] for d in results['amount_difference_details']] == ['Importe: SIAT=10.0, INV=12.5']
+
+
+def test_partition_by_authorization_uses_shared_integer_keys():
+    siat = _siat([
+        ('AAA ', '01/01/2025', 1, '1', 'X', 1.0, 'VALIDA', '0000', '01'),
+        ('BBB', '01/01/2025', 2, '2', 'X', 2.0, 'VALIDA', '0000', '01'),
+        ('BBB', '01/01/2025', 2, '2', 'X', 2.0, 'VALIDA', '0000', '01'),
+    ])
+    inventario = _inventario([
+        ('CCC', '01/01/2025', 3, '3', 'X', 3.0, 'V', 0),
+        ('AAA', '01/01/2025', 1, '1', 'X', 1.0, 'V', 0),
+    ])
+    partes = partition_by_authorization(siat, inventario)
+    assert (partes['matching_count'], partes['siat_only_count'], partes['inventory_only_count']) == (1, 1, 1)
+    assert partes['siat_matched'][AUTH_KEY].tolist() == partes['inventory_matched'][AUTH_KEY].tolist()
+    assert partes['siat_only']['CODIGO DE AUTORIZACIÓN'].tolist() == ['BBB', 'BBB']
+    assert partes['inventory_only']['autorizacion'].tolist() == ['CCC']
+
+
+def test_full_verification_leaves_inventory_frame_untouched():
+    siat = _siat([('AAA', '01/01/2025', 1, '123', 'X', 10.0, 'VALIDA', '0000', '01')])
+    inventario = _inventario([(' AAA ', '01/01/2025', 1, '123', 'X', 10.0, 'V', 0)])
+    original = inventario.copy()
+    results = compare_siat_with_inventory(siat, inventario)
+    pd.testing.assert_frame_equal(inventario, original)
+    assert results['verificacion_completa']['autorizacion'].tolist() == ['AAA']
+    assert results['verificacion_completa']['fechaFac'].tolist() == ['01/01/2025']
@@ -0,0 +1,93 @@
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from ventas_plus import core_logic
+
+
+def test_month_span_crosses_year():
+    assert core_logic.month_span((2024, 11), (2025, 2)) == [(2024, 11), (2024, 12), (2025, 1), (2025, 2)]
+    assert core_logic.month_span((2025, 3), (2025, 1)) == []
+
+
+def test_range_fetch_is_one_query_split_by_month(monkeypatch):
+    consultas = []
+
+    def _consulta(db_params, start, end, fetch_size=None, projection='full'):
+        consultas.append((start, end))
+        return pd.DataFrame({
+            'fechaFac': ['05/01/2025', '02/03/2025', '07/01/2025'],
+            'autorizacion': ['A', 'B', 'C'],
+        })
+
+    monkeypatch.setattr(core_logic, 'query_inventory_invoices', _consulta)
+    por_mes = core_logic.get_inventory_system_invoices_range({}, (2025, 1), (2025, 3))
+    assert consultas == [(date(2025, 1, 1), date(2025, 4, 1))]
+    assert list(por_mes) == [(2025, 1), (2025, 2), (2025, 3)]
+    assert por_mes[(2025, 1)]['autorizacion'].tolist() == ['A', 'C']
+    assert por_mes[(2025, 2)].empty
+    assert por_mes[(2025, 3)]['autorizacion'].tolist() == ['B']
+
+
+def _proyecto(tmp_path):
+    carpeta = tmp_path / 'data' / '2025'
+    carpeta.mkdir(parents=True)
+    (carpeta / '01VentasXlsx.zip').write_bytes(b'')
+    return str(tmp_path)
+
+
+def _siat():
+    return pd.DataFrame({
+        'CODIGO DE AUTORIZACIÓN': ['A'], 'FECHA DE LA FACTURA': ['01/01/2025'], 'Nº DE LA FACTURA': [1],
+        'NIT / CI CLIENTE': ['1'], 'NOMBRE O RAZON SOCIAL': ['X'], 'IMPORTE TOTAL DE LA VENTA': [1.0],
+        'ESTADO': ['VALIDA'], 'SUCURSAL': ['0000'], 'SECTOR': ['01'],
+    })
+
+
+def _inventario():
+    return pd.DataFrame({
+        'autorizacion': ['A'], 'fechaFac': ['01/01/2025'], 'nFactura': [1], 'nit': ['1'], 'razonSocial': ['X'],
+        'importeTotal': [1.0], 'estado': ['V'], 'codigoSucursal': [0],
+    })
+
+
+def test_concurrent_mode_overlaps_parse_and_query(monkeypatch, tmp_path):
+    def _lento(resultado):
+        def cargar(*args, **kwargs):
+            time.sleep(0.3)
+            return resultado()
+        return cargar
+
+    monkeypatch.setattr(core_logic, 'load_processed_sales', _lento(_siat))
+    monkeypatch.setattr(core_logic, 'load_inventory_data', _lento(_inventario))
+    inicio = time.perf_counter()
+    results = core_logic.verify_invoice_consistency(_proyecto(tmp_path), 'db.ini', 1, 2025, export_results=False, concurrent=True)
+    assert time.perf_counter() - inicio < 0.55
+    assert results['matching_invoices'] == 1
+
+
+def test_concurrent_mode_reports_query_errors(monkeypatch, tmp_path, capsys):
+    def _falla(*args, **kwargs):
+        raise RuntimeError('sin conexión')
+
+    monkeypatch.setattr(core_logic, 'load_processed_sales', lambda *args, **kwargs: _siat())
+    monkeypatch.setattr(core_logic, 'load_inventory_data', _falla)
+    assert core_logic.verify_invoice_consistency(_proyecto(tmp_path), 'db.ini', 1, 2025, export_results=False, concurrent=True) is None
+    assert 'sin conexión' in capsys.readouterr().out
+
+
+def test_verification_csv_is_optional(monkeypatch, tmp_path):
+    monkeypatch.setattr(core_logic, 'load_processed_sales', lambda *args, **kwargs: _siat())
+    monkeypatch.setattr(core_logic, 'load_inventory_data', lambda *args, **kwargs: _inventario())
+    proyecto = _proyecto(tmp_path)
+    results = core_logic.verify_invoice_consistency(proyecto, 'db.ini', 1, 2025, export_verification_csv=False)
+    assert not results['verificacion_completa'].empty
+    assert not (tmp_path / 'data' / 'output' / 'verificacion_completa_01_2025.csv').exists()
+
+
+def test_reversed_range_is_rejected(monkeypatch, capsys):
+    monkeypatch.setattr(core_logic, 'get_db_config', lambda path: pytest.fail('no debe consultar'))
+    assert core_logic.verify_invoice_consistency_range('.', 'db.ini', (2025, 3), (2025, 1)) is None
+    assert 'antes de empezar' in capsys.readouterr().out
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from ventas_plus.cuf_decoder import CUF_FIELDS, decode_cuf_series
+from ventas_plus.ventas_processing import process_sales_data
+
+
+def decode_reference(codigo):
+    """Lógica original fila por fila, usada como referencia."""
+    campos = {col: '' for col, _, _ in CUF_FIELDS}
+    if isinstance(codigo, str) and len(codigo) >= 42:
+        cadena = str(int(codigo[:42], 16))
+        if len(cadena) > 27:
+            cadena = cadena[27:]
+            if len(cadena) >= 24:
+                for col, inicio, fin in CUF_FIELDS:
+                    campos[col] = cadena[inicio:fin]
+    return campos
+
+
+def test_decode_matches_reference_on_random_codes():
+    rng = random.Random(42)
+    codes = [
+        ''.join(rng.choice('0123456789ABCDEFabcdef') for _ in range(rng.choice([42, 50, 60])))
+        for _ in range(500)
+    ]
+    codes += ['0' * 8 + 'F' * 40, '0' * 50, ' ' + 'A' * 45, 'AB' * 10, None, np.nan, 12345]
+    series = pd.Series(codes, index=range(100, 100 + len(codes)), dtype=object)
+    decoded, errors = decode_cuf_series(series)
+    assert errors == []
+    for index, codigo in series.items():
+        assert decoded.loc[index].to_dict() == decode_reference(codigo)
+
+
+def test_decode_reports_invalid_codes_in_bulk():
+    series = pd.Series(['Z' * 45, 'F' * 45, 'ñ' * 45])
+    decoded, errors = decode_cuf_series(series)
+    assert [index for index, _, _ in errors] == [0, 2]
+    assert decoded.loc[0, 'SUCURSAL'] == ''
+    assert decoded.loc[1].to_dict() == decode_reference('F' * 45)
+
+
+def test_process_sales_data_adds_cuf_columns():
+    codigo = '4A3F' * 15
+    df = pd.DataFrame({
+        'CODIGO DE AUTORIZACIÓN': [codigo, 'corto'],
+        'IMPORTE TOTAL DE LA VENTA': ['10.5', '3'],
+    })
+    processed = process_sales_data(df)
+    esperado = decode_reference(codigo)
+    for col, _, _ in CUF_FIELDS:
+        assert processed.loc[0, col] == esperado[col]
+        assert processed.loc[1, col] == ''
+    assert processed['IMPORTE TOTAL DE LA VENTA'].tolist() == [10.5, 3.0]
@@ -0,0 +1,90 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from ventas_plus import data_ingestion
+from ventas_plus.data_ingestion import (
+    iter_zipped_sales_excel_chunks,
+    list_excel_members,
+    process_zipped_sales_excel,
+)
+
+
+def _xlsx_bytes(df, sheet_name="hoja1"):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+
+def _make_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def test_reads_workbook_without_extracting(tmp_path):
+    df = pd.DataFrame({'ESTADO': ['VALIDA', 'ANULADA'], 'IMPORTE TOTAL DE LA VENTA': [10.5, 3.0]})
+    zip_path = _make_zip(tmp_path / "01VentasXlsx.zip", {
+        "ventas.xlsx": _xlsx_bytes(df),
+        "LEEME.txt": b"no es un excel",
+        "__MACOSX/._ventas.xlsx": b"basura",
+    })
+    result = process_zipped_sales_excel(zip_path)
+    pd.testing.assert_frame_equal(result, df)
+    assert list(tmp_path.iterdir()) == [tmp_path / "01VentasXlsx.zip"]
+
+
+def test_concatenates_multiple_workbooks_in_name_order(tmp_path):
+    parte1 = pd.DataFrame({'ESTADO': ['VALIDA'], 'IMPORTE TOTAL DE LA VENTA': [1.0]})
+    parte2 = pd.DataFrame({'ESTADO': ['ANULADA'], 'IMPORTE TOTAL DE LA VENTA': [2.0]})
+    zip_path = _make_zip(tmp_path / "ventas.zip", {
+        "b/parte2.xlsx": _xlsx_bytes(parte2),
+        "a/parte1.xlsx": _xlsx_bytes(parte1),
+        "~$parte1.xlsx": b"bloqueo",
+    })
+    with zipfile.ZipFile(zip_path) as zf:
+        assert [info.filename for info in list_excel_members(zf)] == ["a/parte1.xlsx", "b/parte2.xlsx"]
+    result = process_zipped_sales_excel(zip_path)
+    assert result['ESTADO'].tolist() == ['VALIDA', 'ANULADA']
+
+
+def test_returns_none_without_workbooks(tmp_path):
+    zip_path = _make_zip(tmp_path / "vacio.zip", {"LEEME.txt": b"sin excel"})
+    assert process_zipped_sales_excel(zip_path) is None
+
+
+def test_chunks_match_full_read(tmp_path):
+    df = pd.DataFrame({
+        'Nº': range(1, 26),
+        'NIT / CI CLIENTE': [str(1000 + i) if i % 5 else f"CI-{i}" for i in range(25)],
+        'IMPORTE TOTAL DE LA VENTA': [i * 1.5 for i in range(25)],
+        'ESTADO': ['VALIDA', 'ANULADA'] * 12 + ['VALIDA'],
+    })
+    zip_path = _make_zip(tmp_path / "ventas.zip", {"ventas.xlsx": _xlsx_bytes(df)})
+    chunks = list(iter_zipped_sales_excel_chunks(zip_path, chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(chunks), process_zipped_sales_excel(zip_path))
+
+
+def test_excel_engine_falls_back_to_openpyxl(monkeypatch):
+    monkeypatch.setattr(data_ingestion, "available_excel_engines", lambda: ["openpyxl"])
+    assert data_ingestion.resolve_excel_engine("calamine") == "openpyxl"
+    assert data_ingestion.resolve_excel_engine("auto") == "openpyxl"
+    monkeypatch.setattr(data_ingestion, "available_excel_engines", lambda: ["openpyxl", "calamine"])
+    assert data_ingestion.resolve_excel_engine("auto") == "calamine"
+    monkeypatch.setenv("VENTAS_EXCEL_ENGINE", "calamine")
+    assert data_ingestion.resolve_excel_engine() == "calamine"
+
+
+def test_unplanned_columns_keep_one_dtype_across_chunks(tmp_path):
+    df = pd.DataFrame({
+        'ESTADO': ['VALIDA'] * 20,
+        'OBSERVACION LIBRE': [i for i in range(10)] + [f"obs {i}" for i in range(10)],
+    })
+    zip_path = _make_zip(tmp_path / "ventas.zip", {"ventas.xlsx": _xlsx_bytes(df)})
+    chunks = list(iter_zipped_sales_excel_chunks(zip_path, chunksize=10))
+    assert {str(chunk['OBSERVACION LIBRE'].dtype) for chunk in chunks} == {str(chunks[1]['OBSERVACION LIBRE'].dtype)}
+    assert chunks[0]['OBSERVACION LIBRE'].tolist() == [str(i) for i in range(10)]
+    pd.testing.assert_frame_equal(pd.concat(chunks), process_zipped_sales_excel(zip_path))
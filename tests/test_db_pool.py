@@ -0,0 +1,60 @@
+import pytest
+
+from ventas_plus import db_pool
+
+
+class _Pool:
+    created = []
+
+    def __init__(self, pool_name, pool_size, pool_reset_session, **params):
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.params = params
+        self.removed = False
+        _Pool.created.append(self)
+
+    def get_connection(self):
+        return ('conexion', self)
+
+    def _remove_connections(self):
+        self.removed = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    _Pool.created = []
+    monkeypatch.setattr(db_pool.pooling, 'MySQLConnectionPool', _Pool)
+    monkeypatch.setattr(db_pool, '_pools', {})
+    yield _Pool.created
+
+
+def test_one_pool_per_connection_parameters(pools):
+    inventario = {'host': 'localhost', 'database': 'inventario', 'port': 3306}
+    contable = {'host': 'localhost', 'database': 'contable', 'port': 3306}
+    assert db_pool.get_connection(inventario)[1] is db_pool.get_connection(dict(inventario))[1]
+    assert db_pool.get_connection(contable)[1] is not db_pool.get_connection(inventario)[1]
+    assert len(pools) == 2
+    db_pool.close_pools()
+    assert all(pool.removed for pool in pools)
+
+
+def test_pool_size_from_argument_or_environment(pools, monkeypatch):
+    monkeypatch.setenv('VENTAS_DB_POOL_SIZE', '5')
+    assert db_pool.get_pool({'database': 'a'}).pool_size == 5
+    assert db_pool.get_pool({'database': 'b'}, pool_size=3).pool_size == 3
+    monkeypatch.setenv('VENTAS_DB_POOL_SIZE', 'x')
+    assert db_pool.get_pool_size() == db_pool.DEFAULT_POOL_SIZE
+
+
+def test_close_pools_without_private_connector_api(pools, capsys):
+    db_pool.get_pool({'database': 'a'})
+    db_pool.get_pool({'database': 'b'})
+
+    def _falla():
+        raise RuntimeError('conexión perdida')
+
+    pools[0]._remove_connections = None
+    pools[1]._remove_connections = _falla
+    db_pool.close_pools()
+    assert db_pool._pools == {}
+    assert 'no se pudieron cerrar' in capsys.readouterr().out
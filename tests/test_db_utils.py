@@ -0,0 +1,130 @@
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from ventas_plus import db_utils
+from ventas_plus.db_utils import fetch_dataframe, month_date_range
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.description = [('fechaFac',), ('nFactura',), ('importeTotal',)]
+        self._rows = rows
+        self.closed = False
+        self.fail = False
+
+    def execute(self, query, params=None):
+        self.params = params
+
+    def fetchmany(self, size):
+        if self.fail:
+            raise RuntimeError('conexión perdida')
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class _Connection:
+    def __init__(self, rows):
+        self.cursor_obj = _Cursor(rows)
+        self.unread_result = False
+        self.consumed = False
+
+    def consume_results(self):
+        self.consumed = True
+        self.unread_result = False
+
+    def cursor(self, buffered=True):
+        assert buffered is False
+        return self.cursor_obj
+
+
+def test_month_date_range_is_half_open():
+    assert month_date_range(2025, 1) == (date(2025, 1, 1), date(2025, 2, 1))
+    assert month_date_range(2024, 12) == (date(2024, 12, 1), date(2025, 1, 1))
+
+
+def test_fetch_dataframe_reads_in_batches():
+    rows = [(f'{i:02d}/01/2025', i, Decimal('1.50') * i) for i in range(1, 8)]
+    conn = _Connection(rows)
+    df = fetch_dataframe(conn, 'SELECT ...', month_date_range(2025, 1), fetch_size=2)
+    assert conn.cursor_obj.closed
+    assert df.columns.tolist() == ['fechaFac', 'nFactura', 'importeTotal']
+    assert df['nFactura'].tolist() == list(range(1, 8))
+    assert df['nFactura'].dtype == 'int64'
+    assert df['importeTotal'].dtype == 'float64'
+    assert df['importeTotal'].iloc[-1] == 10.5
+
+
+def test_fetch_dataframe_without_rows():
+    df = fetch_dataframe(_Connection([]), 'SELECT ...')
+    assert len(df) == 0
+    assert df.columns.tolist() == ['fechaFac', 'nFactura', 'importeTotal']
+
+
+def test_fetch_dataframe_discards_pending_rows_on_error():
+    conn = _Connection([('01/01/2025', 1, Decimal('1'))])
+    conn.cursor_obj.fail = True
+    conn.unread_result = True
+    with pytest.raises(RuntimeError):
+        fetch_dataframe(conn, 'SELECT ...')
+    assert conn.consumed
+    assert conn.cursor_obj.closed
+
+
+def test_full_projection_adds_constant_columns_on_client():
+    leidas = pd.DataFrame({columna: ['x'] for columna in db_utils.projection_columns('full')})
+    leidas['importeTotal'] = [12.5]
+    completa = db_utils.add_constant_columns(leidas)
+    assert completa.columns.tolist() == db_utils.INVENTORY_FULL_COLUMNS
+    assert completa[['ICE', 'tipoVenta']].iloc[0].tolist() == [0, 0]
+    assert completa['complemento'].iloc[0] == ''
+    assert completa['subTotal'].iloc[0] == completa['base'].iloc[0] == 12.5
+
+
+def test_slim_projection_reads_only_reconciliation_columns():
+    consulta = db_utils.build_inventory_query('slim')
+    assert 'JOIN tipoPago' not in consulta and 'JOIN users' not in consulta
+    assert db_utils.projection_columns('slim') == db_utils.RECONCILIATION_COLUMNS
+
+
+def test_projections_share_the_row_predicate():
+    for construir in (db_utils.build_inventory_query, db_utils.build_branch_signature_query):
+        completa, reducida = construir('full'), construir('slim')
+        for tabla, condicion in db_utils.INVENTORY_LOOKUP_JOINS.items():
+            assert f"INNER JOIN {tabla} ON {condicion}" in completa
+            assert f"EXISTS (SELECT 1 FROM {tabla} WHERE {condicion})" in reducida
+            assert 'EXISTS' not in completa
+
+
+def test_failed_queries_return_their_connection(monkeypatch):
+    cerradas = []
+
+    class _Conexion:
+        def close(self):
+            cerradas.append(self)
+
+    def _falla(*args, **kwargs):
+        raise RuntimeError('consulta cancelada')
+
+    monkeypatch.setattr(db_utils, 'connect_to_db', lambda params: _Conexion())
+    monkeypatch.setattr(db_utils, 'fetch_dataframe', _falla)
+    assert db_utils.query_inventory_invoices({}, date(2025, 1, 1), date(2025, 2, 1)) is None
+    assert db_utils.get_inventory_branch_signatures({}, date(2025, 1, 1), date(2025, 2, 1)) is None
+    assert len(cerradas) == 2
+
+
+def test_month_query_uses_the_shared_inventory_query(monkeypatch):
+    consultas = []
+
+    def _consulta(db_params, start, end, fetch_size=None, projection='full'):
+        consultas.append((start, end, projection))
+        return pd.DataFrame({'nFactura': [1, 2]})
+
+    monkeypatch.setattr(db_utils, 'query_inventory_invoices', _consulta)
+    assert len(db_utils.get_inventory_system_invoices({}, 2025, 12)) == 2
+    assert consultas == [(date(2025, 12, 1), date(2026, 1, 1), 'full')]
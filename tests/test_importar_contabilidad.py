@@ -0,0 +1,135 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ventas_plus.bulk_loader import dataframe_rows
+from ventas_plus.importar_verificacion_contabilidad import (
+    fill_not_null_defaults,
+    main_import,
+    map_verification_columns,
+    mask_nan_strings,
+    parse_invoice_dates,
+    read_verification_csv,
+)
+
+
+def test_parse_invoice_dates_fixed_format():
+    fechas = parse_invoice_dates(pd.Series(['01/02/2025', '3/4/2025', np.nan, 'x']))
+    assert fechas[:2].tolist() == [date(2025, 2, 1), date(2025, 4, 3)]
+    assert fechas[2:].isna().all()
+    assert parse_invoice_dates(pd.Series(pd.to_datetime(['2025-01-31'])))[0] == date(2025, 1, 31)
+
+
+def test_nan_strings_and_nulls_become_none_in_rows():
+    df = pd.DataFrame({
+        'customer_name': ['a', 'nan', np.nan],
+        'observations': ['NaN', 'b', np.nan],
+        'total_sale_amount': [1.5, np.nan, 3.0],
+    })
+    df = mask_nan_strings(df).fillna({'customer_name': '0'})
+    assert list(dataframe_rows(df)) == [
+        ('a', None, 1.5),
+        ('0', 'b', None),
+        ('0', None, 3.0),
+    ]
+
+
+def test_nan_strings_in_not_null_columns_get_the_default():
+    df = pd.DataFrame({
+        'customer_nit': ['nan', '123', np.nan],
+        'observations': ['NAN', 'x', np.nan],
+        'debit_tax': [np.nan, 1.3, 2.6],
+    })
+    df['estado'] = pd.Series([1, 'nan', None], dtype=object)
+    completas = fill_not_null_defaults(df)
+    assert completas['customer_nit'].tolist() == ['0', '123', '0']
+    assert completas['observations'].isna().tolist() == [True, False, True]
+    assert completas['debit_tax'].tolist() == [0.0, 1.3, 2.6]
+    assert completas['estado'].isna().tolist() == [False, True, True]
+
+
+def test_in_memory_and_csv_verification_give_the_same_rows(tmp_path):
+    verificacion = pd.DataFrame({
+        'FECHA DE LA FACTURA': ['01/01/2025', '02/01/2025', '03/01/2025'],
+        'Nº DE LA FACTURA': [1, 2, 3],
+        'CODIGO DE AUTORIZACIÓN': ['A1', 'B2', 'C3'],
+        'NIT / CI CLIENTE': pd.Series([1234567, '0012', np.nan], dtype=object),
+        'NOMBRE O RAZON SOCIAL': ['x', 'y', np.nan],
+        'IMPORTE TOTAL DE LA VENTA': [10.5, 20.0, np.nan],
+        'ESTADO': ['V', 'A', 'V'],
+        'SUCURSAL': ['0000', '0005', '0000'],
+        'OBSERVACIONES': ['', 'Importe: SIAT=1, INV=2', ''],
+        '_obs': ['', np.nan, 'glosa'],
+    })
+    ruta = tmp_path / 'verificacion_completa_01_2025.csv'
+    verificacion.to_csv(ruta, index=False)
+    en_memoria = map_verification_columns(verificacion)
+    desde_csv = map_verification_columns(read_verification_csv(ruta))
+    pd.testing.assert_frame_equal(en_memoria, desde_csv)
+    assert en_memoria['branch_office'].tolist() == ['0000', '0005', '0000']
+    assert en_memoria['customer_nit'].tolist()[:2] == ['1234567', '0012']
+    assert en_memoria['observations'].isna().tolist() == [True, False, True]
+    assert list(dataframe_rows(fill_not_null_defaults(en_memoria), ['observations', 'obs'])) == [
+        (None, None), ('Importe: SIAT=1, INV=2', None), (None, 'glosa'),
+    ]
+
+
+def test_missing_verification_file_returns_false(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert main_import(1, 2025) is False
+
+
+class _CursorContable:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.log.append(sql.split(' (')[0])
+        if sql.startswith('INSERT'):
+            raise RuntimeError('conexión perdida')
+
+    def fetchone(self):
+        return (0,)
+
+    def fetchall(self):
+        return [('id',), ('invoice_date',), ('authorization_code',), ('total_sale_amount',)]
+
+    def close(self):
+        pass
+
+
+class _ConexionContable:
+    def __init__(self, log):
+        self.log = log
+
+    def cursor(self):
+        return _CursorContable(self.log)
+
+    def commit(self):
+        self.log.append('commit')
+
+    def rollback(self):
+        self.log.append('rollback')
+
+    def close(self):
+        self.log.append('close')
+
+
+def test_failed_staging_import_releases_connection_and_drops_staging(tmp_path, monkeypatch):
+    from ventas_plus import db_utils_contabilidad
+
+    log = []
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'output').mkdir(parents=True)
+    monkeypatch.setattr(db_utils_contabilidad, 'get_db_config_contabilidad', lambda path: {})
+    monkeypatch.setattr(db_utils_contabilidad, 'connect_contabilidad', lambda params: _ConexionContable(log))
+    monkeypatch.setattr(pd, 'read_sql', lambda *args, **kwargs: pd.DataFrame())
+    verificacion = pd.DataFrame({
+        'FECHA DE LA FACTURA': ['01/01/2025'], 'Nº DE LA FACTURA': [1], 'CODIGO DE AUTORIZACIÓN': ['A1'],
+        'NOMBRE O RAZON SOCIAL': ['x'], 'IMPORTE TOTAL DE LA VENTA': [10.0], 'ESTADO': ['V'],
+    })
+    assert main_import(1, 2025, staging=True, verification_df=verificacion) is False
+    assert log[-3:] == ['rollback', 'DROP TABLE IF EXISTS sales_registers_staging_2025_01', 'close']
+    assert log.count('close') == 2
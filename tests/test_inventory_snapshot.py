@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from ventas_plus import inventory_snapshot
+
+
+def _facturas(filas):
+    return pd.DataFrame(filas, columns=['fechaFac', 'autorizacion', 'importeTotal', 'codigoSucursal', '_idalmacen'])
+
+
+@pytest.fixture
+def base(monkeypatch):
+    estado = {
+        'firmas': [
+            {'idalmacen': 1, 'almacen': '0', 'filas': 2, 'max_id': 10, 'checksum': 111},
+            {'idalmacen': 2, 'almacen': '5', 'filas': 1, 'max_id': 11, 'checksum': 222},
+        ],
+        'facturas': _facturas([
+            ('01/01/2025', 'A', 1.0, 0, 1), ('02/01/2025', 'B', 2.0, 0, 1), ('03/01/2025', 'C', 3.0, 5, 2),
+        ]),
+        'consultas': [],
+    }
+
+    def _firmas(db_params, start, end, projection='full'):
+        return estado['firmas']
+
+    def _consulta(db_params, start, end, branch_ids=None, projection='full', branch_key=False):
+        assert branch_key
+        if branch_ids is None:
+            estado['consultas'].append('completo')
+            return estado['facturas']
+        estado['consultas'].append(tuple(branch_ids))
+        return estado['facturas'][estado['facturas']['_idalmacen'].isin(branch_ids)]
+
+    monkeypatch.setattr(inventory_snapshot, 'get_inventory_branch_signatures', _firmas)
+    monkeypatch.setattr(inventory_snapshot, 'query_inventory_invoices', _consulta)
+    return estado
+
+
+def test_snapshot_is_reused_and_only_changed_branches_are_fetched(base, tmp_path):
+    primero = inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    assert base['consultas'] == ['completo']
+    assert inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1).equals(primero)
+    assert base['consultas'] == ['completo']
+
+    # La sucursal 5 recibe una factura nueva
+    base['facturas'] = pd.concat([base['facturas'], _facturas([('04/01/2025', 'D', 4.0, 5, 2)])], ignore_index=True)
+    base['firmas'][1] = {'idalmacen': 2, 'almacen': '5', 'filas': 2, 'max_id': 12, 'checksum': 333}
+    actualizado = inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    assert base['consultas'] == ['completo', (2,)]
+    assert actualizado['autorizacion'].tolist() == ['A', 'B', 'C', 'D']
+
+    inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1, refresh=True)
+    assert base['consultas'] == ['completo', (2,), 'completo']
+
+
+def test_removed_branch_is_dropped(base, tmp_path):
+    inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    base['firmas'] = base['firmas'][:1]
+    df = inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    assert df['autorizacion'].tolist() == ['A', 'B']
+    assert base['consultas'] == ['completo']
+
+
+def test_branches_are_split_by_idalmacen(base, tmp_path):
+    # Dos almacenes que facturan con el mismo código de sucursal
+    base['facturas']['codigoSucursal'] = 5
+    primero = inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    assert '_idalmacen' not in primero.columns
+    base['firmas'][1] = {'idalmacen': 2, 'almacen': '5', 'filas': 1, 'max_id': 11, 'checksum': 444}
+    df = inventory_snapshot.load_inventory_month({}, str(tmp_path), 2025, 1)
+    assert base['consultas'] == ['completo', (2,)]
+    assert df['autorizacion'].tolist() == ['A', 'B', 'C']
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ventas_plus.branch_normalization import normalize_branch_code, normalize_branch_code_series
+from ventas_plus.comparison import (
+    normalize_factura_num,
+    normalize_factura_num_series,
+    normalize_nit,
+    normalize_nit_series,
+)
+
+CASOS = [
+    "5", "05", "005", "5.0", "5.00", ".0", "0.0", ".00", "0.00", " 5 ", " 5.0 ", " .0 ",
+    5, 5.0, None, pd.NA, np.nan, "", ".", "0", "00",
+]
+
+
+def _valores_aleatorios(rng, n=400):
+    generadores = [
+        lambda: rng.randint(-10 ** 6, 10 ** 6),
+        lambda: rng.choice([2 ** 53, 2 ** 53 + 1, -(2 ** 60), 10 ** 20]),
+        lambda: float(rng.randint(0, 10 ** 9)),
+        lambda: rng.uniform(-1000, 1000),
+        lambda: rng.choice([1e16, 1e20, 1e-5, 1.5e-7, -0.0, float('inf'), float('nan')]),
+        lambda: '0' * rng.randint(0, 3) + str(rng.randint(0, 10 ** 8)),
+        lambda: ' ' * rng.randint(0, 2) + str(rng.randint(0, 999)) + ' ' * rng.randint(0, 2),
+        lambda: str(rng.randint(0, 10 ** 25)),
+        lambda: rng.choice(['', ' ', '.', '.0', '5.00', 'abc', '1e3', 'nan', 'inf', '12-A', '٣', '0x1', '1_000', '-5', '\u20035', '\x1c05\x1c', '\t007\n', '٣٤']),
+        lambda: str(round(rng.uniform(0, 100), rng.randint(0, 3))),
+        lambda: rng.choice([None, pd.NA, np.nan]),
+    ]
+    return [rng.choice(generadores)() for _ in range(n)]
+
+
+def _series_variantes(valores):
+    yield pd.Series(valores, dtype=object)
+    textos = [v for v in valores if isinstance(v, str)]
+    yield pd.Series(textos, dtype='str')
+    enteros = [v for v in valores if isinstance(v, int) and abs(v) < 2 ** 63]
+    yield pd.Series(enteros, dtype='int64')
+    yield pd.Series(enteros + [None], dtype='Int64')
+    yield pd.Series([v for v in valores if isinstance(v, float)], dtype='float64')
+
+
+@pytest.mark.parametrize("escalar, por_columna", [
+    (normalize_branch_code, normalize_branch_code_series),
+    (normalize_nit, normalize_nit_series),
+    (normalize_factura_num, normalize_factura_num_series),
+])
+def test_series_matches_scalar(escalar, por_columna):
+    rng = random.Random(7)
+    for valores in [CASOS, _valores_aleatorios(rng), _valores_aleatorios(rng)]:
+        for serie in _series_variantes(valores):
+            serie.index = range(10, 10 + len(serie))
+            esperado = [escalar(v) for v in serie.tolist()]
+            resultado = por_columna(serie)
+            assert resultado.index.equals(serie.index)
+            assert resultado.tolist() == esperado
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from ventas_plus import siat_cache
+
+
+def test_cache_roundtrip_and_decoder_invalidation(tmp_path, monkeypatch):
+    zip_path = tmp_path / "01VentasXlsx.zip"
+    zip_path.write_bytes(b"contenido del zip")
+    cache_dir = str(tmp_path / "cache")
+    df = pd.DataFrame({'SUCURSAL': ['0000', '0005'], 'IMPORTE TOTAL DE LA VENTA': [10.5, 3.0]})
+
+    key = siat_cache.cache_key(str(zip_path))
+    assert siat_cache.store_cached_sales(cache_dir, key, df)
+    pd.testing.assert_frame_equal(siat_cache.load_cached_sales(cache_dir, key), df, check_dtype=False)
+
+    # Otra hoja u otro motor de Excel no reutilizan la entrada
+    assert siat_cache.cache_key(str(zip_path), sheet_name="hoja2") != key
+    monkeypatch.setattr(siat_cache, "resolve_excel_engine", lambda engine=None: engine or "openpyxl")
+    assert siat_cache.cache_key(str(zip_path), engine="openpyxl") == key
+    assert siat_cache.cache_key(str(zip_path), engine="calamine") != key
+
+    # Cambiar el contenido del ZIP cambia la clave
+    zip_path.write_bytes(b"otro contenido")
+    assert siat_cache.cache_key(str(zip_path)) != key
+
+    # Una nueva versión del decodificador descarta las entradas anteriores
+    monkeypatch.setattr(siat_cache, "CUF_DECODER_VERSION", "nueva")
+    siat_cache.evict_cache(cache_dir, max_bytes=10 ** 9)
+    assert os.listdir(cache_dir) == []
+
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    df = pd.DataFrame({'valor': range(1000)})
+    for i, key in enumerate(["a", "b", "c"]):
+        siat_cache.store_cached_sales(cache_dir, key + siat_cache.cache_version(), df, max_bytes=10 ** 9)
+        path = os.path.join(cache_dir, key + siat_cache.cache_version() + ".parquet")
+        os.utime(path, (1000 + i, 1000 + i))
+
+    entry_size = os.path.getsize(path)
+    siat_cache.evict_cache(cache_dir, max_bytes=2 * entry_size)
+    assert sorted(os.listdir(cache_dir)) == [
+        f"b{siat_cache.cache_version()}.parquet",
+        f"c{siat_cache.cache_version()}.parquet",
+    ]
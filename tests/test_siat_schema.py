@@ -0,0 +1,61 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from ventas_plus.data_ingestion import iter_zipped_sales_excel_chunks, process_zipped_sales_excel
+from ventas_plus.siat_schema import apply_siat_schema, build_column_plan, normalize_column_name
+
+
+def _sales_zip(path, df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, sheet_name="hoja1", index=False)
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr("ventas.xlsx", buffer.getvalue())
+    return str(path)
+
+
+def test_plan_matches_siat_header_variants():
+    plan = build_column_plan(['Nº DE LA FACTURA', 'CODIGO DE AUTORIZACIÓN', 'NOMBRE O RAZON SOCIAL',
+                              'DEBITO FISCAL', 'SUCURSAL'])
+    assert {col: spec['tipo_dato'] for col, spec in plan.items()} == {
+        'Nº DE LA FACTURA': 'entero',
+        'CODIGO DE AUTORIZACIÓN': 'alfanumérico',
+        'NOMBRE O RAZON SOCIAL': 'alfanumérico',
+        'DEBITO FISCAL': 'numérico',
+    }
+    assert normalize_column_name(' n°  de la factura ') == 'N DE LA FACTURA'
+
+
+def test_apply_schema_types_columns():
+    df = pd.DataFrame({
+        'FECHA DE LA FACTURA': ['01/03/2025', ' 2/3/2025', 'sin fecha'],
+        'Nº DE LA FACTURA': [15.0, None, 7.0],
+        'NIT / CI CLIENTE': [' 0123 ', 99002, None],
+        'IMPORTE TOTAL DE LA VENTA': ['10.456', 3, 'x'],
+        'OTRA': [1, 2, 3],
+    }, dtype=object)
+    typed = apply_siat_schema(df)
+    assert typed['FECHA DE LA FACTURA'].tolist() == ['01/03/2025', '02/03/2025', 'sin fecha']
+    assert str(typed['Nº DE LA FACTURA'].dtype) == 'Int64'
+    assert typed['Nº DE LA FACTURA'].tolist()[::2] == [15, 7]
+    assert typed['NIT / CI CLIENTE'].tolist()[:2] == ['0123', '99002']
+    assert pd.isna(typed['NIT / CI CLIENTE'].iloc[2])
+    assert typed['IMPORTE TOTAL DE LA VENTA'].tolist()[:2] == [10.46, 3.0]
+    assert typed['OTRA'].tolist() == [1, 2, 3]
+
+
+def test_codes_stay_strings_when_read_from_excel(tmp_path):
+    df = pd.DataFrame({
+        'Nº DE LA FACTURA': [1, 2, None],
+        'CODIGO DE AUTORIZACIÓN': ['00A1', '0012', '123'],
+        'NIT / CI CLIENTE': [1234567, '0099', 5],
+        'IMPORTE TOTAL DE LA VENTA': [10.5, 3.333, 1],
+    })
+    zip_path = _sales_zip(tmp_path / "ventas.zip", df)
+    result = process_zipped_sales_excel(zip_path)
+    assert result['CODIGO DE AUTORIZACIÓN'].tolist() == ['00A1', '0012', '123']
+    assert result['NIT / CI CLIENTE'].tolist() == ['1234567', '0099', '5']
+    assert result['Nº DE LA FACTURA'].dtype == 'Int64'
+    assert result['IMPORTE TOTAL DE LA VENTA'].tolist() == [10.5, 3.33, 1.0]
+    pd.testing.assert_frame_equal(pd.concat(iter_zipped_sales_excel_chunks(zip_path, chunksize=2)), result)
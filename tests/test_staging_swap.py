@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+import pytest
+
+from ventas_plus.staging_swap import staging_summary, staging_table_name, swap_period, validate_staging
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        if self.conn.fail_on and sql.startswith(self.conn.fail_on):
+            raise RuntimeError('tabla bloqueada')
+        self.conn.statements.append(sql)
+        self.rowcount = 3
+
+    def fetchone(self):
+        return (2, Decimal('30.50'), Decimal('3.97'))
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self, fail_on=None):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_on = fail_on
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_staging_summary_and_validation():
+    summary = staging_summary(_Connection(), 's', ['total_sale_amount', 'debit_tax'])
+    assert summary == {'filas': 2, 'total_sale_amount': 30.5, 'debit_tax': 3.97}
+    assert validate_staging(summary, {'filas': 2, 'total_sale_amount': 30.5, 'debit_tax': 3.97}) == []
+    problems = validate_staging(summary, {'filas': 3, 'total_sale_amount': 31.0, 'debit_tax': 3.97})
+    assert len(problems) == 2
+
+
+def test_swap_period_replaces_in_one_transaction():
+    conn = _Connection()
+    assert swap_period(conn, 't', staging_table_name('t', 2025, 1), ['a', 'b'], 'fecha', '2025-01-01', '2025-01-31') == (3, 3)
+    assert conn.statements == [
+        'DELETE FROM t WHERE fecha >= %s AND fecha <= %s',
+        'INSERT INTO t (a, b) SELECT a, b FROM t_staging_2025_01',
+    ]
+    assert conn.commits == 1
+
+
+def test_swap_period_rolls_back_on_error():
+    conn = _Connection(fail_on='INSERT')
+    with pytest.raises(RuntimeError):
+        swap_period(conn, 't', 's', ['a'], 'fecha', '2025-01-01', '2025-01-31')
+    assert (conn.commits, conn.rollbacks) == (0, 1)
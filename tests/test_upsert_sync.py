@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from ventas_plus import upsert_sync
+from ventas_plus.upsert_sync import apply_sync, plan_sync, row_hashes
+
+COLUMNAS = ['authorization_code', 'invoice_date', 'total_sale_amount', 'status']
+
+
+def _nuevas():
+    return pd.DataFrame({
+        'authorization_code': ['A', 'B', 'C'],
+        'invoice_date': [date(2025, 1, 2)] * 3,
+        'total_sale_amount': [10.0, 20.5, 30.0],
+        'status': ['V', 'A', 'V'],
+    })
+
+
+def _existentes():
+    # Tal como llegan de la base: importes DECIMAL
+    return pd.DataFrame({
+        'authorization_code': ['A', 'B', 'D'],
+        'invoice_date': [date(2025, 1, 2)] * 3,
+        'total_sale_amount': [Decimal('10.00'), Decimal('20.50'), Decimal('5.00')],
+        'status': ['V', 'V', 'V'],
+    })
+
+
+def test_row_hashes_match_decimal_and_float_amounts():
+    nuevas, existentes = _nuevas(), _existentes()
+    assert row_hashes(nuevas, COLUMNAS)[0] == row_hashes(existentes, COLUMNAS)[0]
+
+
+def test_plan_sync_only_touches_differences():
+    plan = plan_sync(_nuevas(), _existentes(), COLUMNAS)
+    assert plan['insert']['authorization_code'].tolist() == ['C']
+    assert plan['update']['authorization_code'].tolist() == ['B']
+    assert plan['delete'] == ['D']
+    assert plan['unchanged'] == 1
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        if sql.startswith('INSERT') and self.conn.fail_insert:
+            raise RuntimeError('clave duplicada')
+        self.conn.statements.append((sql, list(params or [])))
+        self.rowcount = len(params or [])
+
+    def executemany(self, sql, rows):
+        self.conn.statements.append((sql, rows))
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_insert = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_apply_sync_deletes_updates_and_inserts_in_one_commit():
+    conn = _Connection()
+    result = apply_sync(conn, 't', COLUMNAS, plan_sync(_nuevas(), _existentes(), COLUMNAS))
+    assert result == {'insertadas': 1, 'actualizadas': 1, 'eliminadas': 1}
+    sqls = [sql for sql, _ in conn.statements]
+    assert sqls[0] == 'DELETE FROM t WHERE authorization_code IN (%s)'
+    assert sqls[1] == 'UPDATE t SET invoice_date = %s, total_sale_amount = %s, status = %s WHERE authorization_code = %s'
+    assert conn.statements[1][1] == [(date(2025, 1, 2), 20.5, 'A', 'B')]
+    assert sqls[2].startswith('INSERT INTO t (authorization_code, invoice_date')
+    assert conn.commits == 1
+
+
+def test_failed_insert_rolls_back_the_whole_sync():
+    conn = _Connection()
+    conn.fail_insert = True
+    with pytest.raises(RuntimeError):
+        apply_sync(conn, 't', COLUMNAS, plan_sync(_nuevas(), _existentes(), COLUMNAS))
+    assert conn.commits == 0
+    assert conn.rollbacks == 1
+
+
+def test_invoice_dated_outside_the_period_is_updated(monkeypatch):
+    consultas = []
+
+    def _consulta(conn, query, params=None):
+        consultas.append(params)
+        if 'IN (' in query:
+            # C ya existe, registrada en diciembre
+            fuera = _existentes().iloc[[0]].assign(authorization_code='C', invoice_date=date(2024, 12, 31))
+            return fuera[fuera['authorization_code'].isin(params)]
+        return _existentes()
+
+    monkeypatch.setattr(upsert_sync, 'fetch_dataframe', _consulta)
+    conn = _Connection()
+    result = upsert_sync.sync_period(conn, 't', _nuevas(), COLUMNAS, 'invoice_date', '2025-01-01', '2025-01-31')
+    assert consultas[1] == ('C',)
+    assert result == {'insertadas': 0, 'actualizadas': 2, 'eliminadas': 1, 'sin_cambios': 1}
+    assert not any(sql.startswith('INSERT') for sql, _ in conn.statements)
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from ventas_plus.branch_rules import BRANCH_RULES
+from ventas_plus.ventas_processing import (
+    analyze_sales_data_detailed,
+    get_siat_sales_totals,
+    summarize_branches,
+    summarize_by_branch_sector_state,
+)
+
+
+def _ventas():
+    filas = [
+        # SUCURSAL, SECTOR, ESTADO, IMPORTE
+        ('0000', '01', 'VALIDA', 100.0),
+        ('0000', '01', 'VALIDA', 50.5),
+        ('0000', '35', 'VALIDA', 20.0),
+        ('0000', '01', 'ANULADA', 7.0),
+        ('0000', '35', 'ANULADA', 3.0),
+        ('0005', '01', 'VALIDA', 10.0),
+        ('0005', '01', 'ANULADA', 1.0),
+        ('0005', '35', 'VALIDA', 999.0),
+        ('0006', '01', 'VALIDA', 40.0),
+        ('0006', '01', 'VALIDA', None),
+        ('0000', '02', 'VALIDA', 300.0),
+        ('0005', '02', 'ANULADA', 30.0),
+        ('0007', '01', 'VALIDA', 5.0),
+    ]
+    return pd.DataFrame(filas, columns=['SUCURSAL', 'SECTOR', 'ESTADO', 'IMPORTE TOTAL DE LA VENTA'])
+
+
+def test_detailed_analysis_by_branch_and_sector():
+    results = analyze_sales_data_detailed(_ventas())
+    assert results['alquileres'] == {
+        'total_facturado': 300.0, 'cantidad_validas': 1, 'cantidad_anuladas': 1, 'cantidad_total': 2,
+    }
+    assert results['general'] == {
+        'total_facturado_valida': 1524.5, 'total_facturado_sin_alquiler': 1224.5,
+        'total_facturas': 13, 'cantidad_validas': 9, 'cantidad_anuladas': 4,
+    }
+    assert results['central'] == {
+        'total_facturado': 170.5, 'cantidad_validas_cv': 2, 'cantidad_validas_cvb': 1,
+        'cantidad_anuladas': 2, 'cantidad_total': 5,
+    }
+    assert results['potosi'] == {
+        'total_facturado': 40.0, 'cantidad_validas': 2, 'cantidad_anuladas': 0, 'cantidad_total': 2,
+    }
+    assert results['santa_cruz'] == {
+        'total_facturado': 10.0, 'cantidad_validas': 1, 'cantidad_anuladas': 1, 'cantidad_total': 2,
+    }
+    assert results['total_facturas_desglosado'] == 11
+
+
+def test_detailed_analysis_matches_row_filters():
+    df = _ventas()
+    results = analyze_sales_data_detailed(df)
+    validas_central = df[(df['ESTADO'] == 'VALIDA') & (df['SUCURSAL'] == '0000') & df['SECTOR'].isin(['01', '35'])]
+    assert results['central']['total_facturado'] == pytest.approx(validas_central['IMPORTE TOTAL DE LA VENTA'].sum())
+    assert results['general']['cantidad_validas'] == len(df[df['ESTADO'] == 'VALIDA'])
+
+
+def test_detailed_analysis_requires_columns():
+    assert 'error' in analyze_sales_data_detailed(_ventas().drop(columns=['SECTOR']))
+
+
+def test_siat_sales_totals_follow_branch_rules():
+    assert get_siat_sales_totals(_ventas()) == {
+        'CENTRAL': 170.5, 'POTOSI': 40.0, 'SANTA CRUZ': 10.0, 'GENERAL': 1224.5,
+    }
+
+
+def test_new_branch_is_a_rule_entry():
+    reglas = BRANCH_RULES + [{
+        'clave': 'cochabamba', 'nombre': 'COCHABAMBA', 'titulo': 'COCHABAMBA', 'sucursal': '0007',
+        'hergo_id': 7, 'sectores': {'01': ('cantidad_validas', None)},
+    }]
+    por_sucursal = summarize_branches(summarize_by_branch_sector_state(_ventas()), reglas)
+    assert por_sucursal['cochabamba'] == {
+        'total_facturado': 5.0, 'cantidad_validas': 1, 'cantidad_anuladas': 0, 'cantidad_total': 1,
+    }
+    assert por_sucursal['central'] == analyze_sales_data_detailed(_ventas())['central']
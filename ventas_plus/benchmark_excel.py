@@ -0,0 +1,91 @@
+"""
+Comparativa de motores de lectura de Excel sobre un mismo ZIP del SIAT.
+
+Mide el tiempo de lectura y el pico de memoria de cada motor instalado para
+elegir el más conveniente en cada máquina (luego se fija con --excel-engine
+o con la variable de entorno VENTAS_EXCEL_ENGINE).
+
+Uso:
+    python -m ventas_plus.benchmark_excel data/2025/01VentasXlsx.zip
+"""
+import argparse
+import time
+import tracemalloc
+from ventas_plus.data_ingestion import (
+    DEFAULT_CHUNKSIZE,
+    available_excel_engines,
+    iter_zipped_sales_excel_chunks,
+    process_zipped_sales_excel,
+)
+
+STREAMING_ENGINE = "openpyxl (bloques)"
+
+def _read_streaming(zip_file_path, sheet_name, chunksize):
+    rows = 0
+    for chunk in iter_zipped_sales_excel_chunks(zip_file_path, sheet_name=sheet_name, chunksize=chunksize):
+        rows += len(chunk)
+    return rows
+
+def _measure(read):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        rows = read()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rows, elapsed, peak
+
+def benchmark_excel_engines(zip_file_path, sheet_name="hoja1", engines=None, repeat=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Medir tiempo y memoria de lectura de un ZIP del SIAT con cada motor.
+
+    El pico de memoria se mide con tracemalloc, que cubre las asignaciones de
+    Python y de numpy/pandas pero no las internas de lectores nativos.
+
+    Args:
+        zip_file_path (str): Ruta al ZIP del SIAT
+        sheet_name (str): Nombre de la hoja a leer
+        engines (list, optional): Motores a medir; por defecto todos los instalados
+        repeat (int): Repeticiones por motor (se informa la mejor)
+        chunksize (int): Tamaño de bloque para la lectura por bloques
+
+    Returns:
+        list: Un dict por motor con engine, rows, seconds y peak_mb
+    """
+    if engines is None:
+        engines = available_excel_engines() + [STREAMING_ENGINE]
+    results = []
+    for engine in engines:
+        if engine == STREAMING_ENGINE:
+            read = lambda: _read_streaming(zip_file_path, sheet_name, chunksize)
+        else:
+            read = lambda engine=engine: len(process_zipped_sales_excel(zip_file_path, sheet_name=sheet_name, engine=engine))
+        best = None
+        for _ in range(max(1, repeat)):
+            rows, elapsed, peak = _measure(read)
+            if best is None or elapsed < best[1]:
+                best = (rows, elapsed, peak)
+        results.append({
+            'engine': engine,
+            'rows': best[0],
+            'seconds': best[1],
+            'peak_mb': best[2] / (1024 * 1024),
+        })
+    return results
+
+def print_benchmark(results):
+    """Mostrar los resultados de benchmark_excel_engines ordenados por tiempo."""
+    print(f"\n{'Motor':<22}{'Filas':>10}{'Tiempo (s)':>14}{'Memoria (MB)':>16}")
+    for row in sorted(results, key=lambda r: r['seconds']):
+        print(f"{row['engine']:<22}{row['rows']:>10,}{row['seconds']:>14.2f}{row['peak_mb']:>16.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparar motores de lectura de Excel sobre un ZIP del SIAT.")
+    parser.add_argument('zip_file', help='Ruta al ZIP del SIAT (ej. data/2025/01VentasXlsx.zip)')
+    parser.add_argument('--sheet', default='hoja1', help='Hoja a leer')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeticiones por motor')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Filas por bloque en la lectura por bloques')
+    args = parser.parse_args()
+    print_benchmark(benchmark_excel_engines(args.zip_file, args.sheet, repeat=args.repeat, chunksize=args.chunksize))
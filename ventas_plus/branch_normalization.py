@@ -1,6 +1,16 @@
 """
-Funciones específicas para la normalización de códigos de sucursal.
+Funciones específicas para la normalización de códigos de sucursal, y
+utilidades para aplicar normalizaciones escalares a columnas completas.
 """
+import numpy as np
+import pandas as pd
+
+# Enteros que se representan exactamente como float (los escalares pasan por float())
+MAX_EXACT_INT = 2 ** 53
+
+# Columnas object cuyos valores iguales siempre producen el mismo resultado.
+# En las demás (p. ej. enteros y floats mezclados) 5 == 5.0 pero str() difiere.
+HOMOGENEOUS_KINDS = ('string', 'integer', 'floating', 'boolean', 'empty')
 
 def normalize_branch_code(code):
     """
@@ -21,10 +31,8 @@ def normalize_branch_code(code):
         >>> normalize_branch_code(5.0) == normalize_branch_code("5")      # True
         >>> normalize_branch_code(None) == ""                            # True
     """
-    import pandas as pd
-    
     # Handle None and NaN values
-    if code is None or (hasattr(pd, 'isna') and pd.isna(code)):
+    if code is None or pd.isna(code):
         return ''
         
     # Convert input to string and clean it
@@ -52,3 +60,126 @@ def normalize_branch_code(code):
         if not normalized or normalized == '.':
             return '0'
         return normalized
+
+
+def map_distinct_values(series, func, fast_path=None):
+    """
+    Aplicar una función escalar a una columna evaluándola una sola vez por valor distinto.
+
+    Args:
+        series (Series): Columna a transformar
+        func (callable): Función escalar de referencia
+        fast_path (callable, optional): Recibe los valores distintos (Series sin nulos) y
+            devuelve (máscara de valores resueltos, resultados para esos valores) usando
+            operaciones vectorizadas; el resto se resuelve con ``func``
+
+    Returns:
+        Series: Resultado de ``func`` para cada fila (dtype object)
+
+    Los valores nulos se evalúan uno por uno con ``func`` para conservar su
+    comportamiento exacto (None y NaN no siempre producen lo mismo).
+    """
+    if series.dtype == object and value_kind(series) not in HOMOGENEOUS_KINDS:
+        return _map_by_type_and_value(series, func)
+    codes, uniques = pd.factorize(series)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    pending = np.ones(len(uniques), dtype=bool)
+    if fast_path is not None and len(uniques):
+        handled, values = fast_path(pd.Series(uniques))
+        mapped[:-1][handled] = values
+        pending = ~handled
+    if pending.any():
+        mapped[:-1][pending] = [func(val) for val in uniques[pending]]
+    result = mapped[codes]
+    nulls = codes == -1
+    if nulls.any():
+        result[nulls] = [func(val) for val in series.to_numpy(dtype=object)[nulls]]
+    return pd.Series(result, index=series.index, dtype=object)
+
+def _map_by_type_and_value(series, func):
+    """Memo por (tipo, valor) para columnas object con tipos mezclados."""
+    memo = {}
+    result = np.empty(len(series), dtype=object)
+    for i, val in enumerate(series.to_numpy(dtype=object)):
+        try:
+            key = (type(val), val)
+            if key not in memo:
+                memo[key] = func(val)
+            result[i] = memo[key]
+        except TypeError:
+            result[i] = func(val)
+    return pd.Series(result, index=series.index, dtype=object)
+
+def value_kind(uniques):
+    """Tipo común de los valores (sin nulos): 'string', 'integer', 'floating' u otro."""
+    return pd.api.types.infer_dtype(uniques, skipna=True)
+
+def exact_integers(uniques):
+    """Enteros representables exactamente como float, como máscara y como int64."""
+    try:
+        values = np.asarray(uniques.to_numpy(), dtype='int64')
+    except (OverflowError, TypeError, ValueError):
+        return np.zeros(len(uniques), dtype=bool), None
+    return np.abs(values) < MAX_EXACT_INT, values
+
+def integral_floats(uniques, limit=MAX_EXACT_INT):
+    """Floats finitos sin decimales y menores que ``limit``, como máscara y como int64."""
+    values = uniques.to_numpy(dtype='float64')
+    with np.errstate(invalid='ignore'):
+        mask = np.isfinite(values) & (np.abs(values) < limit) & (values == np.trunc(values))
+    return mask, np.where(mask, values, 0).astype('int64')
+
+# Espacios ASCII: str.strip() y float() los quitan; otros espacios Unicode se
+# dejan a la función escalar
+ASCII_SPACES = ' \t\n\r\f\v'
+
+def digit_strings(uniques, max_digits=None):
+    """
+    Textos formados solo por dígitos ASCII (con espacios ASCII alrededor).
+
+    Returns:
+        tuple: (máscara de textos que cumplen, esos textos sin espacios ni ceros a la izquierda)
+    """
+    texts = uniques.astype('str')
+    digits = f'[0-9]{{1,{max_digits}}}' if max_digits else '[0-9]+'
+    mask = texts.str.fullmatch(f'[{ASCII_SPACES}]*{digits}[{ASCII_SPACES}]*').to_numpy(dtype=bool)
+    return mask, strip_leading_zeros(texts[mask].str.strip(ASCII_SPACES))
+
+def strip_leading_zeros(texts):
+    """Quitar ceros a la izquierda; un texto que queda vacío es '0'."""
+    normalized = texts.str.lstrip('0')
+    return normalized.where(normalized != '', '0').to_numpy(dtype=object)
+
+def numeric_code_fast_path(uniques):
+    """Camino vectorizado común a sucursales y NIT: dígitos, enteros y floats enteros."""
+    handled = np.zeros(len(uniques), dtype=bool)
+    values = np.empty(len(uniques), dtype=object)
+    kind = value_kind(uniques)
+    if kind == 'string':
+        # Hasta 15 dígitos: el escalar pasa por float() sin perder precisión
+        handled, digits = digit_strings(uniques, max_digits=15)
+        values[handled] = digits
+    elif kind == 'integer':
+        handled, ints = exact_integers(uniques)
+        if ints is not None:
+            values[handled] = ints[handled].astype(str)
+    elif kind == 'floating':
+        handled, ints = integral_floats(uniques)
+        values[handled] = ints[handled].astype(str)
+    return handled, values[handled]
+
+def normalize_branch_code_series(codes):
+    """
+    Versión por columna de normalize_branch_code, con el mismo resultado para cada valor.
+
+    Los códigos de sucursal tienen pocos valores distintos: se normaliza cada
+    valor distinto una vez (los numéricos de forma vectorizada) y se expande
+    el resultado a toda la columna.
+
+    Args:
+        codes (Series): Códigos de sucursal
+
+    Returns:
+        Series: Códigos normalizados
+    """
+    return map_distinct_values(codes, normalize_branch_code, numeric_code_fast_path)
@@ -0,0 +1,66 @@
+"""
+Reglas declarativas de sucursales y sectores para los reportes de ventas.
+
+Cada regla indica qué sectores de una sucursal se reportan y en qué campo
+del resultado se cuentan sus facturas válidas. El análisis detallado, los
+totales SIAT por sucursal y el cliente de Hergo leen esta tabla, de modo que
+agregar una sucursal es solo agregar una entrada aquí.
+"""
+import pandas as pd
+
+# Sector de alquileres: se reporta aparte y se excluye de los totales de venta
+SECTOR_ALQUILERES = '02'
+
+BRANCH_RULES = [
+    {
+        'clave': 'central',
+        'nombre': 'CENTRAL',
+        'titulo': 'CENTRAL LA PAZ',
+        'sucursal': '0000',
+        'hergo_id': 0,
+        # sector -> (campo de facturas válidas, etiqueta en el reporte)
+        'sectores': {
+            '01': ('cantidad_validas_cv', 'CV - Sector 01'),
+            '35': ('cantidad_validas_cvb', 'CVB - Sector 35'),
+        },
+    },
+    {
+        'clave': 'potosi',
+        'nombre': 'POTOSI',
+        'titulo': 'POTOSÍ',
+        'sucursal': '0006',
+        'hergo_id': 6,
+        'sectores': {'01': ('cantidad_validas', None)},
+    },
+    {
+        'clave': 'santa_cruz',
+        'nombre': 'SANTA CRUZ',
+        'titulo': 'SANTA CRUZ',
+        'sucursal': '0005',
+        'hergo_id': 5,
+        'sectores': {'01': ('cantidad_validas', None)},
+    },
+]
+
+def hergo_branch_ids(rules=BRANCH_RULES):
+    """Nombre de sucursal -> id de sucursal en Hergo."""
+    return {rule['nombre']: rule['hergo_id'] for rule in rules}
+
+def compile_branch_rules(rules=BRANCH_RULES):
+    """
+    Compilar las reglas en una tabla de búsqueda por (SUCURSAL, SECTOR).
+
+    Args:
+        rules (list): Reglas de sucursal (ver BRANCH_RULES)
+
+    Returns:
+        DataFrame: Índice (SUCURSAL, SECTOR) con columnas 'clave' (sucursal del
+        reporte) y 'campo' (campo de facturas válidas)
+    """
+    rows = [
+        (rule['sucursal'], sector, rule['clave'], campo)
+        for rule in rules
+        for sector, (campo, _) in rule['sectores'].items()
+    ]
+    lookup = pd.DataFrame(rows, columns=['SUCURSAL', 'SECTOR', 'clave', 'campo'])
+    return lookup.set_index(['SUCURSAL', 'SECTOR'])
@@ -0,0 +1,194 @@
+"""
+Carga masiva por lotes de INSERT de varias filas.
+
+En lugar de enviar todas las filas en un solo ``executemany`` dentro de una
+única transacción, las filas se consumen de un iterable en lotes de tamaño
+fijo; cada lote se envía como un INSERT de varias filas, se informa el avance
+(filas/segundo) y se confirma por lote o al final de la corrida.
+
+Opcionalmente, ``load_data_local_infile`` escribe las filas en un archivo
+temporal delimitado por tabuladores y lo carga con ``LOAD DATA LOCAL INFILE``,
+el cargador masivo del servidor.
+"""
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 1000
+COMMIT_MODES = ("batch", "run")
+LOADERS = ("insert", "infile")
+
+# Errores de MySQL cuando el servidor o el cliente no permiten LOAD DATA LOCAL
+LOCAL_INFILE_ERRNOS = (1148, 2068, 3948)
+MAX_REPORTED_WARNINGS = 10
+
+class LocalInfileUnavailable(Exception):
+    """El servidor o la conexión no permiten LOAD DATA LOCAL INFILE."""
+
+def dataframe_rows(df, columns=None):
+    """
+    Tuplas de valores de un DataFrame, generadas de forma perezosa.
+
+    Cada columna se convierte una vez a un arreglo de objetos con None donde
+    hay nulos (NaN, NaT, NA) según la máscara de la columna; las tuplas se
+    arman al consumirlas, sin construir la lista completa de filas.
+
+    Args:
+        df (DataFrame): Filas a insertar
+        columns (list, optional): Columnas y orden (por defecto, todas)
+
+    Returns:
+        iterator: Tuplas en el orden de ``columns``
+    """
+    arrays = []
+    for col in (columns if columns is not None else df.columns):
+        values = df[col].to_numpy(dtype=object, copy=True)
+        values[df[col].isna().to_numpy()] = None
+        arrays.append(values)
+    return zip(*arrays)
+
+def multi_row_insert_sql(table, columns, n_rows):
+    """Sentencia INSERT con ``n_rows`` grupos de marcadores %s."""
+    group = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([group] * n_rows)
+
+def bulk_insert(conn, table, columns, rows, batch_size=DEFAULT_BATCH_SIZE, commit_mode="run", start_row=0, total=None):
+    """
+    Insertar filas por lotes de INSERT de varias filas.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        columns (list): Columnas a insertar, en el orden de cada fila
+        rows (iterable): Tuplas de valores; se consumen lote a lote
+        batch_size (int): Filas por sentencia INSERT
+        commit_mode (str): 'run' (por defecto) confirma una sola vez al final;
+            'batch' confirma cada lote (se puede reanudar desde la última
+            fila confirmada)
+        start_row (int): Filas iniciales a omitir (ya cargadas en una corrida anterior)
+        total (int, optional): Total de filas, solo para mostrar el avance
+
+    Returns:
+        int: Filas insertadas en esta corrida
+
+    Raises:
+        Exception: El error de la base; ``error.committed_rows`` indica
+        cuántas filas (contando start_row) quedaron confirmadas
+    """
+    if commit_mode not in COMMIT_MODES:
+        raise ValueError(f"Modo de confirmación desconocido: {commit_mode}")
+    rows = iter(rows)
+    if start_row:
+        next(islice(rows, start_row, start_row), None)
+
+    cursor = conn.cursor()
+    inserted = 0
+    committed = start_row
+    started = time.perf_counter()
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            params = [value for row in batch for value in row]
+            cursor.execute(multi_row_insert_sql(table, columns, len(batch)), params)
+            inserted += len(batch)
+            if commit_mode == "batch":
+                conn.commit()
+                committed = start_row + inserted
+            elapsed = time.perf_counter() - started
+            rate = inserted / elapsed if elapsed > 0 else 0.0
+            progress = f"{start_row + inserted:,}/{total:,}" if total else f"{start_row + inserted:,}"
+            sys.stdout.write(f"\r   Insertadas {progress} filas ({rate:,.0f} filas/s)")
+            sys.stdout.flush()
+        if commit_mode == "run":
+            conn.commit()
+            committed = start_row + inserted
+    except Exception as e:
+        sys.stdout.write("\n")
+        e.committed_rows = committed
+        raise
+    finally:
+        cursor.close()
+    if inserted:
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+    return inserted
+
+def _infile_value(value):
+    """Valor en el formato de LOAD DATA (tabuladores, escape con \\ y \\N para NULL)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        value = int(value)
+    text = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+                .replace("\n", "\\n").replace("\r", "\\r"))
+
+def write_infile(rows, path):
+    """
+    Escribir filas en un archivo delimitado por tabuladores para LOAD DATA.
+
+    Returns:
+        int: Filas escritas
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for row in rows:
+            f.write("\t".join(_infile_value(value) for value in row) + "\n")
+            count += 1
+    return count
+
+def load_data_local_infile(conn, table, columns, rows, tmp_dir=None):
+    """
+    Cargar filas con LOAD DATA LOCAL INFILE desde un archivo temporal.
+
+    La conexión debe abrirse con ``allow_local_infile=True`` y el servidor
+    tener ``local_infile`` habilitado; si no, se lanza LocalInfileUnavailable
+    para que el llamador use bulk_insert.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        columns (list): Columnas del archivo, en el orden de SHOW COLUMNS
+        rows (iterable): Tuplas de valores en el orden de ``columns``
+        tmp_dir (str, optional): Directorio del archivo temporal
+
+    Returns:
+        tuple: (filas escritas en el archivo, filas cargadas según el
+        servidor, lista de advertencias (nivel, código, mensaje))
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=".tsv", dir=tmp_dir)
+    os.close(fd)
+    cursor = conn.cursor()
+    try:
+        written = write_infile(rows, path)
+        sql = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})"
+        )
+        started = time.perf_counter()
+        try:
+            cursor.execute(sql, (path,))
+        except Exception as e:
+            if getattr(e, "errno", None) in LOCAL_INFILE_ERRNOS:
+                raise LocalInfileUnavailable(str(e)) from e
+            raise
+        loaded = cursor.rowcount
+        cursor.execute("SHOW WARNINGS")
+        warnings = cursor.fetchall()
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        rate = loaded / elapsed if elapsed > 0 else 0.0
+        print(f"   LOAD DATA: {loaded:,} de {written:,} filas cargadas ({rate:,.0f} filas/s)")
+        for level, code, message in warnings[:MAX_REPORTED_WARNINGS]:
+            print(f"   ⚠️  {level} {code}: {message}")
+        if len(warnings) > MAX_REPORTED_WARNINGS:
+            print(f"   ... y {len(warnings) - MAX_REPORTED_WARNINGS} advertencias más")
+        return written, loaded, warnings
+    finally:
+        cursor.close()
+        os.remove(path)
@@ -2,8 +2,18 @@
 Módulo para comparación de facturas SIAT vs Inventario y reporte de discrepancias.
 """
 
+import numpy as np
 import pandas as pd
-from ventas_plus.branch_normalization import normalize_branch_code
+from ventas_plus.branch_normalization import (
+    digit_strings,
+    exact_integers,
+    integral_floats,
+    map_distinct_values,
+    normalize_branch_code_series,
+    numeric_code_fast_path,
+    strip_leading_zeros,
+    value_kind,
+)
 
 def normalize_factura_num(val):
     """
@@ -53,6 +63,236 @@ def normalize_nit(val):
         except Exception:
             return str(val).strip()
 
+def _factura_num_fast_path(uniques):
+    """Camino vectorizado de normalize_factura_num: textos sin punto, enteros y floats enteros."""
+    handled = np.zeros(len(uniques), dtype=bool)
+    values = np.empty(len(uniques), dtype=object)
+    kind = value_kind(uniques)
+    if kind == 'string':
+        # Solo dígitos: el escalar quita espacios y ceros a la izquierda sin convertir
+        handled, digits = digit_strings(uniques)
+        values[handled] = digits
+    elif kind == 'integer':
+        handled, ints = exact_integers(uniques)
+        if ints is not None:
+            values[handled] = strip_leading_zeros(pd.Series(ints[handled].astype(str)))
+    elif kind == 'floating':
+        # Menores que 1e16: str() los escribe con punto decimal ('5.0')
+        handled, ints = integral_floats(uniques, limit=1e16)
+        values[handled] = ints[handled].astype(str)
+    return handled, values[handled]
+
+def normalize_factura_num_series(values):
+    """
+    Versión por columna de normalize_factura_num, con el mismo resultado para cada valor.
+    """
+    return map_distinct_values(values, normalize_factura_num, _factura_num_fast_path)
+
+def normalize_nit_series(values):
+    """
+    Versión por columna de normalize_nit, con el mismo resultado para cada valor.
+    """
+    return map_distinct_values(values, normalize_nit, numeric_code_fast_path)
+
+def _column(df, name, default):
+    """Columna del DataFrame, o una columna constante si no existe (como row.get)."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _join_observations(observations, mask, messages):
+    """Agregar ``messages`` a las observaciones de las filas marcadas en ``mask``, separadas por '; '."""
+    current = observations[mask]
+    observations[mask] = np.where(current == '', messages, current + '; ' + messages)
+
+def _field_discrepancy_observations(merged):
+    """
+    Comparar por columnas los campos de SIAT e inventario de la verificación completa.
+
+    Cada campo se normaliza una vez por valor distinto, la diferencia se
+    calcula como un vector booleano y el texto de la observación se arma solo
+    para las filas que difieren. Las facturas sin datos de inventario o de
+    alquiler (SECTOR 02) no se comparan.
+
+    Args:
+        merged (DataFrame): Unión SIAT + inventario por autorización
+
+    Returns:
+        ndarray: Observaciones por fila ('' si no hay diferencias), en el orden
+        Nº Factura, Sucursal, Fecha, NIT, Importe, Estado
+    """
+    observations = np.full(len(merged), '', dtype=object)
+    active = (_column(merged, 'fechaFac', None).notna() & (map_distinct_values(_column(merged, 'SECTOR', ''), str) != '02')).to_numpy()
+    if not active.any():
+        return observations
+    rows = merged[active]
+
+    # (campo, filas que difieren, valor SIAT, valor INV, formato del valor en el mensaje)
+    checks = []
+    # Número de factura normalizado (sin decimales ni ceros a la izquierda)
+    nfact_siat = normalize_factura_num_series(_column(rows, 'Nº DE LA FACTURA', None))
+    nfact_inv = normalize_factura_num_series(_column(rows, 'nFactura', None))
+    checks.append(('Nº Factura', nfact_siat != nfact_inv, nfact_siat, nfact_inv, None))
+    # Sucursal normalizada
+    suc_siat = normalize_branch_code_series(_column(rows, 'SUCURSAL', ''))
+    suc_inv = normalize_branch_code_series(_column(rows, 'codigoSucursal', ''))
+    checks.append(('Sucursal', suc_siat != suc_inv, suc_siat, suc_inv, None))
+    # Fecha (texto)
+    fecha_siat = map_distinct_values(_column(rows, 'FECHA DE LA FACTURA', ''), str)
+    fecha_inv = map_distinct_values(_column(rows, 'fechaFac', ''), str)
+    checks.append(('Fecha', fecha_siat != fecha_inv, fecha_siat, fecha_inv, None))
+    # NIT normalizado
+    nit_siat = normalize_nit_series(_column(rows, 'NIT / CI CLIENTE', ''))
+    nit_inv = normalize_nit_series(_column(rows, 'nit', ''))
+    checks.append(('NIT', nit_siat != nit_inv, nit_siat, nit_inv, None))
+    # Importe con tolerancia de 0.01
+    importe_siat = _column(rows, 'IMPORTE TOTAL DE LA VENTA', 0)
+    importe_inv = _column(rows, 'importeTotal', 0)
+    importe_diff = (pd.to_numeric(importe_siat, errors='coerce') - pd.to_numeric(importe_inv, errors='coerce')).abs() > 0.01
+    checks.append(('Importe', importe_diff, importe_siat, importe_inv, lambda val: pd.to_numeric(val, errors='coerce')))
+    # Estado (el inventario usa V/A)
+    estado_siat = map_distinct_values(_column(rows, 'ESTADO', ''), str)
+    estado_inv = map_distinct_values(_column(rows, 'estado', ''), lambda val: {'V': 'VALIDA', 'A': 'ANULADA'}.get(str(val), str(val)))
+    checks.append(('Estado', estado_siat != estado_inv, estado_siat, estado_inv, None))
+
+    row_observations = np.full(len(rows), '', dtype=object)
+    for field, differs, siat_values, inv_values, fmt in checks:
+        mask = differs.to_numpy()
+        if not mask.any():
+            continue
+        siat_values = siat_values[mask]
+        inv_values = inv_values[mask]
+        if fmt is not None:
+            siat_values = siat_values.map(fmt)
+            inv_values = inv_values.map(fmt)
+        messages = np.array([f"{field}: SIAT={a}, INV={b}" for a, b in zip(siat_values, inv_values)], dtype=object)
+        _join_observations(row_observations, mask, messages)
+    observations[active] = row_observations
+    return observations
+
+def _values_differ(left, right):
+    """
+    Equivalente por columnas de comparar ``a != b`` fila a fila: un valor
+    nulo (NaN) difiere de cualquier otro, salvo None frente a None.
+
+    Args:
+        left (Series): Valores de un lado
+        right (Series): Valores del otro lado, alineados por posición
+
+    Returns:
+        ndarray: Vector booleano con las filas que difieren
+    """
+    left = left.to_numpy(dtype=object)
+    right = right.to_numpy(dtype=object)
+    left_null = pd.isna(left)
+    right_null = pd.isna(right)
+    differs = np.ones(len(left), dtype=bool)
+    both = ~(left_null | right_null)
+    differs[both] = left[both] != right[both]
+    both_null = np.flatnonzero(left_null & right_null)
+    differs[both_null] = [left[i] is not None or right[i] is not None for i in both_null]
+    return differs
+
+def _as_float(values):
+    """
+    Copia float64 de una columna numérica para compararla: los nulos (pd.NA
+    de Int64) quedan como NaN. La columna original conserva sus enteros.
+    """
+    return pd.Series(values.to_numpy(dtype='float64', na_value=np.nan), index=values.index)
+
+def _matched_invoice_observations(comparison):
+    """
+    Comparar por columnas las facturas que coinciden en SIAT e inventario.
+
+    Args:
+        comparison (DataFrame): Facturas coincidentes con columnas *_siat / *_inv
+            ya normalizadas y 'diferencia_importe' calculada
+
+    Returns:
+        ndarray: Observaciones por fila ('' si no hay diferencias), en el orden
+        Fecha, Nº Factura, NIT, Importe, Estado, Sucursal
+    """
+    checks = [
+        ('Fecha', _values_differ(comparison['fecha_siat'], comparison['fecha_inv']), 'fecha_siat', 'fecha_inv'),
+        ('Nº Factura', _values_differ(_as_float(comparison['nfactura_siat']), _as_float(comparison['nfactura_inv'])),
+         'nfactura_siat', 'nfactura_inv'),
+        ('NIT', _values_differ(comparison['nit_siat'], comparison['nit_inv']), 'nit_siat', 'nit_inv'),
+        ('Importe', (comparison['diferencia_importe'].abs() > 0.01).to_numpy(dtype=bool), 'importe_siat', 'importe_inv'),
+        ('Estado', _values_differ(comparison['estado_siat'], comparison['estado_inv']), 'estado_siat', 'estado_inv'),
+        ('Sucursal', _values_differ(comparison['sucursal_siat_norm'], comparison['sucursal_inv_norm']), 'sucursal_siat', 'sucursal_inv'),
+    ]
+    observations = np.full(len(comparison), '', dtype=object)
+    for field, mask, siat_column, inv_column in checks:
+        if not mask.any():
+            continue
+        siat_values = comparison[siat_column].to_numpy(dtype=object)[mask]
+        inv_values = comparison[inv_column].to_numpy(dtype=object)[mask]
+        messages = np.array([f"{field}: SIAT={a}, INV={b}" for a, b in zip(siat_values, inv_values)], dtype=object)
+        _join_observations(observations, mask, messages)
+    return observations
+
+def _append_observations(base, extra):
+    """Concatenar observaciones nuevas a la columna OBSERVACIONES existente."""
+    base = base.to_numpy(dtype=object).copy()
+    mask = extra != ''
+    if mask.any():
+        _join_observations(base, mask, extra[mask])
+    return base
+
+# Columna auxiliar con la clave entera del CUF para las uniones
+AUTH_KEY = '_clave_cuf'
+
+def authorization_keys(siat_codes, inventory_codes):
+    """
+    Convertir los códigos de autorización (CUF) de ambos lados en claves enteras.
+
+    Los códigos se limpian de espacios y se factorizan juntos una sola vez, de
+    modo que el mismo CUF recibe la misma clave en SIAT y en inventario y las
+    uniones comparan enteros en lugar de cadenas hexadecimales largas. Las
+    claves siguen el orden alfabético de los códigos, así una unión externa
+    (que ordena por clave) devuelve las filas en el mismo orden que al unir
+    por el texto.
+
+    Args:
+        siat_codes (Series): Códigos de autorización del SIAT
+        inventory_codes (Series): Códigos de autorización del inventario
+
+    Returns:
+        tuple: (claves SIAT, claves inventario, cantidad de CUF distintos)
+    """
+    codes = pd.concat([siat_codes.str.strip(), inventory_codes.str.strip()], ignore_index=True)
+    keys, uniques = pd.factorize(codes, sort=True, use_na_sentinel=False)
+    return keys[:len(siat_codes)], keys[len(siat_codes):], len(uniques)
+
+def partition_by_authorization(siat, inventory):
+    """
+    Separar facturas del SIAT y del inventario según su código de autorización.
+
+    Args:
+        siat (DataFrame): Facturas del SIAT (columna 'CODIGO DE AUTORIZACIÓN')
+        inventory (DataFrame): Facturas del inventario (columna 'autorizacion')
+
+    Returns:
+        dict: 'siat_matched' e 'inventory_matched' (filas con CUF en ambos lados,
+        con la clave entera en AUTH_KEY para unirlas), 'siat_only',
+        'inventory_only' y los conteos por CUF distinto 'matching_count',
+        'siat_only_count' e 'inventory_only_count'
+    """
+    siat_keys, inventory_keys, n_keys = authorization_keys(siat['CODIGO DE AUTORIZACIÓN'], inventory['autorizacion'])
+    in_siat = np.bincount(siat_keys, minlength=n_keys) > 0
+    in_inventory = np.bincount(inventory_keys, minlength=n_keys) > 0
+    siat_matched = in_inventory[siat_keys]
+    inventory_matched = in_siat[inventory_keys]
+    return {
+        'siat_matched': siat[siat_matched].assign(**{AUTH_KEY: siat_keys[siat_matched]}),
+        'inventory_matched': inventory[inventory_matched].assign(**{AUTH_KEY: inventory_keys[inventory_matched]}),
+        'siat_only': siat[~siat_matched],
+        'inventory_only': inventory[~inventory_matched],
+        'matching_count': int((in_siat & in_inventory).sum()),
+        'siat_only_count': int((in_siat & ~in_inventory).sum()),
+        'inventory_only_count': int((in_inventory & ~in_siat).sum()),
+    }
+
 def compare_siat_with_inventory(siat_data, inventory_data):
     """
     Comparar facturas del SIAT con las del sistema de inventarios.
@@ -77,36 +317,30 @@ def compare_siat_with_inventory(siat_data, inventory_data):
     siat_no_alquileres = siat_data[siat_data['SECTOR'] != '02']
     results['total_siat_no_alquileres'] = len(siat_no_alquileres)
 
-    # Crear Series con autorizaciones para comparación rápida
-    siat_auths = set(siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].str.strip())
-    inventory_auths = set(inventory_data['autorizacion'].str.strip())
+    # Separar coincidentes, solo SIAT y solo inventario con claves enteras del CUF
+    partitions = partition_by_authorization(siat_no_alquileres, inventory_data)
+    results['matching_invoices'] = partitions['matching_count']
 
-    # Encontrar facturas que coinciden
-    matching_auths = siat_auths.intersection(inventory_auths)
-    results['matching_invoices'] = len(matching_auths)
-
-    # Encontrar facturas que están en SIAT pero no en inventario
-    missing_in_inventory = siat_auths - inventory_auths
-    results['missing_in_inventory_count'] = len(missing_in_inventory)
-    if len(missing_in_inventory) > 0:
-        missing_df = siat_no_alquileres[siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].isin(missing_in_inventory)]
+    # Facturas que están en SIAT pero no en inventario
+    results['missing_in_inventory_count'] = partitions['siat_only_count']
+    if partitions['siat_only_count'] > 0:
+        missing_df = partitions['siat_only']
         results['missing_in_inventory'] = missing_df[['CODIGO DE AUTORIZACIÓN', 'IMPORTE TOTAL DE LA VENTA', 'ESTADO']].to_dict('records')
 
-    # Encontrar facturas que están en inventario pero no en SIAT
-    missing_in_siat = inventory_auths - siat_auths
-    results['missing_in_siat_count'] = len(missing_in_siat)
-    if len(missing_in_siat) > 0:
-        missing_df = inventory_data[inventory_data['autorizacion'].isin(missing_in_siat)]
+    # Facturas que están en inventario pero no en SIAT
+    results['missing_in_siat_count'] = partitions['inventory_only_count']
+    if partitions['inventory_only_count'] > 0:
+        missing_df = partitions['inventory_only']
         results['missing_in_siat'] = missing_df[['autorizacion', 'importeTotal', 'estado']].to_dict('records')
 
     # Verificar diferencias en campos específicos para facturas que coinciden
-    if len(matching_auths) > 0:
-        siat_matching = siat_no_alquileres[siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].isin(matching_auths)]
-        inventory_matching = inventory_data[inventory_data['autorizacion'].isin(matching_auths)]
+    if partitions['matching_count'] > 0:
+        siat_matching = partitions['siat_matched']
+        inventory_matching = partitions['inventory_matched']
         
         # Preparar DataFrames para discrepancias
         # Para facturas no encontradas en inventario
-        missing_in_inv_df = siat_no_alquileres[~siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].isin(inventory_auths)].copy()
+        missing_in_inv_df = partitions['siat_only'].copy()
         
         # Primero hacer el renombre de columnas
         missing_in_inv_df.rename(columns={
@@ -122,7 +356,7 @@ def compare_siat_with_inventory(siat_data, inventory_data):
         # Luego agregar las columnas nuevas
         missing_in_inv_df['OBSERVACIONES'] = 'Factura no encontrada en sistema de inventarios'
         missing_in_inv_df['diferencia_importe'] = missing_in_inv_df['importe_siat']
-        missing_in_inv_df['sucursal_siat_norm'] = missing_in_inv_df['sucursal_siat'].apply(normalize_branch_code)
+        missing_in_inv_df['sucursal_siat_norm'] = normalize_branch_code_series(missing_in_inv_df['sucursal_siat'])
         missing_in_inv_df['sucursal_inv_norm'] = ''
         missing_in_inv_df['fecha_inv'] = None
         missing_in_inv_df['nfactura_inv'] = None
@@ -141,7 +375,7 @@ def compare_siat_with_inventory(siat_data, inventory_data):
         # print(f"Número de autorizaciones únicas: {missing_in_inv_df['autorizacion'].nunique()}")
         
         # Para facturas no encontradas en SIAT
-        missing_in_siat_df = inventory_data[~inventory_data['autorizacion'].isin(siat_auths)].copy()
+        missing_in_siat_df = partitions['inventory_only'].copy()
         missing_in_siat_df['OBSERVACIONES'] = 'Factura no encontrada en SIAT'
         missing_in_siat_df.rename(columns={
             'fechaFac': 'fecha_inv',
@@ -154,7 +388,7 @@ def compare_siat_with_inventory(siat_data, inventory_data):
         # Agregar columnas faltantes
         missing_in_siat_df['diferencia_importe'] = -missing_in_siat_df['importe_inv']
         missing_in_siat_df['sucursal_siat_norm'] = ''
-        missing_in_siat_df['sucursal_inv_norm'] = missing_in_siat_df['sucursal_inv'].apply(normalize_branch_code)
+        missing_in_siat_df['sucursal_inv_norm'] = normalize_branch_code_series(missing_in_siat_df['sucursal_inv'])
         missing_in_siat_df['fecha_siat'] = None
         missing_in_siat_df['nfactura_siat'] = None
         missing_in_siat_df['nit_siat'] = None
@@ -171,10 +405,11 @@ def compare_siat_with_inventory(siat_data, inventory_data):
             'NOMBRE O RAZON SOCIAL',
             'IMPORTE TOTAL DE LA VENTA',
             'ESTADO',
-            'SUCURSAL'
+            'SUCURSAL',
+            AUTH_KEY
         ]].copy()
         inventory_compare = inventory_matching[[
-            'autorizacion',
+            AUTH_KEY,
             'fechaFac',
             'nFactura',
             'nit',
@@ -202,36 +437,22 @@ def compare_siat_with_inventory(siat_data, inventory_data):
             'estado': 'estado_inv',
             'codigoSucursal': 'sucursal_inv'
         }, inplace=True)
-        comparison = pd.merge(siat_compare, inventory_compare, on='autorizacion')
+        comparison = pd.merge(siat_compare, inventory_compare, on=AUTH_KEY).drop(columns=AUTH_KEY)
         comparison['OBSERVACIONES'] = ''
         comparison['nfactura_siat'] = pd.to_numeric(comparison['nfactura_siat'], errors='coerce')
         comparison['nfactura_inv'] = pd.to_numeric(comparison['nfactura_inv'], errors='coerce')
         comparison['nit_siat'] = comparison['nit_siat'].astype(str).str.strip()
         comparison['nit_inv'] = comparison['nit_inv'].astype(str).str.strip()        # Usando la función importada de branch_normalization.py
-        comparison['sucursal_siat_norm'] = comparison['sucursal_siat'].apply(normalize_branch_code)
-        comparison['sucursal_inv_norm'] = comparison['sucursal_inv'].apply(normalize_branch_code)
+        comparison['sucursal_siat_norm'] = normalize_branch_code_series(comparison['sucursal_siat'])
+        comparison['sucursal_inv_norm'] = normalize_branch_code_series(comparison['sucursal_inv'])
         comparison['estado_inv'] = comparison['estado_inv'].replace({'V': 'VALIDA', 'A': 'ANULADA'})
-        for i, row in comparison.iterrows():
-            observaciones = []
-            if row['fecha_siat'] != row['fecha_inv']:
-                observaciones.append(f"Fecha: SIAT={row['fecha_siat']}, INV={row['fecha_inv']}")
-            if row['nfactura_siat'] != row['nfactura_inv']:
-                observaciones.append(f"Nº Factura: SIAT={row['nfactura_siat']}, INV={row['nfactura_inv']}")
-            if row['nit_siat'] != row['nit_inv']:
-                observaciones.append(f"NIT: SIAT={row['nit_siat']}, INV={row['nit_inv']}")
-            if abs(row['importe_siat'] - row['importe_inv']) > 0.01:
-                observaciones.append(f"Importe: SIAT={row['importe_siat']}, INV={row['importe_inv']}")
-            if row['estado_siat'] != row['estado_inv']:
-                observaciones.append(f"Estado: SIAT={row['estado_siat']}, INV={row['estado_inv']}")
-            if row['sucursal_siat_norm'] != row['sucursal_inv_norm']:
-                observaciones.append(f"Sucursal: SIAT={row['sucursal_siat']}, INV={row['sucursal_inv']}")
-            if observaciones:
-                comparison.at[i, 'OBSERVACIONES'] = "; ".join(observaciones)
-                results['field_discrepancies'].append({
-                    'autorizacion': row['autorizacion'],
-                    'observaciones': "; ".join(observaciones)
-                })
         comparison['diferencia_importe'] = comparison['importe_siat'] - comparison['importe_inv']
+        comparison['OBSERVACIONES'] = _matched_invoice_observations(comparison)
+        with_observations = comparison[comparison['OBSERVACIONES'] != '']
+        results['field_discrepancies'] = [
+            {'autorizacion': autorizacion, 'observaciones': observaciones}
+            for autorizacion, observaciones in zip(with_observations['autorizacion'], with_observations['OBSERVACIONES'])
+        ]
         differences = comparison[abs(comparison['diferencia_importe']) > 0.01]
         if len(differences) > 0:
             results['amount_differences_count'] = len(differences)
@@ -283,77 +504,34 @@ def compare_siat_with_inventory(siat_data, inventory_data):
         else:
             results['comparison_dataframe'] = pd.DataFrame()
             
-        # Generar detalles de diferencias de importe
-        if 'diferencia_importe' in comparison.columns:
-            differences = comparison[abs(comparison['diferencia_importe']) > 0.01]
-            if len(differences) > 0:
-                results['amount_differences_count'] = len(differences)
-                results['amount_difference'] = differences['diferencia_importe'].sum()
-                results['amount_difference_details'] = differences.to_dict('records')
-                
+
     # --- NUEVO: Generar DataFrame de verificación completa ---
     # Unir SIAT con inventario (outer join, todas las facturas de ambos lados)
-    siat_full = siat_data.copy()
-    siat_full['autorizacion'] = siat_full['CODIGO DE AUTORIZACIÓN'].astype(str).str.strip()
-    inventory_data['autorizacion'] = inventory_data['autorizacion'].astype(str).str.strip()
+    # por la clave entera del CUF, sin modificar el DataFrame del inventario recibido
+    siat_codes = siat_data['CODIGO DE AUTORIZACIÓN'].astype(str)
+    siat_keys, inventory_keys, _ = authorization_keys(siat_codes, inventory_data['autorizacion'].astype(str))
+    siat_full = siat_data.assign(**{'autorizacion': siat_codes.str.strip(), AUTH_KEY: siat_keys})
+    # Las filas sin SIAT se descartan más abajo, así que 'autorizacion' sale del lado SIAT
+    inventory_full = inventory_data.drop(columns='autorizacion').assign(**{AUTH_KEY: inventory_keys})
     merged = pd.merge(
         siat_full,
-        inventory_data,
-        on='autorizacion',
+        inventory_full,
+        on=AUTH_KEY,
         how='outer',  # Cambiado de 'left' a 'outer' para incluir todas las facturas
         suffixes=('_siat', '_inv')
-    )
-    merged['OBSERVACIONES'] = ''
-    # Marcar facturas de alquiler
-    merged['OBSERVACIONES'] = merged.apply(
-        lambda row: 'Factura de alquiler (SECTOR 02)' if str(row.get('SECTOR', '')) == '02' else '', axis=1)
-    # Marcar facturas no encontradas en inventario
-    merged['OBSERVACIONES'] = merged.apply(
-        lambda row: (row['OBSERVACIONES'] + '; ' if row['OBSERVACIONES'] else '') + 'No existe en inventarios' if pd.isna(row.get('fechaFac')) else row['OBSERVACIONES'], axis=1)
-    # Marcar facturas que están en inventario pero no en SIAT
-    merged['OBSERVACIONES'] = merged.apply(
-        lambda row: (row['OBSERVACIONES'] + '; ' if row['OBSERVACIONES'] else '') + 'No existe en SIAT' if pd.isna(row.get('CODIGO DE AUTORIZACIÓN')) else row['OBSERVACIONES'], axis=1)
+    ).drop(columns=AUTH_KEY)
+    # Marcar alquileres y facturas sin inventario con máscaras sobre la unión
+    alquiler = (map_distinct_values(_column(merged, 'SECTOR', ''), str) == '02').to_numpy()
+    sin_inventario = _column(merged, 'fechaFac', None).isna().to_numpy()
+    sin_siat = _column(merged, 'CODIGO DE AUTORIZACIÓN', None).isna().to_numpy()
+    observaciones = np.full(len(merged), '', dtype=object)
+    observaciones[alquiler] = 'Factura de alquiler (SECTOR 02)'
+    _join_observations(observaciones, sin_inventario, 'No existe en inventarios')
+    merged['OBSERVACIONES'] = observaciones
     # Eliminar del DataFrame de verificación completa las facturas que no existen en SIAT (caso fatal)
-    merged = merged[~merged['OBSERVACIONES'].str.contains('No existe en SIAT', na=False)]
+    merged = merged[~sin_siat]
     # Marcar discrepancias en campos (solo si existe en inventario y no es alquiler)
-    def check_discrepancias(row):
-        if pd.isna(row.get('fechaFac')) or str(row.get('SECTOR', '')) == '02':
-            return row['OBSERVACIONES']
-        obs = []
-        # Normalizar número de factura para comparar como string sin decimales
-        nfact_siat = normalize_factura_num(row.get('Nº DE LA FACTURA', None))
-        nfact_inv = normalize_factura_num(row.get('nFactura', None))
-        if nfact_siat != nfact_inv:
-            obs.append(f"Nº Factura: SIAT={nfact_siat}, INV={nfact_inv}")
-        # Normalizar sucursal para comparar (sin decimales, sin ceros a la izquierda)
-        suc_siat = normalize_branch_code(row.get('SUCURSAL', ''))
-        suc_inv = normalize_branch_code(row.get('codigoSucursal', ''))
-        if suc_siat != suc_inv:
-            obs.append(f"Sucursal: SIAT={suc_siat}, INV={suc_inv}")
-        # Comparar fecha
-        if str(row.get('FECHA DE LA FACTURA', '')) != str(row.get('fechaFac', '')):
-            obs.append(f"Fecha: SIAT={row.get('FECHA DE LA FACTURA','')}, INV={row.get('fechaFac','')}")
-        # Comparar NIT normalizado
-        nit_siat = normalize_nit(row.get('NIT / CI CLIENTE', ''))
-        nit_inv = normalize_nit(row.get('nit', ''))
-        if nit_siat != nit_inv:
-            obs.append(f"NIT: SIAT={nit_siat}, INV={nit_inv}")
-        # Comparar importe
-        siat_importe = pd.to_numeric(row.get('IMPORTE TOTAL DE LA VENTA', 0), errors='coerce')
-        inv_importe = pd.to_numeric(row.get('importeTotal', 0), errors='coerce')
-        if abs(siat_importe - inv_importe) > 0.01:
-            obs.append(f"Importe: SIAT={siat_importe}, INV={inv_importe}")
-        # Comparar estado
-        siat_estado = str(row.get('ESTADO', ''))
-        inv_estado = str(row.get('estado', ''))
-        if inv_estado in ['V', 'A']:
-            inv_estado = 'VALIDA' if inv_estado == 'V' else 'ANULADA'
-        if siat_estado != inv_estado:
-            obs.append(f"Estado: SIAT={siat_estado}, INV={inv_estado}")
-        if obs:
-            return (row['OBSERVACIONES'] + '; ' if row['OBSERVACIONES'] else '') + '; '.join(obs)
-        return row['OBSERVACIONES']
-    merged['OBSERVACIONES'] = merged.apply(check_discrepancias, axis=1)
+    merged['OBSERVACIONES'] = _append_observations(merged['OBSERVACIONES'], _field_discrepancy_observations(merged))
     results['verificacion_completa'] = merged
     # Ensure 'OBSERVACIONES' column exists in comparison_dataframe and verificacion_completa
     for key in ['comparison_dataframe', 'verificacion_completa']:
@@ -3,57 +3,23 @@ Funciones básicas para el procesamiento de datos de ventas.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import zipfile
-import tempfile
 import configparser
 import mysql.connector
-import warnings
-import contextlib
-
-@contextlib.contextmanager
-def suppress_openpyxl_warnings():
-    """Suprimir advertencias de openpyxl durante la ejecución."""
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
-        yield
-
-def process_zipped_sales_excel(zip_file_path, sheet_name="hoja1"):
-    """
-    Procesar un archivo Excel comprimido con datos de ventas.
-    
-    Args:
-        zip_file_path (str): Ruta al archivo ZIP que contiene el Excel
-        sheet_name (str): Nombre de la hoja a procesar
-        
-    Returns:
-        DataFrame: Datos procesados del archivo Excel, o None si ocurre un error
-    """
-    try:
-        # Crear directorio temporal para extraer los archivos
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Extraer archivos del ZIP
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            # Buscar archivos Excel en el directorio temporal
-            excel_files = [f for f in os.listdir(temp_dir) if f.endswith('.xlsx')]
-            
-            if not excel_files:
-                print(f"No se encontraron archivos Excel en {zip_file_path}")
-                return None
-            
-            # Tomar el primer archivo Excel encontrado
-            excel_path = os.path.join(temp_dir, excel_files[0])
-            
-            # Leer el archivo Excel con pandas
-            with suppress_openpyxl_warnings():
-                return pd.read_excel(excel_path, sheet_name=sheet_name)
-    except Exception as e:
-        print(f"Error al procesar el archivo ZIP: {e}")
-        return None
+from ventas_plus.data_ingestion import process_zipped_sales_excel
+from ventas_plus.ventas_processing import (
+    process_sales_data,
+    analyze_sales_data_basic,
+    analyze_sales_data_detailed
+)
+from ventas_plus.siat_cache import get_cache_dir, load_processed_sales
+from ventas_plus.comparison import AUTH_KEY, partition_by_authorization
+from ventas_plus.db_utils import DEFAULT_FETCH_SIZE, month_date_range, query_inventory_invoices
+from ventas_plus.inventory_snapshot import get_snapshot_dir, load_inventory_month
+from ventas_plus.db_pool import get_connection
 
 def get_db_config(config_file_path):
     """
@@ -81,338 +47,108 @@ def get_db_config(config_file_path):
 
 def connect_to_db(db_params):
     """
-    Conectar a la base de datos MySQL.
+    Tomar una conexión del pool compartido de la base de datos MySQL.
     
     Args:
         db_params (dict): Parámetros de conexión
         
     Returns:
-        MySQLConnection: Conexión a la base de datos, o None si falla
+        PooledMySQLConnection: Conexión a la base de datos (close() la devuelve
+        al pool), o None si falla
     """
     try:
-        return mysql.connector.connect(**db_params)
+        return get_connection(db_params)
     except mysql.connector.Error as err:
         print(f"Error de conexión a la base de datos: {err}")
         return None
 
-def process_sales_data(sales_data):
+def get_inventory_system_invoices(db_params, year, month, fetch_size=DEFAULT_FETCH_SIZE, projection='full'):
     """
-    Procesar y limpiar los datos de ventas.
+    Obtener facturas del sistema de inventarios para compararlas con las del SIAT.
+    
+    El mes se filtra con un rango semiabierto de fechas (usa el índice de
+    fechaFac) y el resultado se lee por lotes con un cursor sin búfer.
     
     Args:
-        sales_data (DataFrame): Datos crudos de ventas
+        db_params (dict): Parámetros de conexión a la base de datos
+        year (int): Año a consultar
+        month (int): Mes a consultar
+        fetch_size (int): Filas por lote del cursor sin búfer; None lee todo
+            de una vez con pd.read_sql
+        projection (str): 'full' o 'slim' (ver query_inventory_invoices)
         
     Returns:
-        DataFrame: Datos procesados
+        DataFrame: Dataframe con los datos de facturas del sistema, o None si ocurre un error
     """
-    # Hacer una copia para no alterar el original
-    df = sales_data.copy()
-    
-    # Convertir valores numéricos
-    numeric_columns = ['IMPORTE TOTAL DE LA VENTA'] if 'IMPORTE TOTAL DE LA VENTA' in df.columns else []
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Eliminar filas completamente vacías
-    df = df.dropna(how='all')
-    
-    # Crear nuevas columnas para información extraída del CODIGO DE AUTORIZACIÓN
-    if 'CODIGO DE AUTORIZACIÓN' in df.columns:
-        # Inicializar nuevas columnas
-        df['SUCURSAL'] = ''
-        df['MODALIDAD'] = ''  
-        df['TIPO EMISION'] = ''
-        df['TIPO FACTURA'] = ''
-        df['SECTOR'] = ''
-        df['NUM FACTURA'] = ''
-        df['PV'] = ''  # Punto de Venta
-        df['CODIGO AUTOVERIFICADOR'] = ''
-        
-        # Iterar sobre cada fila para extraer información del código de autorización
-        for index, row in df.iterrows():
-            try:
-                # Obtener el valor de la columna 'CODIGO DE AUTORIZACIÓN'
-                codigo = row['CODIGO DE AUTORIZACIÓN']
-                
-                if isinstance(codigo, str) and len(codigo) >= 42:
-                    # Obtener los valores deseados
-                    hexadecimal = codigo[:42]
-                    decimal = int(hexadecimal, 16)
-                    cadena = str(decimal)
-                    
-                    # Verificar si la cadena tiene suficientes dígitos
-                    if len(cadena) > 27:
-                        # Extraer los segmentos de la cadena
-                        cadena = cadena[27:]
-                        
-                        # Verificar suficiente longitud antes de extraer
-                        if len(cadena) >= 24:  # Necesitamos al menos 24 caracteres
-                            sucursal = cadena[:4]
-                            modalidad = cadena[4:5] if len(cadena) > 4 else ''
-                            tipo_emision = cadena[5:6] if len(cadena) > 5 else ''
-                            tipo_factura = cadena[6:7] if len(cadena) > 6 else ''
-                            tipo_documento_sector = cadena[7:9] if len(cadena) > 8 else ''
-                            num_factura = cadena[9:19] if len(cadena) > 18 else ''
-                            pv = cadena[19:23] if len(cadena) > 22 else ''
-                            codigo_autoverificador = cadena[23:24] if len(cadena) > 23 else ''
-                            
-                            # Asignar los valores a las nuevas columnas
-                            df.at[index, 'SUCURSAL'] = sucursal
-                            df.at[index, 'MODALIDAD'] = modalidad
-                            df.at[index, 'TIPO EMISION'] = tipo_emision
-                            df.at[index, 'TIPO FACTURA'] = tipo_factura
-                            df.at[index, 'SECTOR'] = tipo_documento_sector
-                            df.at[index, 'NUM FACTURA'] = num_factura
-                            df.at[index, 'PV'] = pv
-                            df.at[index, 'CODIGO AUTOVERIFICADOR'] = codigo_autoverificador
-            except Exception as e:
-                print(f"Error al procesar el código de autorización en la fila {index}: {str(e)}")
-                continue
-    
+    print(f"Consultando facturas del sistema de inventarios para {month}/{year}...")
+    df = query_inventory_invoices(db_params, *month_date_range(year, month), fetch_size=fetch_size, projection=projection)
+    if df is not None:
+        print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
     return df
 
-def analyze_sales_data_basic(df):
+def month_span(start, end):
     """
-    Realizar un análisis básico de los datos de ventas.
-    
+    Meses de un periodo, ambos extremos incluidos.
+
     Args:
-        df (DataFrame): Datos procesados de ventas
-        
+        start (tuple): (año, mes) inicial
+        end (tuple): (año, mes) final
+
     Returns:
-        dict: Estadísticas básicas de los datos
+        list: Tuplas (año, mes) en orden
     """
-    results = {
-        "total_records": len(df),
-        "columns": list(df.columns),
-    }
-    
-    # Si existen las columnas necesarias, agregar estadísticas
-    if 'IMPORTE TOTAL DE LA VENTA' in df.columns:
-        results['total_ventas'] = df['IMPORTE TOTAL DE LA VENTA'].sum()
-        results['promedio_venta'] = df['IMPORTE TOTAL DE LA VENTA'].mean()
-        results['venta_maxima'] = df['IMPORTE TOTAL DE LA VENTA'].max()
-    
-    if 'ESTADO' in df.columns:
-        results['conteo_estados'] = df['ESTADO'].value_counts().to_dict()
-    
-    # Añadir análisis de las nuevas columnas extraídas del código de autorización
-    if 'SUCURSAL' in df.columns:
-        results['conteo_sucursales'] = df['SUCURSAL'].value_counts().to_dict()
-    
-    if 'TIPO EMISION' in df.columns:
-        results['conteo_tipo_emision'] = df['TIPO EMISION'].value_counts().to_dict()
-        
-    if 'SECTOR' in df.columns:
-        results['conteo_sector'] = df['SECTOR'].value_counts().to_dict()
-    
-    return results
+    first = int(start[0]) * 12 + int(start[1]) - 1
+    last = int(end[0]) * 12 + int(end[1]) - 1
+    return [(index // 12, index % 12 + 1) for index in range(first, last + 1)]
 
-def analyze_sales_data_detailed(df):
+def split_by_month(df, months):
     """
-    Realizar un análisis detallado de datos de ventas por sucursal y sector.
-    
+    Separar facturas del inventario por mes según fechaFac ('DD/MM/YYYY').
+
     Args:
-        df (DataFrame): Datos procesados de ventas
-        
+        df (DataFrame): Facturas de varios meses
+        months (list): Tuplas (año, mes) esperadas
+
     Returns:
-        dict: Estadísticas detalladas de los datos por sucursal y sector
+        dict: (año, mes) -> DataFrame del mes (vacío si no hubo facturas),
+        con el mismo orden de filas que la consulta
     """
-    results = {}
-    
-    # Verificar que existen las columnas necesarias
-    required_columns = ['ESTADO', 'SECTOR', 'SUCURSAL', 'IMPORTE TOTAL DE LA VENTA']
-    for col in required_columns:
-        if col not in df.columns:
-            print(f"Advertencia: No se encontró la columna {col}, análisis detallado limitado")
-            return {"error": f"Falta la columna {col} para el análisis detallado"}
-    
-    # ANÁLISIS DE ALQUILERES (SECTOR 02)
-    df_alq = df[df["SECTOR"] == '02']
-    df_alq_valida = df[(df["SECTOR"] == '02') & (df['ESTADO'] == 'VALIDA')]
-    df_alq_anulada = df[(df["SECTOR"] == '02') & (df['ESTADO'] == 'ANULADA')]
-    
-    # Total facturado en alquileres
-    total_facturado_alquiler = df_alq_valida["IMPORTE TOTAL DE LA VENTA"].sum()
-    results['alquileres'] = {
-        'total_facturado': total_facturado_alquiler,
-        'cantidad_validas': len(df_alq_valida),
-        'cantidad_anuladas': len(df_alq_anulada),
-        'cantidad_total': len(df_alq)
-    }
-    
-    # ANÁLISIS GENERAL
-    # Facturas válidas y total facturado
-    df_validas = df[df["ESTADO"] == "VALIDA"]
-    total_venta_valida = df_validas["IMPORTE TOTAL DE LA VENTA"].sum()
-    
-    results['general'] = {
-        'total_facturado_valida': total_venta_valida,
-        'total_facturado_sin_alquiler': total_venta_valida - total_facturado_alquiler,
-        'total_facturas': len(df),
-        'cantidad_validas': len(df_validas),
-        'cantidad_anuladas': len(df[df["ESTADO"] == "ANULADA"])
-    }
-    
-    # ANÁLISIS POR SUCURSAL Y SECTOR
-    
-    # CENTRAL - LA PAZ (0000)
-    # Facturas de venta común (01) y bienes capitales (35)
-    df_central_validas = df[(df['ESTADO'] == 'VALIDA') & 
-                           (df['SUCURSAL'] == '0000') & 
-                           ((df['SECTOR'] == '01') | (df['SECTOR'] == '35'))]
-    
-    df_central_validas_cv = df[(df['ESTADO'] == 'VALIDA') & 
-                              (df['SUCURSAL'] == '0000') & 
-                              (df['SECTOR'] == '01')]
-                              
-    df_central_validas_cvb = df[(df['ESTADO'] == 'VALIDA') & 
-                               (df['SUCURSAL'] == '0000') & 
-                               (df['SECTOR'] == '35')]
-                               
-    df_central_anuladas = df[(df['ESTADO'] == 'ANULADA') & 
-                            (df['SUCURSAL'] == '0000') & 
-                            ((df['SECTOR'] == '01') | (df['SECTOR'] == '35'))]
-    
-    total_central_validas = df_central_validas['IMPORTE TOTAL DE LA VENTA'].sum()
-    
-    results['central'] = {
-        'total_facturado': total_central_validas,
-        'cantidad_validas_cv': len(df_central_validas_cv),
-        'cantidad_validas_cvb': len(df_central_validas_cvb),
-        'cantidad_anuladas': len(df_central_anuladas),
-        'cantidad_total': len(df_central_validas) + len(df_central_anuladas)
-    }
-    
-    # POTOSÍ (0006)
-    df_potosi_validas = df[(df['ESTADO'] == 'VALIDA') & 
-                           (df['SUCURSAL'] == '0006') & 
-                           (df['SECTOR'] == '01')]
-                           
-    df_potosi_anuladas = df[(df['ESTADO'] == 'ANULADA') & 
-                            (df['SUCURSAL'] == '0006') & 
-                            (df['SECTOR'] == '01')]
-                            
-    total_potosi_validas = df_potosi_validas['IMPORTE TOTAL DE LA VENTA'].sum()
-    
-    results['potosi'] = {
-        'total_facturado': total_potosi_validas,
-        'cantidad_validas': len(df_potosi_validas),
-        'cantidad_anuladas': len(df_potosi_anuladas),
-        'cantidad_total': len(df_potosi_validas) + len(df_potosi_anuladas)
-    }
-    
-    # SANTA CRUZ (0005)
-    df_scz_validas = df[(df['ESTADO'] == 'VALIDA') & 
-                        (df['SUCURSAL'] == '0005') & 
-                        (df['SECTOR'] == '01')]
-                        
-    df_scz_anulada = df[(df['ESTADO'] == 'ANULADA') & 
-                         (df['SUCURSAL'] == '0005') & 
-                         (df['SECTOR'] == '01')]
-                         
-    total_scz_validas = df_scz_validas['IMPORTE TOTAL DE LA VENTA'].sum()
-    
-    results['santa_cruz'] = {
-        'total_facturado': total_scz_validas,
-        'cantidad_validas': len(df_scz_validas),
-        'cantidad_anuladas': len(df_scz_anulada),
-        'cantidad_total': len(df_scz_validas) + len(df_scz_anulada)
+    periods = df['fechaFac'].str.slice(3, 10) if len(df) else pd.Series(dtype=str)
+    by_period = {period: group.reset_index(drop=True) for period, group in df.groupby(periods, sort=False)}
+    return {
+        (year, month): by_period.get(f"{month:02d}/{year}", df.iloc[0:0].reset_index(drop=True))
+        for year, month in months
     }
-    
-    # RESUMEN TOTAL DE FACTURAS
-    total_cantidad_facturas = (
-        results['central']['cantidad_validas_cv'] + 
-        results['central']['cantidad_validas_cvb'] + 
-        results['central']['cantidad_anuladas'] + 
-        results['potosi']['cantidad_validas'] + 
-        results['potosi']['cantidad_anuladas'] + 
-        results['santa_cruz']['cantidad_validas'] + 
-        results['santa_cruz']['cantidad_anuladas'] + 
-        results['alquileres']['cantidad_total']
-    )
-    
-    results['total_facturas_desglosado'] = total_cantidad_facturas
-    
-    return results
 
-def get_inventory_system_invoices(db_params, year, month):
+def get_inventory_system_invoices_range(db_params, start, end, fetch_size=DEFAULT_FETCH_SIZE, projection='full'):
     """
-    Obtener facturas del sistema de inventarios para compararlas con las del SIAT.
-    
+    Obtener las facturas del inventario de varios meses con una sola consulta.
+
+    Para cierres trimestrales o anuales evita repetir la unión completa una
+    vez por mes: se consulta el periodo entero y se separa por mes en el cliente.
+
     Args:
         db_params (dict): Parámetros de conexión a la base de datos
-        year (int): Año a consultar
-        month (int): Mes a consultar
-        
+        start (tuple): (año, mes) inicial
+        end (tuple): (año, mes) final, incluido
+        fetch_size (int): Filas por lote del cursor sin búfer
+        projection (str): 'full' o 'slim' (ver query_inventory_invoices)
+
     Returns:
-        DataFrame: Dataframe con los datos de facturas del sistema, o None si ocurre un error
+        dict: (año, mes) -> DataFrame del mes, o None si ocurre un error
     """
-    try:
-        # Conectar a la base de datos
-        conn = connect_to_db(db_params)
-        if conn is None:
-            return None
-            
-        # Definir la consulta SQL
-        query = """
-            SELECT
-                DATE_FORMAT(f.fechaFac, '%d/%m/%Y') fechaFac,
-                nFactura,
-                fs.cuf autorizacion,
-                f.ClienteNit nit,
-                '' complemento,
-                f.ClienteFactura razonSocial,
-                f.total importeTotal,
-                0 ICE,
-                0 IEHD,
-                0 IPJ,
-                0 tasas,
-                0 otrosNoSujetos,
-                0 excentos,
-                0 ventasTasaCero,
-                f.total subTotal,
-                0 descuentos,
-                0 gift, 
-                f.total base,
-                ROUND ((f.total * 0.13), 3) AS debito,
-                IF(anulada = 0, 'V', 'A') estado,
-                IF(codigoControl = '', 0, codigoControl) AS codigoControl,
-                0 tipoVenta,
-                a.almacen codigoSucursal,
-                '' _revision,
-                IF(df.manual = 1, 'SIAT-DESKTOP-FE', 'ONLINE') _tipoFac,
-                f.glosa _obs,
-                concat(u.first_name, ' ' , u.last_name) _autor 
-            FROM
-                factura f
-                INNER JOIN datosfactura df ON df.idDatosFactura = f.lote
-                INNER JOIN factura_siat fs ON fs.factura_id = f.idFactura
-                INNER JOIN almacenes a ON a.idalmacen = f.almacen
-                INNER JOIN tipoPago tp ON tp.id = f.tipoPago
-                INNER JOIN users u on u.id = f.autor
-            WHERE
-                year(f.fechaFac) = %s
-                AND month(f.fechaFac) = %s
-            ORDER BY
-                a.idalmacen,
-                f.fechaFac,
-                df.idDatosFactura DESC,
-                nFactura
-        """
-        
-        # Ejecutar la consulta y obtener los resultados en un DataFrame
-        print(f"Consultando facturas del sistema de inventarios para {month}/{year}...")
-        df = pd.read_sql(query, conn, params=(year, month))
-        
-        # Cerrar la conexión
-        conn.close()
-        
-        print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
-        return df
-        
-    except Exception as e:
-        print(f"Error al consultar facturas del sistema de inventarios: {e}")
+    months = month_span(start, end)
+    if not months:
+        print("Error: el mes final es anterior al inicial")
         return None
+    first_day = month_date_range(*months[0])[0]
+    last_day = month_date_range(*months[-1])[1]
+    print(f"Consultando facturas del sistema de inventarios de {start[1]}/{start[0]} a {end[1]}/{end[0]}...")
+    df = query_inventory_invoices(db_params, first_day, last_day, fetch_size=fetch_size, projection=projection)
+    if df is None:
+        return None
+    print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
+    return split_by_month(df, months)
 
 def compare_siat_with_inventory(siat_data, inventory_data):
     """
@@ -439,46 +175,36 @@ def compare_siat_with_inventory(siat_data, inventory_data):
     siat_no_alquileres = siat_data[siat_data['SECTOR'] != '02']
     results['total_siat_no_alquileres'] = len(siat_no_alquileres)
     
-    # Crear Series con autorizaciones para comparación rápida
-    siat_auths = set(siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].str.strip())
-    inventory_auths = set(inventory_data['autorizacion'].str.strip())
-    
-    # Encontrar facturas que coinciden
-    matching_auths = siat_auths.intersection(inventory_auths)
-    results['matching_invoices'] = len(matching_auths)
+    # Separar coincidentes, solo SIAT y solo inventario con claves enteras del CUF
+    partitions = partition_by_authorization(siat_no_alquileres, inventory_data)
+    results['matching_invoices'] = partitions['matching_count']
     
-    # Encontrar facturas que están en SIAT pero no en inventario
-    missing_in_inventory = siat_auths - inventory_auths
-    results['missing_in_inventory_count'] = len(missing_in_inventory)
+    # Facturas que están en SIAT pero no en inventario
+    results['missing_in_inventory_count'] = partitions['siat_only_count']
     
-    if len(missing_in_inventory) > 0:
-        missing_df = siat_no_alquileres[siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].isin(missing_in_inventory)]
+    if partitions['siat_only_count'] > 0:
+        missing_df = partitions['siat_only']
         results['missing_in_inventory'] = missing_df[['CODIGO DE AUTORIZACIÓN', 'IMPORTE TOTAL DE LA VENTA', 'ESTADO']].to_dict('records')
     
-    # Encontrar facturas que están en inventario pero no en SIAT
-    missing_in_siat = inventory_auths - siat_auths
-    results['missing_in_siat_count'] = len(missing_in_siat)
+    # Facturas que están en inventario pero no en SIAT
+    results['missing_in_siat_count'] = partitions['inventory_only_count']
     
-    if len(missing_in_siat) > 0:
-        missing_df = inventory_data[inventory_data['autorizacion'].isin(missing_in_siat)]
+    if partitions['inventory_only_count'] > 0:
+        missing_df = partitions['inventory_only']
         results['missing_in_siat'] = missing_df[['autorizacion', 'importeTotal', 'estado']].to_dict('records')
     
     # Verificar diferencias en montos para facturas que coinciden
-    if len(matching_auths) > 0:
-        # Preparar DataFrames para comparación
-        siat_matching = siat_no_alquileres[siat_no_alquileres['CODIGO DE AUTORIZACIÓN'].isin(matching_auths)]
-        inventory_matching = inventory_data[inventory_data['autorizacion'].isin(matching_auths)]
-        
+    if partitions['matching_count'] > 0:
         # Crear DataFrames con solo las columnas necesarias
-        siat_compare = siat_matching[['CODIGO DE AUTORIZACIÓN', 'IMPORTE TOTAL DE LA VENTA']].copy()
-        inventory_compare = inventory_matching[['autorizacion', 'importeTotal']].copy()
+        siat_compare = partitions['siat_matched'][['CODIGO DE AUTORIZACIÓN', 'IMPORTE TOTAL DE LA VENTA', AUTH_KEY]].copy()
+        inventory_compare = partitions['inventory_matched'][[AUTH_KEY, 'importeTotal']].copy()
         
         # Renombrar columnas para facilitar la comparación
         siat_compare.rename(columns={'CODIGO DE AUTORIZACIÓN': 'autorizacion', 'IMPORTE TOTAL DE LA VENTA': 'importe_siat'}, inplace=True)
         inventory_compare.rename(columns={'importeTotal': 'importe_inventory'}, inplace=True)
         
         # Combinar DataFrames para comparación
-        comparison = pd.merge(siat_compare, inventory_compare, on='autorizacion')
+        comparison = pd.merge(siat_compare, inventory_compare, on=AUTH_KEY).drop(columns=AUTH_KEY)
         
         # Calcular diferencias
         comparison['diferencia'] = comparison['importe_siat'] - comparison['importe_inventory']
@@ -493,7 +219,38 @@ def compare_siat_with_inventory(siat_data, inventory_data):
     
     return results
 
-def verify_invoice_consistency(project_root, config_file_path, month, year, export_results=True):
+def load_inventory_data(project_root, config_file_path, year, month, use_cache=True, refresh_inventory=False, projection='full'):
+    """
+    Obtener las facturas del inventario de un mes para la verificación.
+
+    Args:
+        project_root (str): Directorio raíz del proyecto
+        config_file_path (str): Ruta al archivo de configuración de la BD
+        year (int): Año
+        month (int): Mes
+        use_cache (bool): Si es True, usa la instantánea local del inventario
+        refresh_inventory (bool): Si es True, recarga completo el mes
+        projection (str): 'full' o 'slim' (ver query_inventory_invoices)
+
+    Returns:
+        DataFrame: Facturas del mes, o None si ocurre un error
+    """
+    # Obtener configuración de la base de datos y conectar
+    try:
+        db_params = get_db_config(config_file_path)
+    except Exception as e:
+        print(f"Error al obtener la configuración de la base de datos: {e}")
+        return None
+    
+    # Consultar datos del sistema de inventarios (o actualizar la instantánea local)
+    if use_cache:
+        return load_inventory_month(
+            db_params, get_snapshot_dir(project_root), year, int(month),
+            refresh=refresh_inventory, projection=projection
+        )
+    return get_inventory_system_invoices(db_params, year, int(month), projection=projection)
+
+def verify_invoice_consistency(project_root, config_file_path, month, year, export_results=True, use_cache=True, excel_engine=None, inventory_data=None, refresh_inventory=False, concurrent=False, export_verification_csv=True):
     """
     Verificar consistencia entre facturas del SIAT y del sistema de inventarios.
     
@@ -503,6 +260,22 @@ def verify_invoice_consistency(project_root, config_file_path, month, year, expo
         month (int): Mes a procesar
         year (int): Año a procesar
         export_results (bool): Si es True, exporta los resultados a un archivo CSV
+        use_cache (bool): Si es True, reutiliza la caché de meses SIAT ya
+            procesados y la instantánea local del inventario del mes
+        excel_engine (str, optional): Motor de lectura del Excel del SIAT
+        inventory_data (DataFrame, optional): Facturas del inventario ya
+            consultadas para el mes (por ejemplo, con
+            get_inventory_system_invoices_range); si es None se consultan aquí
+        refresh_inventory (bool): Si es True, recarga completo el inventario
+            del mes en lugar de actualizar la instantánea
+        concurrent (bool): Si es True, consulta el inventario en un hilo
+            mientras se lee y decodifica el Excel del SIAT
+        export_verification_csv (bool): Si es False, no se escribe
+            verificacion_completa_MM_AAAA.csv (por ejemplo, cuando el
+            resultado se pasa en memoria a la importación contable)
+        
+    Sin export_results solo se consultan las columnas que usa la
+    comparación (proyección 'slim').
         
     Returns:
         dict: Resultados de la verificación
@@ -520,25 +293,44 @@ def verify_invoice_consistency(project_root, config_file_path, month, year, expo
         print(f"\nError: No se encontró el archivo {zip_file_name} del SIAT")
         return None
         
-    print(f"Procesando archivo del SIAT: {zip_file_path}")
-    siat_data = process_zipped_sales_excel(zip_file_path, sheet_name="hoja1")
+    # Con concurrent, la consulta (E/S) corre en segundo plano mientras se
+    # procesa el Excel (CPU); ambas se esperan antes de comparar
+    projection = 'full' if export_results else 'slim'
+    inventory_future = None
+    executor = None
+    if concurrent and inventory_data is None:
+        print("Consultando el sistema de inventarios en segundo plano...")
+        executor = ThreadPoolExecutor(max_workers=1)
+        inventory_future = executor.submit(
+            load_inventory_data, project_root, config_file_path, year, month,
+            use_cache=use_cache, refresh_inventory=refresh_inventory, projection=projection
+        )
     
-    if siat_data is None or siat_data.empty:
-        print("No se encontraron datos del SIAT o hubo un error al procesar el archivo")
-        return None
+    try:
+        print(f"Procesando archivo del SIAT: {zip_file_path}")
+        # Leer y procesar datos del SIAT (o reutilizar la caché si el ZIP no cambió)
+        cache_dir = get_cache_dir(project_root) if use_cache else None
+        siat_processed = load_processed_sales(zip_file_path, cache_dir=cache_dir, sheet_name="hoja1", engine=excel_engine)
         
-    # Procesar datos del SIAT
-    siat_processed = process_sales_data(siat_data)
+        if inventory_future is not None:
+            try:
+                inventory_data = inventory_future.result()
+            except Exception as e:
+                print(f"Error al consultar facturas del sistema de inventarios: {e}")
+                return None
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
     
-    # Obtener configuración de la base de datos y conectar
-    try:
-        db_params = get_db_config(config_file_path)
-    except Exception as e:
-        print(f"Error al obtener la configuración de la base de datos: {e}")
+    if siat_processed is None or siat_processed.empty:
+        print("No se encontraron datos del SIAT o hubo un error al procesar el archivo")
         return None
     
-    # Consultar datos del sistema de inventarios
-    inventory_data = get_inventory_system_invoices(db_params, year, int(month))
+    if inventory_data is None and inventory_future is None:
+        inventory_data = load_inventory_data(
+            project_root, config_file_path, year, month,
+            use_cache=use_cache, refresh_inventory=refresh_inventory, projection=projection
+        )
     
     if inventory_data is None or inventory_data.empty:
         print("No se encontraron datos en el sistema de inventarios o hubo un error en la consulta")
@@ -573,7 +365,7 @@ def verify_invoice_consistency(project_root, config_file_path, month, year, expo
         os.makedirs(output_dir, exist_ok=True)
 
         # Exportar archivo completo de verificación
-        if 'verificacion_completa' in comparison_results:
+        if export_verification_csv and 'verificacion_completa' in comparison_results:
             verif_df = comparison_results['verificacion_completa']
             if isinstance(verif_df, pd.DataFrame) and not verif_df.empty:
                 verif_path = os.path.join(output_dir, f"verificacion_completa_{formatted_month}_{year}.csv")
@@ -600,3 +392,45 @@ def verify_invoice_consistency(project_root, config_file_path, month, year, expo
             print(f"Diferencias de montos guardadas en: {diff_path}")
 
     return comparison_results
+
+def verify_invoice_consistency_range(project_root, config_file_path, start, end, export_results=True, use_cache=True, excel_engine=None):
+    """
+    Verificar varios meses consultando el inventario una sola vez.
+
+    Args:
+        project_root (str): Directorio raíz del proyecto
+        config_file_path (str): Ruta al archivo de configuración de la BD
+        start (tuple): (año, mes) inicial
+        end (tuple): (año, mes) final, incluido
+        export_results (bool): Si es True, exporta los resultados de cada mes
+        use_cache (bool): Si es True, reutiliza la caché de meses SIAT ya procesados
+        excel_engine (str, optional): Motor de lectura del Excel del SIAT
+
+    Returns:
+        dict: (año, mes) -> resultados de la verificación del mes (None si falló),
+        o None si el rango está invertido o falla la consulta
+    """
+    if tuple(end) < tuple(start):
+        print(f"Error: el periodo termina ({end[1]:02d}/{end[0]}) antes de empezar ({start[1]:02d}/{start[0]}).")
+        return None
+    try:
+        db_params = get_db_config(config_file_path)
+    except Exception as e:
+        print(f"Error al obtener la configuración de la base de datos: {e}")
+        return None
+
+    inventory_by_month = get_inventory_system_invoices_range(
+        db_params, start, end, projection='full' if export_results else 'slim'
+    )
+    if inventory_by_month is None:
+        return None
+
+    results = {}
+    for (year, month), inventory_data in inventory_by_month.items():
+        print(f"\n=== Mes {month:02d}/{year} ===")
+        results[(year, month)] = verify_invoice_consistency(
+            project_root, config_file_path, month, year,
+            export_results=export_results, use_cache=use_cache,
+            excel_engine=excel_engine, inventory_data=inventory_data
+        )
+    return results
@@ -0,0 +1,178 @@
+"""
+Decodificación por lotes del Código Único de Factura (CUF) del SIAT.
+
+El CUF contiene, en sus primeros 42 caracteres hexadecimales, un número que
+en base 10 codifica la sucursal, modalidad, tipo de emisión, tipo de factura,
+sector, número de factura, punto de venta y código autoverificador.
+
+En lugar de convertir cada código con ``int(hex, 16)`` fila por fila, este
+módulo trabaja sobre la columna completa con numpy: los 42 dígitos
+hexadecimales se agrupan en 6 bloques de 28 bits y se convierten a base 10
+mediante división larga vectorizada.
+"""
+import numpy as np
+import pandas as pd
+
+# Incrementar cuando cambie la forma de decodificar (invalida cachés persistentes)
+CUF_DECODER_VERSION = "1"
+
+CUF_HEX_LENGTH = 42
+
+# Columna destino y posición (inicio, fin) dentro de la cadena decimal recortada
+CUF_FIELDS = [
+    ('SUCURSAL', 0, 4),
+    ('MODALIDAD', 4, 5),
+    ('TIPO EMISION', 5, 6),
+    ('TIPO FACTURA', 6, 7),
+    ('SECTOR', 7, 9),
+    ('NUM FACTURA', 9, 19),
+    ('PV', 19, 23),
+    ('CODIGO AUTOVERIFICADOR', 23, 24),
+]
+
+# 42 dígitos hex = 168 bits < 10**54: 6 bloques de 9 dígitos decimales bastan
+_LIMB_BITS = 28
+_LIMB_NIBBLES = _LIMB_BITS // 4
+_NUM_LIMBS = CUF_HEX_LENGTH // _LIMB_NIBBLES
+_CHUNK_DIGITS = 9
+_CHUNK_BASE = np.uint64(10 ** _CHUNK_DIGITS)
+_TOTAL_DIGITS = _NUM_LIMBS * _CHUNK_DIGITS
+# Dígitos iniciales que se descartan y longitud mínima del resto
+_SKIP_DIGITS = 27
+_FIELD_DIGITS = 24
+
+_HEX_TABLE = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b'0123456789abcdef'):
+    _HEX_TABLE[_c] = _i
+for _i, _c in enumerate(b'ABCDEF'):
+    _HEX_TABLE[_c] = 10 + _i
+
+
+def _decode_scalar(hexadecimal):
+    """
+    Decodifica un único prefijo hexadecimal con la lógica original basada en int().
+
+    Se usa solo para los pocos códigos que la ruta vectorizada no acepta
+    (por ejemplo, con espacios o guiones bajos que int() tolera).
+
+    Returns:
+        str: Cadena de 24 dígitos con los campos, o '' si el código es demasiado corto.
+    """
+    cadena = str(int(hexadecimal, 16))
+    if len(cadena) > _SKIP_DIGITS and len(cadena[_SKIP_DIGITS:]) >= _FIELD_DIGITS:
+        return cadena[_SKIP_DIGITS:_SKIP_DIGITS + _FIELD_DIGITS]
+    return ''
+
+
+def _hex_to_decimal_digits(nibbles):
+    """
+    Convierte una matriz (n, 42) de dígitos hexadecimales a dígitos decimales.
+
+    Args:
+        nibbles (ndarray): Valores 0-15 por fila, el más significativo primero
+
+    Returns:
+        ndarray: Matriz (n, 54) de dígitos decimales con ceros a la izquierda
+    """
+    n = nibbles.shape[0]
+    weights = np.uint64(16) ** np.arange(_LIMB_NIBBLES - 1, -1, -1, dtype=np.uint64)
+    limbs = (nibbles.reshape(n, _NUM_LIMBS, _LIMB_NIBBLES).astype(np.uint64) * weights).sum(axis=2)
+
+    chunks = []
+    for _ in range(_NUM_LIMBS):
+        rem = np.zeros(n, dtype=np.uint64)
+        for j in range(_NUM_LIMBS):
+            # rem < 10**9 < 2**30, por lo que cur < 2**58 y cabe en uint64
+            cur = (rem << np.uint64(_LIMB_BITS)) | limbs[:, j]
+            limbs[:, j] = cur // _CHUNK_BASE
+            rem = cur % _CHUNK_BASE
+        chunks.append(rem)
+
+    pow10 = np.uint64(10) ** np.arange(_CHUNK_DIGITS - 1, -1, -1, dtype=np.uint64)
+    return np.concatenate(
+        [(chunk[:, None] // pow10) % np.uint64(10) for chunk in reversed(chunks)],
+        axis=1
+    ).astype(np.uint8)
+
+
+def _digits_to_strings(digits, start, end):
+    """Convierte las columnas [start, end) de una matriz de dígitos en strings."""
+    width = end - start
+    ascii_bytes = np.ascontiguousarray(digits[:, start:end] + ord('0'))
+    return ascii_bytes.view(f'S{width}').ravel().astype(str).astype(object)
+
+
+def decode_cuf_series(codes):
+    """
+    Decodificar una columna completa de códigos de autorización (CUF).
+
+    Args:
+        codes (Series): Valores de la columna 'CODIGO DE AUTORIZACIÓN'
+
+    Returns:
+        tuple: (DataFrame con las columnas de CUF_FIELDS alineado al índice de
+        ``codes``, lista de (índice, código, error) para los códigos inválidos)
+    """
+    n = len(codes)
+    fields = np.full((n, _FIELD_DIGITS), 0, dtype=np.uint8)
+    decoded = np.zeros(n, dtype=bool)
+    errors = []
+
+    if n and (pd.api.types.is_object_dtype(codes) or pd.api.types.is_string_dtype(codes)):
+        # Solo se decodifican strings de al menos 42 caracteres (len() es NaN para no-strings)
+        candidates = np.flatnonzero((codes.str.len() >= CUF_HEX_LENGTH).to_numpy(dtype=bool, na_value=False))
+        if len(candidates):
+            prefixes = codes.iloc[candidates].str.slice(0, CUF_HEX_LENGTH)
+            raw = np.array(
+                prefixes.str.encode('ascii', errors='replace').tolist(),
+                dtype=f'S{CUF_HEX_LENGTH}'
+            ).view(np.uint8).reshape(len(candidates), CUF_HEX_LENGTH)
+            nibbles = _HEX_TABLE[raw]
+            well_formed = (nibbles != 255).all(axis=1)
+
+            rows = candidates[well_formed]
+            if len(rows):
+                digits = _hex_to_decimal_digits(nibbles[well_formed])
+                nonzero = digits != 0
+                length = np.where(nonzero.any(axis=1), _TOTAL_DIGITS - np.argmax(nonzero, axis=1), 1)
+                enough = length - _SKIP_DIGITS >= _FIELD_DIGITS
+                # 16**42 < 10**51: un código con suficientes dígitos tiene exactamente 51,
+                # así que los campos son siempre los últimos 24 dígitos
+                fields[rows[enough]] = digits[enough, -_FIELD_DIGITS:]
+                decoded[rows[enough]] = True
+
+            # Los códigos que la ruta vectorizada rechaza se revisan con int() como antes
+            for pos, hexadecimal in zip(candidates[~well_formed], prefixes[~well_formed]):
+                try:
+                    cadena = _decode_scalar(hexadecimal)
+                except Exception as e:
+                    errors.append((codes.index[pos], codes.iloc[pos], str(e)))
+                    continue
+                if cadena:
+                    fields[pos] = np.frombuffer(cadena.encode('ascii'), dtype=np.uint8) - ord('0')
+                    decoded[pos] = True
+
+    result = pd.DataFrame(index=codes.index)
+    for column, start, end in CUF_FIELDS:
+        values = np.full(n, '', dtype=object)
+        if decoded.any():
+            values[decoded] = _digits_to_strings(fields[decoded], start, end)
+        result[column] = values
+    return result, errors
+
+
+def report_cuf_errors(errors, max_rows=10):
+    """
+    Imprimir un resumen único de los códigos de autorización que no se pudieron decodificar.
+
+    Args:
+        errors (list): Lista devuelta por decode_cuf_series
+        max_rows (int): Cantidad máxima de filas a detallar
+    """
+    if not errors:
+        return
+    print(f"Advertencia: {len(errors)} códigos de autorización no se pudieron decodificar.")
+    for index, codigo, error in errors[:max_rows]:
+        print(f"  • Fila {index}: {codigo!r} ({error})")
+    if len(errors) > max_rows:
+        print(f"  ... y {len(errors) - max_rows} más")
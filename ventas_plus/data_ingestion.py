@@ -1,12 +1,26 @@
 """
 Módulo para la carga y procesamiento inicial de archivos (Excel, ZIP, etc).
 """
+import importlib.util
+import io
 import os
+import posixpath
 import pandas as pd
 import zipfile
-import tempfile
 import warnings
 import contextlib
+import openpyxl
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+from ventas_plus.siat_schema import apply_siat_schema, build_column_plan, read_dtypes
+
+DEFAULT_CHUNKSIZE = 5000
+
+# Motores de lectura de Excel: openpyxl siempre está disponible; calamine
+# (paquete opcional python-calamine) es un lector nativo más rápido.
+EXCEL_ENGINES = ("openpyxl", "calamine")
+ENGINE_MODULES = {"openpyxl": "openpyxl", "calamine": "python_calamine"}
+DEFAULT_EXCEL_ENGINE = "openpyxl"
 
 @contextlib.contextmanager
 def suppress_openpyxl_warnings():
@@ -14,18 +28,234 @@ def suppress_openpyxl_warnings():
         warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
         yield
 
-def process_zipped_sales_excel(zip_file_path, sheet_name="hoja1"):
+def available_excel_engines():
+    """Motores de Excel instalados en esta máquina."""
+    return [engine for engine in EXCEL_ENGINES if importlib.util.find_spec(ENGINE_MODULES[engine]) is not None]
+
+def resolve_excel_engine(engine=None):
+    """
+    Elegir el motor de lectura de Excel.
+
+    Si no se indica, se usa la variable de entorno VENTAS_EXCEL_ENGINE y si
+    tampoco existe, openpyxl. Con "auto" se elige el motor más rápido que esté
+    instalado. Si el motor pedido no está instalado se usa openpyxl.
+
+    Args:
+        engine (str, optional): "openpyxl", "calamine" o "auto"
+
+    Returns:
+        str: Motor a usar
+    """
+    engine = (engine or os.environ.get("VENTAS_EXCEL_ENGINE") or DEFAULT_EXCEL_ENGINE).strip().lower()
+    available = available_excel_engines()
+    if engine == "auto":
+        return "calamine" if "calamine" in available else DEFAULT_EXCEL_ENGINE
+    if engine not in EXCEL_ENGINES:
+        print(f"Advertencia: motor de Excel desconocido '{engine}', se usa {DEFAULT_EXCEL_ENGINE}.")
+        return DEFAULT_EXCEL_ENGINE
+    if engine not in available:
+        print(f"Advertencia: el motor de Excel '{engine}' no está instalado, se usa {DEFAULT_EXCEL_ENGINE}.")
+        return DEFAULT_EXCEL_ENGINE
+    return engine
+
+def list_excel_members(zip_ref):
+    """
+    Listar los libros Excel contenidos en un ZIP sin extraerlos.
+
+    Se ignoran carpetas, metadatos de macOS (__MACOSX) y archivos de bloqueo
+    de Office (~$...), así como cualquier miembro que no sea .xlsx.
+
+    Args:
+        zip_ref (ZipFile): Archivo ZIP abierto
+
+    Returns:
+        list: ZipInfo de los libros Excel, ordenados por nombre
+    """
+    members = []
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        name = info.filename
+        base = posixpath.basename(name)
+        if not base.lower().endswith('.xlsx') or base.startswith('~$'):
+            continue
+        if name.startswith('__MACOSX/') or '/__MACOSX/' in name:
+            continue
+        members.append(info)
+    return sorted(members, key=lambda info: info.filename)
+
+def read_sales_sheet(workbook_buffer, sheet_name="hoja1", engine=DEFAULT_EXCEL_ENGINE):
+    """
+    Leer una hoja de ventas del SIAT con los tipos del estándar.
+
+    Primero se lee solo la fila de encabezados para armar el plan de tipos
+    (ventas_estandar_siatt.json) y luego la hoja completa con ese plan, sin
+    volver a abrir el libro.
+
+    Args:
+        workbook_buffer: Archivo o buffer con el libro .xlsx
+        sheet_name (str): Nombre de la hoja a leer
+        engine (str): Motor de pandas para leer el Excel (ver resolve_excel_engine)
+
+    Returns:
+        DataFrame: Datos de la hoja con las columnas del estándar tipadas
+    """
+    with suppress_openpyxl_warnings(), pd.ExcelFile(workbook_buffer, engine=engine) as xls:
+        header = xls.parse(sheet_name, nrows=0).columns
+        plan = build_column_plan(header)
+        df = xls.parse(sheet_name, dtype=read_dtypes(plan, header))
+    return apply_siat_schema(df, plan)
+
+def open_excel_member(zip_ref, member):
+    """
+    Leer un miembro .xlsx del ZIP a un buffer en memoria.
+
+    El lector de Excel necesita un archivo con acceso aleatorio; un buffer en
+    memoria evita escribirlo a disco y los retrocesos costosos sobre el stream
+    comprimido del ZIP.
+
+    Args:
+        zip_ref (ZipFile): Archivo ZIP abierto
+        member (ZipInfo | str): Miembro a leer
+
+    Returns:
+        BytesIO: Contenido del libro Excel
+    """
+    with zip_ref.open(member) as stream:
+        return io.BytesIO(stream.read())
+
+def process_zipped_sales_excel(zip_file_path, sheet_name="hoja1", engine=None):
+    """
+    Procesar un archivo Excel comprimido con datos de ventas, leyéndolo
+    directamente desde el ZIP sin extraerlo a un directorio temporal.
+
+    Si el ZIP contiene más de un libro Excel, se leen todos (en orden de nombre)
+    y se concatenan. Los miembros que no son .xlsx se ignoran sin extraerse.
+
+    Args:
+        zip_file_path (str): Ruta al archivo ZIP que contiene el Excel
+        sheet_name (str): Nombre de la hoja a procesar
+        engine (str, optional): Motor de Excel; por defecto VENTAS_EXCEL_ENGINE u openpyxl
+
+    Returns:
+        DataFrame: Datos procesados del archivo Excel, o None si ocurre un error
+    """
+    engine = resolve_excel_engine(engine)
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            excel_files = [f for f in os.listdir(temp_dir) if f.endswith('.xlsx')]
-            if not excel_files:
+        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+            members = list_excel_members(zip_ref)
+            if not members:
                 print(f"No se encontraron archivos Excel en {zip_file_path}")
                 return None
-            excel_path = os.path.join(temp_dir, excel_files[0])
-            with suppress_openpyxl_warnings():
-                return pd.read_excel(excel_path, sheet_name=sheet_name)
+            if len(members) > 1:
+                print(f"Se encontraron {len(members)} archivos Excel en el ZIP: "
+                      f"{', '.join(info.filename for info in members)}")
+
+            frames = []
+            for info in members:
+                buffer = open_excel_member(zip_ref, info)
+                frames.append(read_sales_sheet(buffer, sheet_name=sheet_name, engine=engine))
+                buffer.close()
     except Exception as e:
         print(f"Error al procesar el archivo ZIP: {e}")
         return None
+
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def _convert_cell(cell):
+    """Convertir una celda de openpyxl igual que lo hace pandas.read_excel."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float('nan')
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        return val if val == cell.value else float(cell.value)
+    return cell.value
+
+def _rows_to_frame(header, rows, start=0, plan=None):
+    """Tipar un bloque de filas con el mismo parser y plan de tipos que read_sales_sheet."""
+    width = len(header)
+    block = [header] + [row + [""] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+    plan = plan or {}
+    df = TextParser(block, header=0, dtype=read_dtypes(plan, header)).read()
+    df.index = pd.RangeIndex(start, start + len(df))
+    return apply_siat_schema(df, plan)
+
+def iter_excel_sheet_chunks(workbook_buffer, sheet_name="hoja1", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Leer una hoja de Excel en bloques de filas con openpyxl en modo solo lectura.
+
+    Solo se mantiene en memoria el bloque actual, por lo que el consumo depende
+    de ``chunksize`` y no de la cantidad de filas de la hoja. Cada bloque se
+    tipa igual que read_sales_sheet (las filas vacías se omiten).
+
+    Args:
+        workbook_buffer: Archivo o buffer con el libro .xlsx
+        sheet_name (str): Nombre de la hoja a leer
+        chunksize (int): Cantidad máxima de filas por bloque
+
+    Yields:
+        DataFrame: Bloques de hasta ``chunksize`` filas con los encabezados de la hoja
+    """
+    with suppress_openpyxl_warnings():
+        workbook = openpyxl.load_workbook(workbook_buffer, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook[sheet_name]
+        sheet.reset_dimensions()
+        header = None
+        plan = None
+        block = []
+        start = 0
+        for row in sheet.rows:
+            converted = [_convert_cell(cell) for cell in row]
+            while converted and converted[-1] == "":
+                converted.pop()
+            if header is None:
+                header = converted
+                plan = build_column_plan(header)
+                continue
+            if not converted:
+                continue
+            block.append(converted)
+            if len(block) >= chunksize:
+                yield _rows_to_frame(header, block, start, plan)
+                start += len(block)
+                block = []
+        if block:
+            yield _rows_to_frame(header, block, start, plan)
+    finally:
+        workbook.close()
+
+def iter_zipped_sales_excel_chunks(zip_file_path, sheet_name="hoja1", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Leer en bloques los libros Excel de un ZIP del SIAT sin cargarlos completos.
+
+    Args:
+        zip_file_path (str): Ruta al archivo ZIP que contiene el Excel
+        sheet_name (str): Nombre de la hoja a procesar
+        chunksize (int): Cantidad máxima de filas por bloque
+
+    Yields:
+        DataFrame: Bloques de datos de ventas, en el orden de los libros del ZIP
+    """
+    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+        members = list_excel_members(zip_ref)
+        if not members:
+            print(f"No se encontraron archivos Excel en {zip_file_path}")
+            return
+        # Índice continuo entre libros, igual que al concatenar con ignore_index
+        offset = 0
+        for info in members:
+            buffer = open_excel_member(zip_ref, info)
+            try:
+                next_offset = offset
+                for chunk in iter_excel_sheet_chunks(buffer, sheet_name=sheet_name, chunksize=chunksize):
+                    chunk.index = chunk.index + offset
+                    next_offset = chunk.index[-1] + 1
+                    yield chunk
+                offset = next_offset
+            finally:
+                buffer.close()
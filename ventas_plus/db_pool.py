@@ -0,0 +1,99 @@
+"""
+Pool de conexiones MySQL compartido por las bases de inventario y contable.
+
+Cada combinación de parámetros de conexión (host, base, usuario...) tiene un
+único pool por proceso, de modo que las etapas de una corrida (consultas,
+lectura de registros existentes, borrado, inserción) y las corridas de varios
+meses reutilizan las mismas conexiones en lugar de abrir una nueva en cada paso.
+"""
+import os
+import threading
+from mysql.connector import pooling
+
+# Conexiones por pool; configurable con la variable de entorno VENTAS_DB_POOL_SIZE
+DEFAULT_POOL_SIZE = 2
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool_size(pool_size=None):
+    """Tamaño del pool: argumento, variable de entorno o valor por defecto."""
+    try:
+        size = int(pool_size or os.environ.get("VENTAS_DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+    except ValueError:
+        print(f"Advertencia: VENTAS_DB_POOL_SIZE inválido, se usa {DEFAULT_POOL_SIZE}")
+        size = DEFAULT_POOL_SIZE
+    return max(1, min(size, pooling.CNX_POOL_MAXSIZE))
+
+def _pool_key(db_params):
+    return tuple(sorted((key, str(value)) for key, value in db_params.items()))
+
+def get_pool(db_params, pool_size=None):
+    """
+    Obtener (o crear) el pool de conexiones para unos parámetros de conexión.
+
+    Args:
+        db_params (dict): Parámetros de conexión (ver get_db_config)
+        pool_size (int): Conexiones del pool; solo se usa al crearlo
+
+    Returns:
+        MySQLConnectionPool: Pool compartido para esos parámetros
+    """
+    key = _pool_key(db_params)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"ventas_plus_{len(_pools)}",
+                pool_size=get_pool_size(pool_size),
+                pool_reset_session=True,
+                **db_params
+            )
+            _pools[key] = pool
+        return pool
+
+def get_connection(db_params, pool_size=None):
+    """
+    Tomar una conexión del pool.
+
+    Al tomarla, el pool verifica que la conexión siga viva (ping) y la
+    reconecta si el servidor la cerró. ``conn.close()`` la devuelve al pool.
+
+    Args:
+        db_params (dict): Parámetros de conexión
+        pool_size (int): Conexiones del pool; solo se usa al crearlo
+
+    Returns:
+        PooledMySQLConnection: Conexión lista para usar
+    """
+    return get_pool(db_params, pool_size).get_connection()
+
+def _close_idle_connections(pool):
+    """
+    Cerrar las conexiones libres de un pool.
+
+    mysql-connector no tiene un método público para esto; se usa
+    ``MySQLConnectionPool._remove_connections``, que es privado (verificado con
+    mysql-connector-python 26.7). Si la versión instalada no lo tiene o falla,
+    solo se sueltan las referencias al pool y sus conexiones se cierran al
+    liberarse.
+    """
+    remove = getattr(pool, '_remove_connections', None)
+    if remove is None:
+        return
+    try:
+        remove()
+    except Exception as e:
+        print(f"Advertencia: no se pudieron cerrar las conexiones del pool {pool.pool_name}: {e}")
+
+def close_pools():
+    """
+    Cerrar las conexiones libres de todos los pools y olvidar los pools (por
+    ejemplo, al terminar el proceso). Las conexiones que sigan en uso se
+    cierran con ``conn.close()`` o al liberarse.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        _close_idle_connections(pool)
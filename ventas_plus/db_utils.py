@@ -2,8 +2,14 @@
 Módulo para la conexión y consulta a la base de datos.
 """
 import configparser
+from datetime import date
 import mysql.connector
+import numpy as np
 import pandas as pd
+from ventas_plus.db_pool import get_connection
+
+# Filas por lote al leer resultados con el cursor sin búfer
+DEFAULT_FETCH_SIZE = 5000
 
 def get_db_config(config_file_path):
     config = configparser.ConfigParser()
@@ -20,67 +26,369 @@ def get_db_config(config_file_path):
 
 def connect_to_db(db_params):
     try:
-        return mysql.connector.connect(**db_params)
+        return get_connection(db_params)
     except mysql.connector.Error as err:
         print(f"Error de conexión a la base de datos: {err}")
         return None
 
-def get_inventory_system_invoices(db_params, year, month):
+def month_date_range(year, month):
+    """
+    Rango semiabierto [inicio, fin) de un mes.
+
+    Filtrar con ``fechaFac >= inicio AND fechaFac < fin`` permite usar el
+    índice sobre la fecha, a diferencia de ``year(fechaFac)``/``month(fechaFac)``.
+
+    Args:
+        year (int): Año
+        month (int): Mes (1-12)
+
+    Returns:
+        tuple: (date inicio, date fin)
+    """
+    start = date(int(year), int(month), 1)
+    if start.month == 12:
+        return start, date(start.year + 1, 1, 1)
+    return start, date(start.year, start.month + 1, 1)
+
+def _column_values(values):
+    """Columna leída de la BD con el tipo que inferiría pd.read_sql (Decimal -> float)."""
+    if pd.api.types.infer_dtype(values, skipna=True) == 'decimal':
+        return pd.to_numeric(pd.Series(values, dtype=object))
+    return pd.Series(values, dtype=object).infer_objects()
+
+def _discard_unread_result(conn):
+    """Descartar las filas que quedaron sin leer de un cursor sin búfer."""
+    try:
+        if getattr(conn, 'unread_result', False):
+            conn.consume_results()
+    except Exception as e:
+        print(f"Advertencia: no se pudo descartar el resultado pendiente: {e}")
+
+def fetch_dataframe(conn, query, params=None, fetch_size=DEFAULT_FETCH_SIZE):
+    """
+    Ejecutar una consulta con un cursor sin búfer y leer el resultado por lotes.
+
+    Las filas se copian lote a lote (``fetchmany``) en arreglos preasignados por
+    columna, que duplican su capacidad cuando se llenan. Así el servidor
+    entrega el resultado a medida que se consume y el cliente no guarda a la
+    vez la lista completa de tuplas y el DataFrame.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        query (str): Consulta SQL con marcadores %s
+        params (tuple): Parámetros de la consulta
+        fetch_size (int): Filas por lote
+
+    Si la lectura falla a mitad de camino, las filas pendientes se descartan
+    antes de cerrar el cursor para que la conexión vuelva limpia al pool.
+
+    Returns:
+        DataFrame: Resultado de la consulta
+    """
+    cursor = conn.cursor(buffered=False)
+    completed = False
     try:
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        capacity = fetch_size
+        arrays = [np.empty(capacity, dtype=object) for _ in columns]
+        n_rows = 0
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            end = n_rows + len(rows)
+            if end > capacity:
+                capacity = max(capacity * 2, end)
+                grown = []
+                for array in arrays:
+                    new_array = np.empty(capacity, dtype=object)
+                    new_array[:n_rows] = array[:n_rows]
+                    grown.append(new_array)
+                arrays = grown
+            for array, values in zip(arrays, zip(*rows)):
+                array[n_rows:end] = values
+            n_rows = end
+        completed = True
+    finally:
+        if not completed:
+            _discard_unread_result(conn)
+        cursor.close()
+    return pd.DataFrame({column: _column_values(array[:n_rows]) for column, array in zip(columns, arrays)})
+
+def get_inventory_system_invoices(db_params, year, month, fetch_size=DEFAULT_FETCH_SIZE, projection='full'):
+    """
+    Obtener las facturas del mes del sistema de inventarios.
+
+    Usa la misma consulta que query_inventory_invoices sobre el rango
+    semiabierto del mes.
+
+    Args:
+        db_params (dict): Parámetros de conexión a la base de datos
+        year (int): Año a consultar
+        month (int): Mes a consultar
+        fetch_size (int): Filas por lote del cursor sin búfer; None lee todo
+            de una vez con pd.read_sql
+        projection (str): 'full' o 'slim' (ver query_inventory_invoices)
+
+    Returns:
+        DataFrame: Facturas del sistema, o None si ocurre un error
+    """
+    print(f"Consultando facturas del sistema de inventarios para {month}/{year}...")
+    df = query_inventory_invoices(db_params, *month_date_range(year, month), fetch_size=fetch_size, projection=projection)
+    if df is not None:
+        print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
+    return df
+
+# Proyecciones de la consulta de facturas del inventario:
+# - 'full': todas las columnas de la exportación de verificación completa
+# - 'slim': solo las columnas que usa la comparación con el SIAT
+PROJECTIONS = ('full', 'slim')
+
+# Columnas que usa compare_siat_with_inventory
+RECONCILIATION_COLUMNS = [
+    'fechaFac', 'nFactura', 'autorizacion', 'nit', 'razonSocial', 'importeTotal', 'estado', 'codigoSucursal',
+]
+
+# Expresión SQL de cada columna que se lee de la base
+INVENTORY_COLUMN_EXPRESSIONS = {
+    'fechaFac': "DATE_FORMAT(f.fechaFac, '%d/%m/%Y') fechaFac",
+    'nFactura': "nFactura",
+    'autorizacion': "fs.cuf autorizacion",
+    'nit': "f.ClienteNit nit",
+    'razonSocial': "f.ClienteFactura razonSocial",
+    'importeTotal': "f.total importeTotal",
+    'debito': "ROUND ((f.total * 0.13), 3) AS debito",
+    'estado': "IF(anulada = 0, 'V', 'A') estado",
+    'codigoControl': "IF(codigoControl = '', 0, codigoControl) AS codigoControl",
+    'codigoSucursal': "a.almacen codigoSucursal",
+    '_tipoFac': "IF(df.manual = 1, 'SIAT-DESKTOP-FE', 'ONLINE') _tipoFac",
+    '_obs': "f.glosa _obs",
+    '_autor': "concat(u.first_name, ' ' , u.last_name) _autor",
+}
+
+# Columnas constantes o copiadas de importeTotal: se agregan en el cliente
+INVENTORY_CONSTANT_COLUMNS = {
+    'complemento': '', 'ICE': 0, 'IEHD': 0, 'IPJ': 0, 'tasas': 0, 'otrosNoSujetos': 0, 'excentos': 0,
+    'ventasTasaCero': 0, 'descuentos': 0, 'gift': 0, 'tipoVenta': 0, '_revision': '',
+}
+INVENTORY_TOTAL_COPIES = ('subTotal', 'base')
+
+# Orden de columnas de la exportación completa
+INVENTORY_FULL_COLUMNS = [
+    'fechaFac', 'nFactura', 'autorizacion', 'nit', 'complemento', 'razonSocial', 'importeTotal',
+    'ICE', 'IEHD', 'IPJ', 'tasas', 'otrosNoSujetos', 'excentos', 'ventasTasaCero', 'subTotal',
+    'descuentos', 'gift', 'base', 'debito', 'estado', 'codigoControl', 'tipoVenta', 'codigoSucursal',
+    '_revision', '_tipoFac', '_obs', '_autor',
+]
+
+# Tablas cuyas columnas solo lee la proyección completa. Sus INNER JOIN
+# también filtran facturas, así que la reducida exige la misma fila con EXISTS
+INVENTORY_LOOKUP_JOINS = {
+    'tipoPago tp': 'tp.id = f.tipoPago',
+    'users u': 'u.id = f.autor',
+}
+
+_INVENTORY_BASE_JOINS = """
+        factura f
+        INNER JOIN datosfactura df ON df.idDatosFactura = f.lote
+        INNER JOIN factura_siat fs ON fs.factura_id = f.idFactura
+        INNER JOIN almacenes a ON a.idalmacen = f.almacen"""
+
+# Uniones de cada proyección: tipoPago y users solo se unen en la completa
+INVENTORY_JOINS = {
+    'full': _INVENTORY_BASE_JOINS + "".join(
+        f"\n        INNER JOIN {table} ON {condition}" for table, condition in INVENTORY_LOOKUP_JOINS.items()
+    ),
+    'slim': _INVENTORY_BASE_JOINS,
+}
+
+# Condiciones que igualan las facturas de la proyección reducida a las de la completa
+INVENTORY_ROW_FILTERS = {
+    'full': '',
+    'slim': "".join(
+        f"\n        AND EXISTS (SELECT 1 FROM {table} WHERE {condition})"
+        for table, condition in INVENTORY_LOOKUP_JOINS.items()
+    ),
+}
+
+# Columna opcional con a.idalmacen, para separar las filas por sucursal
+BRANCH_KEY_COLUMN = '_idalmacen'
+
+# Columnas que alimentan la suma de verificación por sucursal
+INVENTORY_SIGNATURE_COLUMNS = {
+    'full': "f.idFactura, f.fechaFac, nFactura, fs.cuf, f.ClienteNit, f.ClienteFactura, f.total, "
+            "anulada, codigoControl, df.manual, f.glosa, u.first_name, u.last_name",
+    'slim': "f.idFactura, f.fechaFac, nFactura, fs.cuf, f.ClienteNit, f.ClienteFactura, f.total, anulada",
+}
+
+def projection_columns(projection='full'):
+    """Columnas que se leen de la base para una proyección."""
+    if projection == 'slim':
+        return RECONCILIATION_COLUMNS
+    return [column for column in INVENTORY_FULL_COLUMNS if column in INVENTORY_COLUMN_EXPRESSIONS]
+
+def build_inventory_query(projection='full', branch_filter='', branch_key=False):
+    """
+    Consulta de facturas del inventario en un rango semiabierto de fechas
+    [inicio, fin): filtrar fechaFac sin funciones permite usar su índice.
+
+    Args:
+        projection (str): 'full' o 'slim' (ver PROJECTIONS)
+        branch_filter (str): Condición adicional sobre las sucursales
+        branch_key (bool): Si es True, agrega a.idalmacen como BRANCH_KEY_COLUMN
+
+    Returns:
+        str: Consulta SQL con marcadores %s para el inicio y el fin
+    """
+    expressions = [INVENTORY_COLUMN_EXPRESSIONS[column] for column in projection_columns(projection)]
+    if branch_key:
+        expressions.append(f"a.idalmacen {BRANCH_KEY_COLUMN}")
+    select = ",\n        ".join(expressions)
+    return f"""
+    SELECT
+        {select}
+    FROM{INVENTORY_JOINS[projection]}
+    WHERE
+        f.fechaFac >= %s
+        AND f.fechaFac < %s{INVENTORY_ROW_FILTERS[projection]}{branch_filter}
+    ORDER BY
+        a.idalmacen,
+        f.fechaFac,
+        df.idDatosFactura DESC,
+        nFactura
+"""
+
+def build_branch_signature_query(projection='full'):
+    """
+    Firma por sucursal de las facturas de un rango: cantidad, mayor idFactura
+    y suma de verificación de las columnas que lee la proyección.
+    """
+    return f"""
+    SELECT
+        a.idalmacen,
+        a.almacen,
+        COUNT(*) filas,
+        MAX(f.idFactura) max_id,
+        BIT_XOR(CRC32(CONCAT_WS('|', {INVENTORY_SIGNATURE_COLUMNS[projection]}))) checksum
+    FROM{INVENTORY_JOINS[projection]}
+    WHERE
+        f.fechaFac >= %s
+        AND f.fechaFac < %s{INVENTORY_ROW_FILTERS[projection]}
+    GROUP BY
+        a.idalmacen,
+        a.almacen
+    ORDER BY
+        a.idalmacen
+"""
+
+def add_constant_columns(df):
+    """
+    Completar una consulta 'full' con las columnas constantes, en el orden
+    de la exportación completa.
+
+    Args:
+        df (DataFrame): Facturas leídas con la proyección 'full'
+
+    Returns:
+        DataFrame: Facturas con todas las columnas de INVENTORY_FULL_COLUMNS
+        (las columnas adicionales, como BRANCH_KEY_COLUMN, quedan al final)
+    """
+    columns = {}
+    for column in INVENTORY_FULL_COLUMNS:
+        if column in df.columns:
+            columns[column] = df[column]
+        elif column in INVENTORY_TOTAL_COPIES:
+            columns[column] = df['importeTotal']
+        else:
+            columns[column] = pd.Series(INVENTORY_CONSTANT_COLUMNS[column], index=df.index,
+                                        dtype='int64' if isinstance(INVENTORY_CONSTANT_COLUMNS[column], int) else None)
+    for column in df.columns:
+        if column not in columns:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index)
+
+def query_inventory_invoices(db_params, start, end, fetch_size=DEFAULT_FETCH_SIZE, branch_ids=None, projection='full', branch_key=False):
+    """
+    Consultar las facturas del inventario con fechaFac en [start, end).
+
+    Args:
+        db_params (dict): Parámetros de conexión a la base de datos
+        start (date): Primer día incluido
+        end (date): Primer día excluido
+        fetch_size (int): Filas por lote del cursor sin búfer; None lee todo
+            de una vez con pd.read_sql
+        branch_ids (list, optional): Solo estas sucursales (a.idalmacen)
+        projection (str): 'full' (exportación completa, con las columnas
+            constantes agregadas en el cliente) o 'slim' (solo las columnas
+            de la comparación; tipoPago y users solo se verifican con EXISTS)
+        branch_key (bool): Si es True, incluye a.idalmacen en BRANCH_KEY_COLUMN
+
+    Returns:
+        DataFrame: Facturas del rango, o None si ocurre un error
+    """
+    try:
+        # Conectar a la base de datos
         conn = connect_to_db(db_params)
         if conn is None:
             return None
-        query = """
-            SELECT
-                DATE_FORMAT(f.fechaFac, '%d/%m/%Y') fechaFac,
-                nFactura,
-                fs.cuf autorizacion,
-                fs.codigoSucursal,
-                f.ClienteNit nit,
-                '' complemento,
-                f.ClienteFactura razonSocial,
-                f.total importeTotal,
-                0 ICE,
-                0 IEHD,
-                0 IPJ,
-                0 tasas,
-                0 otrosNoSujetos,
-                0 excentos,
-                0 ventasTasaCero,
-                f.total subTotal,
-                0 descuentos,
-                0 gift, 
-                f.total base,
-                ROUND ((f.total * 0.13), 3) AS debito,
-                IF(anulada = 0, 'V', 'A') estado,
-                IF(codigoControl = '', 0, codigoControl) AS codigoControl,
-                0 tipoVenta,
-                a.almacen _alm,
-                '' _revision,
-                IF(df.manual = 1, 'SIAT-DESKTOP-FE', 'ONLINE') _tipoFac,
-                f.glosa _obs,
-                concat(u.first_name, ' ' , u.last_name) _autor 
-            FROM
-                factura f
-                INNER JOIN datosfactura df ON df.idDatosFactura = f.lote
-                INNER JOIN factura_siat fs ON fs.factura_id = f.idFactura
-                INNER JOIN almacenes a ON a.idalmacen = f.almacen
-                INNER JOIN tipoPago tp ON tp.id = f.tipoPago
-                INNER JOIN users u on u.id = f.autor
-            WHERE
-                year(f.fechaFac) = %s
-                AND month(f.fechaFac) = %s
-            ORDER BY
-                a.idalmacen,
-                f.fechaFac,
-                df.idDatosFactura DESC,
-                nFactura
-        """
-        print(f"Consultando facturas del sistema de inventarios para {month}/{year}...")
-        df = pd.read_sql(query, conn, params=(year, month))
-        conn.close()
-        print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
+        
+        params = (start, end)
+        branch_filter = ''
+        if branch_ids:
+            branch_filter = f"\n        AND a.idalmacen IN ({', '.join(['%s'] * len(branch_ids))})"
+            params += tuple(branch_ids)
+        query = build_inventory_query(projection, branch_filter, branch_key)
+        
+        # Ejecutar la consulta y obtener los resultados en un DataFrame;
+        # cerrar la conexión la devuelve al pool también si la consulta falla
+        try:
+            if fetch_size:
+                df = fetch_dataframe(conn, query, params, fetch_size)
+            else:
+                df = pd.read_sql(query, conn, params=params)
+        finally:
+            conn.close()
+        if projection == 'full':
+            df = add_constant_columns(df)
         return df
+        
     except Exception as e:
         print(f"Error al consultar facturas del sistema de inventarios: {e}")
         return None
+
+def get_inventory_branch_signatures(db_params, start, end, projection='full'):
+    """
+    Obtener la firma por sucursal de las facturas del inventario en [start, end).
+
+    Args:
+        db_params (dict): Parámetros de conexión a la base de datos
+        start (date): Primer día incluido
+        end (date): Primer día excluido
+        projection (str): Proyección cuyas uniones y columnas se firman
+
+    Returns:
+        list: Dicts con 'idalmacen', 'almacen', 'filas', 'max_id' y 'checksum'
+        por sucursal (ordenados por idalmacen), o None si ocurre un error
+    """
+    try:
+        conn = connect_to_db(db_params)
+        if conn is None:
+            return None
+        try:
+            df = fetch_dataframe(conn, build_branch_signature_query(projection), (start, end))
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Error al consultar la firma de facturas del sistema de inventarios: {e}")
+        return None
+    return [
+        {
+            'idalmacen': int(row['idalmacen']),
+            'almacen': str(row['almacen']),
+            'filas': int(row['filas']),
+            'max_id': int(row['max_id']),
+            'checksum': int(row['checksum']),
+        }
+        for row in df.to_dict('records')
+    ]
@@ -3,6 +3,7 @@ Módulo para conexión y prueba de acceso a la base de datos contable.
 """
 import configparser
 import mysql.connector
+from ventas_plus.db_pool import get_connection
 
 def get_db_config_contabilidad(config_file_path):
     config = configparser.ConfigParser()
@@ -18,9 +19,13 @@ def get_db_config_contabilidad(config_file_path):
         'charset': config['mysql'].get('charset', 'utf8mb4')
     }
 
+def connect_contabilidad(db_params):
+    """Tomar una conexión del pool de la base contable; close() la devuelve al pool."""
+    return get_connection(db_params)
+
 def test_connection_contabilidad(db_params):
     try:
-        conn = mysql.connector.connect(**db_params)
+        conn = connect_contabilidad(db_params)
         print("Conexión exitosa a la base de datos contable.")
         conn.close()
         return True
@@ -4,6 +4,7 @@ Módulo para consultar totales de ventas por sucursal y general desde la API de
 import requests
 import os
 from datetime import datetime, timedelta
+from ventas_plus.branch_rules import hergo_branch_ids
 
 class HergoAPI:
     """
@@ -13,11 +14,7 @@ class HergoAPI:
     API_URL = "https://hergo.app/index.php/Reportes/mostrarVentasLineaMes"
     PRINCIPAL_URL = "https://hergo.app/principal"
     REPORTES_URL = "https://hergo.app/reportes/resumenVentasLineaMes"
-    SUCURSALES = {
-        'CENTRAL': 0,
-        'SANTA CRUZ': 5,
-        'POTOSI': 6,
-    }
+    SUCURSALES = hergo_branch_ids()
 
     def __init__(self, usuario=None, password=None):
         self.usuario = usuario or os.environ.get("HERGO_USER")
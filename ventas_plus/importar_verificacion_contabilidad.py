@@ -2,33 +2,234 @@
 Script para leer y mostrar el contenido del archivo de verificación completa generado por Ventas-Plus.
 Permite validar la lectura y el formato antes de avanzar con la importación a la base de datos contable.
 """
+import pandas as pd
 
-def main_import(mes, anno):
+# Formato de FECHA DE LA FACTURA en el archivo de verificación
+INVOICE_DATE_FORMAT = '%d/%m/%Y'
+
+# Textos que quedan en las columnas convertidas con astype(str) donde había nulos
+NAN_STRINGS = ('nan', 'NaN', 'NAN')
+
+# Columnas NOT NULL de sales_registers y su valor por defecto
+NUMERIC_NOT_NULL_COLUMNS = [
+    'total_sale_amount', 'ice_amount', 'iehd_amount', 'ipj_amount', 'fees',
+    'other_non_vat_items', 'exports_exempt_operations', 'zero_rate_taxed_sales',
+    'subtotal', 'discounts_bonuses_rebates_subject_to_vat', 'gift_card_amount',
+    'debit_tax_base_amount', 'debit_tax'
+]
+STRING_NOT_NULL_COLUMNS = [
+    'control_code', 'invoice_number', 'authorization_code', 'customer_nit', 'customer_name',
+    'status', 'sale_type', 'consolidation_status', 'invoice_date'
+]
+
+# Mapeo de columnas del archivo de verificación a la estructura de la base de datos
+VERIFICATION_COLUMNS = {
+    'FECHA DE LA FACTURA': 'invoice_date',
+    'Nº DE LA FACTURA': 'invoice_number',
+    'CODIGO DE AUTORIZACIÓN': 'authorization_code',
+    'NIT / CI CLIENTE': 'customer_nit',
+    'COMPLEMENTO': 'complement',
+    'NOMBRE O RAZON SOCIAL': 'customer_name',
+    'IMPORTE TOTAL DE LA VENTA': 'total_sale_amount',
+    'IMPORTE ICE': 'ice_amount',
+    'IMPORTE IEHD': 'iehd_amount',
+    'IMPORTE IPJ': 'ipj_amount',
+    'TASAS': 'fees',
+    'OTROS NO SUJETOS AL IVA': 'other_non_vat_items',
+    'EXPORTACIONES Y OPERACIONES EXENTAS': 'exports_exempt_operations',
+    'VENTAS GRAVADAS A TASA CERO': 'zero_rate_taxed_sales',
+    'SUBTOTAL': 'subtotal',
+    'DESCUENTOS, BONIFICACIONES Y REBAJAS SUJETAS AL IVA': 'discounts_bonuses_rebates_subject_to_vat',
+    'IMPORTE GIFT CARD': 'gift_card_amount',
+    'IMPORTE BASE PARA DEBITO FISCAL': 'debit_tax_base_amount',
+    'DEBITO FISCAL': 'debit_tax',
+    'ESTADO': 'status',
+    'CODIGO DE CONTROL': 'control_code',
+    'TIPO DE VENTA': 'sale_type',
+    'CON DERECHO A CREDITO FISCAL': 'right_to_tax_credit',
+    'ESTADO CONSOLIDACION': 'consolidation_status',
+    'SUCURSAL': 'branch_office',
+    'MODALIDAD': 'modality',
+    'TIPO EMISION': 'emission_type',
+    'TIPO FACTURA': 'invoice_type',
+    'SECTOR': 'sector',
+    '_obs': 'obs',
+    '_autor': 'author',
+    'OBSERVACIONES': 'observations',
+}
+
+# Columnas que se importan como texto, vengan de la verificación en memoria o del CSV
+TEXT_COLUMNS = [
+    col for col in VERIFICATION_COLUMNS.values()
+    if col != 'invoice_date' and col not in NUMERIC_NOT_NULL_COLUMNS
+]
+
+def parse_invoice_dates(values):
+    """
+    Convertir la columna de fechas (dd/mm/aaaa) a date, de forma vectorizada.
+
+    Args:
+        values (Series): Fechas como texto o ya como fechas
+
+    Returns:
+        Series: Objetos date; NaT donde la fecha falta o no es válida
+    """
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, format=INVOICE_DATE_FORMAT, errors='coerce')
+    return values.dt.date
+
+def mask_nan_strings(df):
+    """
+    Marcar como nulos los textos de NAN_STRINGS en las columnas de texto,
+    con una máscara por columna.
+
+    Returns:
+        DataFrame: Copia con esos valores como nulos
+    """
+    df = df.copy()
+    for col in df.columns:
+        column = df[col]
+        if pd.api.types.is_string_dtype(column) or column.dtype == object:
+            is_nan_text = column.isin(NAN_STRINGS)
+            if is_nan_text.any():
+                df[col] = column.mask(is_nan_text)
+    return df
+
+def fill_not_null_defaults(df):
+    """
+    Completar las columnas NOT NULL con su valor por defecto (0.0 o '0').
+
+    Los textos 'nan' se marcan como nulos antes de completar, así que en las
+    columnas NOT NULL también reciben el valor por defecto (antes quedaban
+    como NULL y la inserción fallaba); en las demás columnas quedan nulos.
+
+    Returns:
+        DataFrame: Copia con los nulos completados
+    """
+    df = mask_nan_strings(df)
+    defaults = {col: 0.0 for col in NUMERIC_NOT_NULL_COLUMNS}
+    defaults.update({col: '0' for col in STRING_NOT_NULL_COLUMNS})
+    return df.fillna({col: value for col, value in defaults.items() if col in df.columns})
+
+def read_verification_csv(path):
+    """
+    Leer el archivo de verificación completa con las columnas de TEXT_COLUMNS
+    como texto, para conservar valores como SUCURSAL '0000' o NIT con ceros.
+
+    Args:
+        path (str): Ruta de verificacion_completa_MM_AAAA.csv
+
+    Returns:
+        DataFrame: Verificación completa
+    """
+    text_sources = [source for source, col in VERIFICATION_COLUMNS.items() if col in TEXT_COLUMNS]
+    return pd.read_csv(path, encoding="utf-8", dtype={source: str for source in text_sources})
+
+def map_verification_columns(df):
+    """
+    Renombrar las columnas de la verificación a las de sales_registers y
+    ajustar sus tipos: fechas a date, importes a número y TEXT_COLUMNS a
+    texto. Los textos vacíos pasan a nulos, como al leerlos del CSV (que
+    escribe igual '' y NaN), así la verificación en memoria y la leída del
+    CSV producen las mismas filas.
+
+    Args:
+        df (DataFrame): Verificación completa (en memoria o de read_verification_csv)
+
+    Returns:
+        DataFrame: Copia con las columnas de VERIFICATION_COLUMNS
+    """
+    mapped_df = df.rename(columns=VERIFICATION_COLUMNS)
+    for col in VERIFICATION_COLUMNS.values():
+        if col not in mapped_df.columns:
+            mapped_df[col] = None
+
+    mapped_df['invoice_date'] = parse_invoice_dates(mapped_df['invoice_date'])
+    for col in NUMERIC_NOT_NULL_COLUMNS:
+        mapped_df[col] = pd.to_numeric(mapped_df[col], errors='coerce')
+    for col in TEXT_COLUMNS:
+        values = mapped_df[col]
+        text = values.astype(str)
+        mapped_df[col] = text.mask(values.isna() | text.eq(''))
+    return mapped_df
+
+def release_connection(conn, staging=None):
+    """
+    Revertir lo no confirmado, eliminar la tabla de staging (si se indica) y
+    devolver la conexión al pool.
+
+    Se usa en todas las salidas de main_import: como corre dentro de main.py,
+    una transacción abierta (con sus bloqueos) o una conexión sin devolver
+    quedarían retenidas en el pool. Los errores de cada paso solo se informan,
+    para no ocultar el error original de la importación.
+
+    Args:
+        conn (PooledMySQLConnection): Conexión a liberar
+        staging (str, optional): Tabla de staging a eliminar
+    """
+    from ventas_plus.staging_swap import drop_staging
+    steps = [('revertir la transacción', conn.rollback)]
+    if staging:
+        steps.append((f'eliminar la tabla {staging}', lambda: drop_staging(conn, staging)))
+    steps.append(('devolver la conexión', conn.close))
+    for description, step in steps:
+        try:
+            step()
+        except Exception as e:
+            print(f"   ⚠️  No se pudo {description}: {e}")
+
+def main_import(mes, anno, batch_size=None, commit_mode="run", resume_from=0, loader="insert", sync=False, staging=False, verification_df=None):
+    """
+    Importar la verificación completa de un mes a la tabla sales_registers.
+
+    Args:
+        mes (int): Mes a importar
+        anno (int): Año a importar
+        batch_size (int, optional): Filas por INSERT (por defecto DEFAULT_BATCH_SIZE)
+        commit_mode (str): 'run' (por defecto) confirma al final; 'batch'
+            confirma cada lote y permite reanudar con resume_from
+        resume_from (int): Reanudar una carga interrumpida omitiendo las
+            primeras N filas ya confirmadas (no borra el periodo)
+        loader (str): 'insert' (INSERT por lotes) o 'infile' (LOAD DATA LOCAL
+            INFILE desde un archivo temporal; si el servidor no lo permite se
+            usa 'insert')
+        sync (bool): Sincronizar por diferencias con el periodo existente
+            (inserta claves nuevas, actualiza las cambiadas y elimina las que
+            ya no están) en lugar de borrar y volver a insertar todo
+        staging (bool): Cargar primero en una tabla de staging, validar filas
+            y totales allí y reemplazar el periodo en una sola transacción
+        verification_df (DataFrame, optional): Verificación completa ya
+            calculada en este proceso (con sus tipos); si es None se lee
+            data/output/verificacion_completa_MM_AAAA.csv
+
+    Returns:
+        bool: True si la importación terminó; False si falló o se canceló
+    """
     import pandas as pd
     import os
     import numpy as np
-    from datetime import datetime
-    # Formato de nombre de archivo según README
-    csv_path = os.path.join(
-        "data", "output", f"verificacion_completa_{mes:02d}_{anno}.csv"
-    )
-    if not os.path.exists(csv_path):
-        print(f"No se encontró el archivo: {csv_path}")
-        return
     print(f"\n=== IMPORTACIÓN A BASE CONTABLE ===")
     print(f"📅 Procesando: {mes:02d}/{anno}")
-    print(f"📂 Archivo: {csv_path}")
-    
-    if not os.path.exists(csv_path):
-        print(f"❌ ERROR: No se encontró el archivo de verificación completa")
-        print(f"   Archivo esperado: {csv_path}")
-        print(f"   Ejecuta primero la verificación con: python main.py -m {mes} -y {anno} -v")
-        return
+    if verification_df is not None:
+        print("📂 Origen: verificación en memoria")
+        df = verification_df
+    else:
+        # Formato de nombre de archivo según README
+        csv_path = os.path.join(
+            "data", "output", f"verificacion_completa_{mes:02d}_{anno}.csv"
+        )
+        print(f"📂 Archivo: {csv_path}")
         
-    print(f"📊 Cargando datos del archivo...")
-    df = pd.read_csv(csv_path, encoding="utf-8")
+        if not os.path.exists(csv_path):
+            print(f"❌ ERROR: No se encontró el archivo de verificación completa")
+            print(f"   Archivo esperado: {csv_path}")
+            print(f"   Ejecuta primero la verificación con: python main.py -m {mes} -y {anno} -v")
+            return False
+            
+        print(f"📊 Cargando datos del archivo...")
+        df = read_verification_csv(csv_path)
     
-    print(f"✅ Archivo cargado exitosamente")
+    print(f"✅ Datos cargados exitosamente")
     print(f"   📋 Columnas detectadas: {len(df.columns)}")
     print(f"   📄 Total de filas: {len(df):,}")
     
@@ -38,65 +239,8 @@ def main_import(mes, anno):
     # --- TRANSFORMACIÓN Y VALIDACIÓN DE DATOS ---
     print(f"\n--- PREPARANDO DATOS PARA IMPORTACIÓN ---")
     
-    # Mapeo de columnas del CSV a la estructura de la base de datos
-    column_map = {
-        'FECHA DE LA FACTURA': 'invoice_date',
-        'Nº DE LA FACTURA': 'invoice_number',
-        'CODIGO DE AUTORIZACIÓN': 'authorization_code',
-        'NIT / CI CLIENTE': 'customer_nit',
-        'COMPLEMENTO': 'complement',
-        'NOMBRE O RAZON SOCIAL': 'customer_name',
-        'IMPORTE TOTAL DE LA VENTA': 'total_sale_amount',
-        'IMPORTE ICE': 'ice_amount',
-        'IMPORTE IEHD': 'iehd_amount',
-        'IMPORTE IPJ': 'ipj_amount',
-        'TASAS': 'fees',
-        'OTROS NO SUJETOS AL IVA': 'other_non_vat_items',
-        'EXPORTACIONES Y OPERACIONES EXENTAS': 'exports_exempt_operations',
-        'VENTAS GRAVADAS A TASA CERO': 'zero_rate_taxed_sales',
-        'SUBTOTAL': 'subtotal',
-        'DESCUENTOS, BONIFICACIONES Y REBAJAS SUJETAS AL IVA': 'discounts_bonuses_rebates_subject_to_vat',
-        'IMPORTE GIFT CARD': 'gift_card_amount',
-        'IMPORTE BASE PARA DEBITO FISCAL': 'debit_tax_base_amount',
-        'DEBITO FISCAL': 'debit_tax',
-        'ESTADO': 'status',
-        'CODIGO DE CONTROL': 'control_code',
-        'TIPO DE VENTA': 'sale_type',
-        'CON DERECHO A CREDITO FISCAL': 'right_to_tax_credit',
-        'ESTADO CONSOLIDACION': 'consolidation_status',
-        'SUCURSAL': 'branch_office',
-        'MODALIDAD': 'modality',
-        'TIPO EMISION': 'emission_type',
-        'TIPO FACTURA': 'invoice_type',
-        'SECTOR': 'sector',
-        '_obs': 'obs',
-        '_autor': 'author',
-        'OBSERVACIONES': 'observations',
-    }
-    
-    # Aplicar transformaciones
-    mapped_df = df.rename(columns=column_map)
-    expected_cols = list(column_map.values())
-    missing_cols = [col for col in expected_cols if col not in mapped_df.columns]
-    for col in missing_cols:
-        mapped_df[col] = None
-
-    def parse_date(val):
-        try:
-            return datetime.strptime(str(val), '%d/%m/%Y').date()
-        except Exception:
-            return None
-
-    # Transformar fechas y números
-    mapped_df['invoice_date'] = mapped_df['invoice_date'].apply(parse_date)
-    float_cols = [
-        'total_sale_amount', 'ice_amount', 'iehd_amount', 'ipj_amount', 'fees',
-        'other_non_vat_items', 'exports_exempt_operations', 'zero_rate_taxed_sales',
-        'subtotal', 'discounts_bonuses_rebates_subject_to_vat', 'gift_card_amount',
-        'debit_tax_base_amount', 'debit_tax'
-    ]
-    for col in float_cols:
-        mapped_df[col] = pd.to_numeric(mapped_df[col], errors='coerce')
+    # Mapear columnas y ajustar tipos (igual para la verificación en memoria y el CSV)
+    mapped_df = map_verification_columns(df)
 
     print(f"🔄 Datos transformados correctamente")
     
@@ -129,9 +273,17 @@ def main_import(mes, anno):
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from ventas_plus.db_utils_contabilidad import get_db_config_contabilidad
+    from ventas_plus.db_utils_contabilidad import connect_contabilidad, get_db_config_contabilidad
+    from ventas_plus.bulk_loader import (
+        DEFAULT_BATCH_SIZE, LocalInfileUnavailable, bulk_insert, dataframe_rows, load_data_local_infile,
+    )
+    from ventas_plus.upsert_sync import sync_period
+    from ventas_plus.staging_swap import (
+        prepare_staging, staging_summary, staging_table_name, swap_period, validate_staging,
+    )
     import mysql.connector
 
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
     config_path = "db_config_contabilidad.ini"
     db_params = get_db_config_contabilidad(config_path)
 
@@ -166,56 +318,75 @@ def main_import(mes, anno):
         print(f"  ✅ Facturas válidas: {status_counts.get('V', 0):,}")
         print(f"  ❌ Facturas anuladas: {status_counts.get('A', 0):,}")
 
-    try:
-        conn = mysql.connector.connect(**db_params)
+    if sync and (resume_from or loader != 'insert' or staging):
+        print("   La sincronización por diferencias ignora --resume-from, --loader y --staging.")
+        resume_from, loader, staging = 0, 'insert', False
+    if staging and resume_from:
+        print("   La carga por staging recrea la tabla de staging; se ignora --resume-from.")
+        resume_from = 0
+
+    if sync:
+        print("\n🔁 Modo sincronización: solo se escribirán las facturas nuevas, cambiadas o eliminadas del periodo.")
+    elif resume_from:
+        print(f"\n↪️  Reanudando carga desde la fila {resume_from:,}: se conservan los registros ya confirmados.")
+    else:
+        conn = None
+        try:
+            conn = connect_contabilidad(db_params)
         
-        # Verificar si existen registros para el periodo
-        cursor = conn.cursor()
-        query = "SELECT COUNT(*) FROM sales_registers WHERE invoice_date >= %s AND invoice_date <= %s"
-        cursor.execute(query, (fecha_inicio, fecha_fin))
-        count = cursor.fetchone()[0]
+            # Verificar si existen registros para el periodo
+            cursor = conn.cursor()
+            query = "SELECT COUNT(*) FROM sales_registers WHERE invoice_date >= %s AND invoice_date <= %s"
+            cursor.execute(query, (fecha_inicio, fecha_fin))
+            count = cursor.fetchone()[0]
         
-        # Leer registros existentes para comparación
-        query_comp = (
-            "SELECT authorization_code, total_sale_amount, debit_tax, status FROM sales_registers "
-            "WHERE invoice_date >= %s AND invoice_date <= %s"
-        )
-        db_df = pd.read_sql(query_comp, conn, params=(fecha_inicio, fecha_fin))
-        conn.close()
+            # Leer registros existentes para comparación
+            query_comp = (
+                "SELECT authorization_code, total_sale_amount, debit_tax, status FROM sales_registers "
+                "WHERE invoice_date >= %s AND invoice_date <= %s"
+            )
+            db_df = pd.read_sql(query_comp, conn, params=(fecha_inicio, fecha_fin))
+            # No retener la conexión mientras se espera la confirmación
+            conn.close()
+            conn = None
         
-        # Mostrar resúmenes
-        resumen_registros(db_df, "EXISTENTE en base de datos")
-        resumen_registros(mapped_df, "NUEVO desde archivo CSV")
+            # Mostrar resúmenes
+            resumen_registros(db_df, "EXISTENTE en base de datos")
+            resumen_registros(mapped_df, "NUEVO desde archivo CSV")
         
-        # Manejar casos según existencia de datos
-        if count > 0:
-            print(f"\n⚠️  ATENCIÓN: Ya existen {count:,} registros para {mes:02d}/{anno} en la base contable.")
-            print("   Si continúas, los registros existentes serán ELIMINADOS y reemplazados.")
-            print("   Compara los resúmenes antes de decidir.")
+            # Manejar casos según existencia de datos
+            if count > 0:
+                print(f"\n⚠️  ATENCIÓN: Ya existen {count:,} registros para {mes:02d}/{anno} en la base contable.")
+                print("   Si continúas, los registros existentes serán ELIMINADOS y reemplazados.")
+                print("   Compara los resúmenes antes de decidir.")
             
-            respuesta = input(f"\n¿Confirmas REEMPLAZAR los {count:,} registros existentes? (s/N): ").strip().lower()
-            if respuesta == 's':
-                try:
-                    conn = mysql.connector.connect(**db_params)
-                    cursor = conn.cursor()
-                    delete_query = "DELETE FROM sales_registers WHERE invoice_date >= %s AND invoice_date <= %s"
-                    cursor.execute(delete_query, (fecha_inicio, fecha_fin))
-                    conn.commit()
-                    print(f"✅ Se eliminaron {cursor.rowcount:,} registros del periodo {mes:02d}/{anno}.")
-                    conn.close()
-                except Exception as e:
-                    print(f"❌ Error al eliminar registros existentes: {e}")
-                    sys.exit(1)
+                respuesta = input(f"\n¿Confirmas REEMPLAZAR los {count:,} registros existentes? (s/N): ").strip().lower()
+                if respuesta == 's' and staging:
+                    print("   El periodo se reemplazará en una sola transacción después de validar la tabla de staging.")
+                elif respuesta == 's':
+                    try:
+                        conn = connect_contabilidad(db_params)
+                        cursor = conn.cursor()
+                        delete_query = "DELETE FROM sales_registers WHERE invoice_date >= %s AND invoice_date <= %s"
+                        cursor.execute(delete_query, (fecha_inicio, fecha_fin))
+                        conn.commit()
+                        print(f"✅ Se eliminaron {cursor.rowcount:,} registros del periodo {mes:02d}/{anno}.")
+                    except Exception as e:
+                        print(f"❌ Error al eliminar registros existentes: {e}")
+                        return False
+                else:
+                    print("❌ Operación cancelada por el usuario. No se realizó la importación.")
+                    return False
             else:
-                print("❌ Operación cancelada por el usuario. No se realizó la importación.")
-                sys.exit(1)
-        else:
-            print(f"\n✅ Perfecto: No existen registros previos para {mes:02d}/{anno}.")
-            print("   Se puede proceder directamente con la importación.")
+                print(f"\n✅ Perfecto: No existen registros previos para {mes:02d}/{anno}.")
+                print("   Se puede proceder directamente con la importación.")
             
-    except Exception as e:
-        print(f"❌ Error al verificar registros existentes en la base contable: {e}")
-        sys.exit(1)
+        except Exception as e:
+            print(f"❌ Error al verificar registros existentes en la base contable: {e}")
+            return False
+        finally:
+            if conn is not None:
+                release_connection(conn)
 
     # --- INSERCIÓN DE DATOS EN LA BASE CONTABLE ---
     print(f"\n--- INICIANDO IMPORTACIÓN A BASE CONTABLE ---")
@@ -225,8 +396,15 @@ def main_import(mes, anno):
     mapped_df.head(20).to_csv(f"data/output/preview_import_contabilidad_{mes:02d}_{anno}.csv", index=False)
     print(f"💾 Vista previa guardada: preview_import_contabilidad_{mes:02d}_{anno}.csv")
 
+    if loader == 'infile' and resume_from:
+        print("   La reanudación usa INSERT por lotes; se ignora --loader infile.")
+        loader = 'insert'
+
+    conn = None
+    staging_target = None
     try:
-        conn = mysql.connector.connect(**db_params)
+        # LOAD DATA LOCAL INFILE requiere habilitarlo al abrir la conexión
+        conn = connect_contabilidad(dict(db_params, allow_local_infile=True) if loader == 'infile' else db_params)
         cursor = conn.cursor()
         
         # Verificar columnas de la tabla destino
@@ -247,81 +425,145 @@ def main_import(mes, anno):
         insert_df = mapped_df[insert_cols]
         
         # Completar campos obligatorios con valores por defecto
-        numeric_notnull_cols = [
-            'total_sale_amount', 'ice_amount', 'iehd_amount', 'ipj_amount', 'fees',
-            'other_non_vat_items', 'exports_exempt_operations', 'zero_rate_taxed_sales',
-            'subtotal', 'discounts_bonuses_rebates_subject_to_vat', 'gift_card_amount',
-            'debit_tax_base_amount', 'debit_tax'
-        ]
-        for col in numeric_notnull_cols:
-            if col in insert_df.columns:
-                insert_df[col] = insert_df[col].fillna(0.0)
-        
-        string_notnull_cols = [
-            'control_code', 'invoice_number', 'authorization_code', 'customer_nit', 'customer_name',
-            'status', 'sale_type', 'consolidation_status', 'invoice_date'
-        ]
-        for col in string_notnull_cols:
-            if col in insert_df.columns:
-                insert_df[col] = insert_df[col].fillna('0')
+        insert_df = fill_not_null_defaults(insert_df)
         
         # Eliminar campos que ya no existen en la nueva estructura
         if 'right_to_tax_credit' in insert_df.columns:
             insert_df = insert_df.drop(columns=['right_to_tax_credit'])
             insert_cols = [c for c in insert_cols if c != 'right_to_tax_credit']
         
-        # Convertir valores nulos apropiadamente para MySQL
-        insert_df = insert_df.map(lambda x: None if (pd.isnull(x) or str(x).lower() == 'nan') else x)
+        # Tabla donde se cargan las filas: la definitiva o la de staging del periodo
+        target = 'sales_registers'
+        if staging:
+            target = staging_table_name('sales_registers', anno, mes)
+            staging_target = target
+            prepare_staging(conn, 'sales_registers', target)
+            print(f"🧱 Tabla de staging preparada: {target}")
         
-        # Realizar inserción bulk
-        values = [tuple(row) for row in insert_df.values]
-        placeholders = ','.join(['%s'] * len(insert_cols))
-        sql = f"INSERT INTO sales_registers ({', '.join(insert_cols)}) VALUES ({placeholders})"
+        # Realizar inserción por lotes de INSERT de varias filas (tuplas con None en los nulos)
+        rows = dataframe_rows(insert_df, insert_cols)
         
-        print(f"🔄 Insertando registros en sales_registers...")
-        cursor.executemany(sql, values)
-        conn.commit()
+        if sync:
+            print("🔄 Sincronizando sales_registers por diferencias...")
+            result = sync_period(
+                conn, 'sales_registers', insert_df, insert_cols, 'invoice_date',
+                fecha_inicio, fecha_fin, batch_size=batch_size
+            )
+            print(
+                f"✅ ÉXITO: {mes:02d}/{anno} sincronizado: {result['insertadas']:,} insertados, "
+                f"{result['actualizadas']:,} actualizados, {result['eliminadas']:,} eliminados."
+            )
+            rows = None
+        elif loader == 'infile':
+            print(f"🔄 Cargando registros en {target} con LOAD DATA LOCAL INFILE...")
+            try:
+                written, loaded, warnings = load_data_local_infile(conn, target, insert_cols, rows)
+            except LocalInfileUnavailable as e:
+                print(f"   ⚠️  LOAD DATA LOCAL no disponible ({e}); se usa INSERT por lotes.")
+                conn.rollback()
+                rows = dataframe_rows(insert_df, insert_cols)
+            else:
+                if loaded != written:
+                    print(f"   ⚠️  El servidor cargó {loaded:,} de {written:,} filas; revisar advertencias.")
+                print(f"✅ ÉXITO: Se cargaron {loaded:,} registros en {target} para {mes:02d}/{anno} ({len(warnings)} advertencias).")
+                rows = None
+        
+        if rows is not None:
+            print(f"🔄 Insertando registros en {target} (lotes de {batch_size:,}, confirmación por {'lote' if commit_mode == 'batch' else 'corrida'})...")
+            try:
+                inserted_count = bulk_insert(
+                    conn, target, insert_cols, rows,
+                    batch_size=batch_size, commit_mode=commit_mode,
+                    start_row=resume_from, total=len(insert_df)
+                )
+            except Exception as e:
+                committed = getattr(e, 'committed_rows', resume_from)
+                if commit_mode == 'batch' and committed:
+                    print(f"   Filas confirmadas hasta el error: {committed:,}. Para reanudar: --resume-from {committed}")
+                raise
         
-        inserted_count = cursor.rowcount
-        print(f"✅ ÉXITO: Se insertaron {inserted_count:,} registros en sales_registers para {mes:02d}/{anno}.")
+            print(f"✅ ÉXITO: Se insertaron {inserted_count:,} registros en {target} para {mes:02d}/{anno}.")
+        
+        if staging:
+            # Validar staging y reemplazar el periodo en una sola transacción
+            sum_columns = [col for col in ('total_sale_amount', 'debit_tax') if col in insert_cols]
+            expected = {'filas': len(insert_df)}
+            expected.update({col: float(pd.to_numeric(insert_df[col]).round(2).sum()) for col in sum_columns})
+            problems = validate_staging(staging_summary(conn, target, sum_columns), expected)
+            if problems:
+                print("❌ La tabla de staging no coincide con el archivo; no se modificó sales_registers:")
+                for problem in problems:
+                    print(f"   - {problem}")
+                return False
+            deleted, inserted = swap_period(conn, 'sales_registers', target, insert_cols, 'invoice_date', fecha_inicio, fecha_fin)
+            print(f"✅ Periodo {mes:02d}/{anno} reemplazado desde staging: {deleted:,} eliminados, {inserted:,} insertados.")
         
         # Verificación final rápida
         cursor.execute("SELECT COUNT(*) FROM sales_registers WHERE invoice_date >= %s AND invoice_date <= %s", (fecha_inicio, fecha_fin))
         final_count = cursor.fetchone()[0]
         print(f"📊 Verificación: Total de registros en base para {mes:02d}/{anno}: {final_count:,}")
-        
-        conn.close()
+        return True
         
     except mysql.connector.IntegrityError as ie:
         print(f"❌ ERROR de integridad: {ie}")
         print("   Posiblemente hay códigos de autorización duplicados o violación de restricción.")
-        sys.exit(1)
+        return False
     except Exception as e:
         print(f"❌ Error general durante la inserción: {e}")
-        sys.exit(1)
+        return False
+    finally:
+        # Revertir lo no confirmado, eliminar staging y devolver la conexión al pool
+        if conn is not None:
+            release_connection(conn, staging_target)
 
 # --- Script entrypoint ---
 if __name__ == "__main__":
+    import argparse
+    import os
     import sys
-    if len(sys.argv) != 3:
-        print("Uso: python importar_verificacion_contabilidad.py <mes> <año>")
-        print("Ejemplo: python importar_verificacion_contabilidad.py 1 2025")
-        sys.exit(1)
-    mes = int(sys.argv[1])
-    anno = int(sys.argv[2])
-    main_import(mes, anno)
-    sys.exit(0)
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from ventas_plus.bulk_loader import COMMIT_MODES, DEFAULT_BATCH_SIZE, LOADERS
+    parser = argparse.ArgumentParser(
+        description="Importar la verificación completa de un mes a la base contable.",
+        epilog="Ejemplo: python importar_verificacion_contabilidad.py 1 2025 --batch-size 2000"
+    )
+    parser.add_argument('mes', type=int, help='Mes a importar (1-12)')
+    parser.add_argument('anno', type=int, help='Año a importar (ej. 2025)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Filas por INSERT de varias filas')
+    parser.add_argument('--commit', choices=COMMIT_MODES, default='run',
+                        help="'run' confirma todo al final (por defecto); 'batch' confirma cada lote (permite reanudar)")
+    parser.add_argument('--resume-from', type=int, default=0,
+                        help='Reanudar una carga interrumpida con --commit batch omitiendo las primeras N filas ya confirmadas')
+    parser.add_argument('--loader', choices=LOADERS, default='insert',
+                        help="'insert' usa INSERT por lotes; 'infile' usa LOAD DATA LOCAL INFILE (requiere local_infile en el servidor)")
+    parser.add_argument('--sync', action='store_true',
+                        help='Sincronizar por diferencias (insertar nuevas, actualizar cambiadas, eliminar ausentes) sin borrar el periodo')
+    parser.add_argument('--staging', action='store_true',
+                        help='Cargar en una tabla de staging, validar filas y totales y reemplazar el periodo en una sola transacción')
+    args = parser.parse_args()
+    ok = main_import(args.mes, args.anno, batch_size=args.batch_size, commit_mode=args.commit,
+                     resume_from=args.resume_from, loader=args.loader, sync=args.sync, staging=args.staging)
+    sys.exit(0 if ok else 1)
 
 '''
 DOCUMENTACIÓN DEL FLUJO DE IMPORTACIÓN (resumen):
 
 1. El script lee el archivo CSV de verificación completa generado por Ventas-Plus para el mes y año indicados.
+   Desde main.py (-v --upload-contable) la verificación se pasa en memoria (verification_df), sin volver a leer el CSV.
 2. Valida y transforma los datos:
    - Renombra columnas y ajusta tipos de datos.
    - Valida nulos en campos obligatorios y duplicados clave.
    - Prepara el DataFrame para coincidir con la estructura de la tabla sales_registers.
 3. Antes de insertar, verifica si ya existen registros para ese mes y año en la base contable. Si existen, advierte y detiene el proceso para evitar duplicados.
-4. Si no existen registros previos, realiza un bulk insert eficiente de todos los datos en la tabla sales_registers.
+4. Si no existen registros previos, inserta los datos en la tabla sales_registers por lotes de INSERT de varias filas
+   (--batch-size), mostrando filas/segundo y confirmando por lote o al final (--commit); con --resume-from
+   se reanuda una carga interrumpida sin borrar lo ya confirmado. Con --loader infile las filas se escriben en un
+   archivo temporal (en el orden de SHOW COLUMNS) y se cargan con LOAD DATA LOCAL INFILE, informando filas cargadas
+   y advertencias; si el servidor no lo permite se vuelve al INSERT por lotes.
+   Con --sync no se borra el periodo: se comparan hashes de cada fila con los de las filas existentes (leídas en una
+   sola consulta) por authorization_code y solo se insertan, actualizan o eliminan las diferencias.
+   Con --staging el periodo no se borra antes de cargar: las filas van a una tabla de staging (CREATE TABLE LIKE),
+   se validan filas y totales y el periodo se reemplaza en una sola transacción (DELETE + INSERT ... SELECT).
 5. Maneja errores de integridad (por ejemplo, códigos de autorización duplicados) y reporta la cantidad de registros insertados.
 6. Guarda una vista previa de los primeros 20 registros transformados para revisión manual.
 
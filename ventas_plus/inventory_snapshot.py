@@ -0,0 +1,177 @@
+"""
+Instantánea local de las facturas del inventario por mes.
+
+Volver a verificar un mes cerrado consultaba de nuevo la base de producción
+aunque casi nada hubiera cambiado. Este módulo guarda el resultado de la
+consulta del mes en formato columnar (Parquet) bajo ``data/cache/inventario``
+junto con una firma por sucursal (cantidad de facturas, mayor idFactura y una
+suma de verificación BIT_XOR(CRC32(...)) de sus columnas).
+
+En las siguientes ejecuciones solo se consulta la firma, que es una
+agregación por sucursal; las sucursales cuya firma no cambió se toman de la
+instantánea y solo las que cambiaron se vuelven a consultar y se reemplazan.
+La instantánea guarda además ``a.idalmacen`` (BRANCH_KEY_COLUMN), la misma
+clave de las firmas, para separar las filas de cada sucursal.
+"""
+import json
+import os
+import pandas as pd
+from ventas_plus.db_utils import (
+    BRANCH_KEY_COLUMN,
+    get_inventory_branch_signatures,
+    month_date_range,
+    query_inventory_invoices,
+)
+
+# Cambiar si cambian las columnas de la consulta de facturas o de la firma
+SNAPSHOT_VERSION = "3"
+SIGNATURE_FIELDS = ('filas', 'max_id', 'checksum')
+
+def get_snapshot_dir(project_root):
+    """Directorio de instantáneas del inventario dentro de la caché."""
+    return os.path.join(project_root, "data", "cache", "inventario")
+
+def snapshot_paths(snapshot_dir, year, month, projection='full'):
+    """Rutas (datos Parquet, firma JSON) de la instantánea de un mes y proyección."""
+    base = os.path.join(snapshot_dir, f"inventario_{int(year)}_{int(month):02d}_{projection}")
+    return base + ".parquet", base + ".json"
+
+def load_snapshot(snapshot_dir, year, month, projection='full'):
+    """
+    Leer la instantánea de un mes.
+
+    Returns:
+        tuple: (DataFrame, lista de firmas por sucursal), o (None, None) si no
+        existe, es de otra versión o no se puede leer
+    """
+    data_path, meta_path = snapshot_paths(snapshot_dir, year, month, projection)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('version') != SNAPSHOT_VERSION:
+            return None, None
+        return pd.read_parquet(data_path), meta['sucursales']
+    except Exception as e:
+        print(f"Advertencia: no se pudo leer la instantánea del inventario {data_path}: {e}")
+        return None, None
+
+def store_snapshot(snapshot_dir, year, month, df, signatures, projection='full'):
+    """
+    Guardar la instantánea de un mes (datos y firma por sucursal).
+
+    Returns:
+        bool: True si se guardó
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    data_path, meta_path = snapshot_paths(snapshot_dir, year, month, projection)
+    try:
+        df.to_parquet(data_path + ".tmp")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'sucursales': signatures}, f)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+    except Exception as e:
+        print(f"Advertencia: no se pudo guardar la instantánea del inventario: {e}")
+        for path in (data_path + ".tmp", meta_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+        return False
+    return True
+
+def changed_branches(stored, current):
+    """
+    Sucursales cuya firma cambió (o que no estaban en la instantánea).
+
+    Args:
+        stored (list): Firmas guardadas
+        current (list): Firmas actuales
+
+    Returns:
+        list: idalmacen de las sucursales a volver a consultar
+    """
+    previous = {signature['idalmacen']: signature for signature in stored}
+    return [
+        signature['idalmacen'] for signature in current
+        if signature['idalmacen'] not in previous
+        or any(previous[signature['idalmacen']][field] != signature[field] for field in SIGNATURE_FIELDS)
+    ]
+
+def merge_branches(snapshot, fresh, signatures, changed):
+    """
+    Armar el mes con las sucursales sin cambios de la instantánea y las
+    cambiadas de la consulta nueva, en el orden de la consulta (idalmacen).
+
+    Las filas se separan por BRANCH_KEY_COLUMN (a.idalmacen), la clave de
+    las firmas.
+
+    Args:
+        snapshot (DataFrame): Facturas guardadas
+        fresh (DataFrame): Facturas recién consultadas de las sucursales cambiadas
+        signatures (list): Firmas actuales (definen qué sucursales existen y su orden)
+        changed (list): idalmacen de las sucursales cambiadas
+
+    Returns:
+        DataFrame: Facturas del mes
+    """
+    snapshot_branch = snapshot[BRANCH_KEY_COLUMN].astype('int64')
+    fresh_branch = fresh[BRANCH_KEY_COLUMN].astype('int64')
+    changed = set(changed)
+    parts = []
+    for signature in signatures:
+        if signature['idalmacen'] in changed:
+            parts.append(fresh[(fresh_branch == signature['idalmacen']).to_numpy()])
+        else:
+            parts.append(snapshot[(snapshot_branch == signature['idalmacen']).to_numpy()])
+    if not parts:
+        return snapshot.iloc[0:0]
+    return pd.concat(parts, ignore_index=True)
+
+def load_inventory_month(db_params, snapshot_dir, year, month, refresh=False, projection='full'):
+    """
+    Facturas del inventario de un mes, usando la instantánea local si existe.
+
+    Args:
+        db_params (dict): Parámetros de conexión a la base de datos
+        snapshot_dir (str): Directorio de instantáneas
+        year (int): Año
+        month (int): Mes
+        refresh (bool): Si es True, ignora la instantánea y recarga el mes completo
+        projection (str): 'full' o 'slim'; cada proyección tiene su instantánea
+
+    Returns:
+        DataFrame: Facturas del mes, o None si ocurre un error en la consulta
+    """
+    start, end = month_date_range(year, month)
+    signatures = get_inventory_branch_signatures(db_params, start, end, projection=projection)
+    if signatures is None:
+        return None
+
+    snapshot, stored = (None, None) if refresh else load_snapshot(snapshot_dir, year, month, projection)
+    if snapshot is None:
+        print(f"Consultando facturas del sistema de inventarios para {month}/{year}...")
+        df = query_inventory_invoices(db_params, start, end, projection=projection, branch_key=True)
+        if df is None:
+            return None
+        print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
+        store_snapshot(snapshot_dir, year, month, df, signatures, projection)
+        return df.drop(columns=BRANCH_KEY_COLUMN)
+
+    changed = changed_branches(stored, signatures)
+    removed = {signature['idalmacen'] for signature in stored} - {signature['idalmacen'] for signature in signatures}
+    if not changed and not removed:
+        print(f"Usando instantánea del inventario ({len(snapshot)} facturas, sin cambios).")
+        return snapshot.drop(columns=BRANCH_KEY_COLUMN)
+
+    print(f"Actualizando instantánea del inventario: {len(changed)} sucursal(es) con cambios.")
+    fresh = (
+        query_inventory_invoices(db_params, start, end, branch_ids=changed, projection=projection, branch_key=True)
+        if changed else snapshot.iloc[0:0]
+    )
+    if fresh is None:
+        return None
+    df = merge_branches(snapshot, fresh, signatures, changed)
+    store_snapshot(snapshot_dir, year, month, df, signatures, projection)
+    print(f"Se encontraron {len(df)} facturas en el sistema de inventarios")
+    return df.drop(columns=BRANCH_KEY_COLUMN)
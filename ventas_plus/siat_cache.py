@@ -0,0 +1,199 @@
+"""
+Caché persistente de los meses SIAT ya procesados.
+
+Cada ZIP mensual del SIAT se lee con openpyxl y se decodifica (CUF) en cada
+ejecución aunque no haya cambiado. Este módulo guarda el DataFrame procesado
+en formato columnar (Parquet) bajo ``data/cache`` y lo reutiliza mientras el
+contenido del ZIP y la versión del decodificador sean los mismos.
+
+- La clave es el hash SHA-256 del ZIP, la hoja y el motor de Excel leídos,
+  más la versión del decodificador y la huella del estándar de columnas
+  (ventas_estandar_siatt.json), por lo que cualquier cambio en uno de ellos
+  invalida la entrada automáticamente.
+- Las entradas de otras versiones del decodificador o del estándar se
+  eliminan al acceder.
+- Cuando el tamaño total supera el límite se eliminan las entradas usadas
+  menos recientemente.
+"""
+import hashlib
+import os
+import re
+import pandas as pd
+from ventas_plus.cuf_decoder import CUF_DECODER_VERSION
+from ventas_plus.data_ingestion import process_zipped_sales_excel, resolve_excel_engine
+from ventas_plus.siat_schema import schema_fingerprint
+from ventas_plus.ventas_processing import process_sales_data
+
+CACHE_EXTENSION = ".parquet"
+DEFAULT_CACHE_MAX_MB = 512
+
+def get_cache_dir(project_root):
+    """Directorio de caché junto a data/output."""
+    return os.path.join(project_root, "data", "cache")
+
+def get_cache_max_bytes():
+    """Límite de tamaño de la caché (variable de entorno VENTAS_CACHE_MAX_MB)."""
+    try:
+        max_mb = float(os.environ.get("VENTAS_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+    except ValueError:
+        max_mb = DEFAULT_CACHE_MAX_MB
+    return int(max_mb * 1024 * 1024)
+
+def zip_fingerprint(zip_file_path, block_size=1024 * 1024):
+    """
+    Calcular el hash SHA-256 del contenido de un archivo ZIP.
+
+    Args:
+        zip_file_path (str): Ruta al archivo ZIP
+        block_size (int): Tamaño de bloque de lectura
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    digest = hashlib.sha256()
+    with open(zip_file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_version():
+    """Sufijo de versión: decodificador CUF y estándar de columnas."""
+    return f"_d{CUF_DECODER_VERSION}_s{schema_fingerprint()}"
+
+def cache_key(zip_file_path, sheet_name="hoja1", engine=None):
+    """
+    Clave de caché: hash del ZIP, hoja y motor de Excel, más la versión del
+    decodificador y del estándar (siempre al final, ver _is_current_version).
+    """
+    sheet = re.sub(r"[^0-9A-Za-z]+", "-", str(sheet_name))
+    return f"{zip_fingerprint(zip_file_path)}_h{sheet}_e{resolve_excel_engine(engine)}{cache_version()}"
+
+def _cache_entries(cache_dir):
+    """Listar (ruta, tamaño, mtime) de las entradas de la caché."""
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for name in os.listdir(cache_dir):
+        if not name.endswith(CACHE_EXTENSION):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+def _is_current_version(path):
+    name = os.path.basename(path)[:-len(CACHE_EXTENSION)]
+    return name.endswith(cache_version())
+
+def evict_cache(cache_dir, max_bytes):
+    """
+    Eliminar entradas obsoletas y las menos usadas hasta respetar el límite de tamaño.
+
+    Args:
+        cache_dir (str): Directorio de la caché
+        max_bytes (int): Tamaño máximo total permitido
+
+    Returns:
+        int: Cantidad de entradas eliminadas
+    """
+    removed = 0
+    entries = []
+    for path, size, mtime in _cache_entries(cache_dir):
+        if _is_current_version(path):
+            entries.append((path, size, mtime))
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+
+    total = sum(size for _, size, _ in entries)
+    for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+    return removed
+
+def load_cached_sales(cache_dir, key):
+    """
+    Leer un mes procesado desde la caché.
+
+    Returns:
+        DataFrame: Datos procesados, o None si no existe la entrada o no se puede leer
+    """
+    path = os.path.join(cache_dir, key + CACHE_EXTENSION)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        print(f"Advertencia: no se pudo leer la caché {path}: {e}")
+        return None
+    # Actualizar la fecha de uso para la política de desalojo
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return df
+
+def store_cached_sales(cache_dir, key, df, max_bytes=None):
+    """
+    Guardar un mes procesado en la caché y aplicar la política de desalojo.
+
+    Returns:
+        bool: True si se guardó la entrada
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + CACHE_EXTENSION)
+    tmp_path = path + ".tmp"
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Advertencia: no se pudo guardar la caché de ventas: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    evict_cache(cache_dir, get_cache_max_bytes() if max_bytes is None else max_bytes)
+    return True
+
+def load_processed_sales(zip_file_path, cache_dir=None, sheet_name="hoja1", engine=None):
+    """
+    Obtener los datos SIAT procesados (con columnas del CUF) de un ZIP mensual,
+    usando la caché si el ZIP no cambió desde la última lectura.
+
+    Args:
+        zip_file_path (str): Ruta al archivo ZIP del SIAT
+        cache_dir (str, optional): Directorio de caché; None desactiva la caché
+        sheet_name (str): Nombre de la hoja a procesar
+        engine (str, optional): Motor de Excel (ver data_ingestion.resolve_excel_engine)
+
+    Returns:
+        DataFrame: Datos procesados, o None si ocurre un error al leer el ZIP
+    """
+    key = None
+    engine = resolve_excel_engine(engine)
+    if cache_dir:
+        key = cache_key(zip_file_path, sheet_name, engine)
+        cached = load_cached_sales(cache_dir, key)
+        if cached is not None:
+            print(f"Usando datos en caché ({len(cached)} registros).")
+            return cached
+
+    sales_data = process_zipped_sales_excel(zip_file_path, sheet_name=sheet_name, engine=engine)
+    if sales_data is None or sales_data.empty:
+        return sales_data
+
+    df_processed = process_sales_data(sales_data)
+    if key is not None:
+        store_cached_sales(cache_dir, key, df_processed)
+    return df_processed
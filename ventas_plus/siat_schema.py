@@ -0,0 +1,162 @@
+"""
+Tipado de las columnas del SIAT a partir de ``ventas_estandar_siatt.json``.
+
+El estándar define el tipo de cada columna del registro de ventas. En lugar de
+dejar que pandas adivine los tipos (los NIT y números de factura llegaban como
+float y los códigos numéricos perdían sus ceros a la izquierda), el JSON se
+compila en un plan que se aplica al leer el Excel:
+
+- alfanumérico / carácter: se leen como texto y se limpian los espacios.
+- entero: enteros (Int64, admite vacíos).
+- numérico: importes redondeados a los decimales declarados.
+- fecha: se valida una sola vez con el formato DD/MM/AAAA y se guarda como
+  texto canónico ``DD/MM/YYYY``, que es el formato con el que el sistema de
+  inventarios devuelve ``fechaFac`` y con el que se importa a contabilidad.
+
+Los nombres del JSON se comparan sin tildes ni símbolos de ordinal, porque el
+Excel del SIAT usa variantes como ``Nº DE LA FACTURA`` o ``CODIGO DE AUTORIZACIÓN``.
+"""
+import functools
+import hashlib
+import json
+import os
+import unicodedata
+import pandas as pd
+
+SIAT_SCHEMA_VERSION = "1"
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ventas_estandar_siatt.json")
+DATE_FORMAT = "%d/%m/%Y"
+
+TEXT_TYPES = ('alfanumérico', 'carácter')
+INTEGER_TYPE = 'entero'
+NUMERIC_TYPE = 'numérico'
+DATE_TYPE = 'fecha'
+
+def normalize_column_name(name):
+    """
+    Normalizar un nombre de columna para compararlo con el estándar.
+
+    Examples:
+        >>> normalize_column_name("N° DE LA FACTURA") == normalize_column_name("Nº DE LA FACTURA")    # True
+        >>> normalize_column_name("CÓDIGO DE AUTORIZACIÓN") == "CODIGO DE AUTORIZACION"              # True
+    """
+    text = str(name).replace('º', '').replace('°', '')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.upper().split())
+
+@functools.lru_cache(maxsize=None)
+def _read_schema_file(schema_path):
+    with open(schema_path, 'rb') as f:
+        content = f.read()
+    return content, json.loads(content.decode('utf-8'))
+
+def load_siat_schema(schema_path=SCHEMA_FILE):
+    """
+    Leer el estándar de columnas del SIAT.
+
+    Args:
+        schema_path (str): Ruta al JSON del estándar
+
+    Returns:
+        list: Definiciones de columna, o lista vacía si no se puede leer
+    """
+    try:
+        return _read_schema_file(schema_path)[1]
+    except Exception as e:
+        print(f"Advertencia: no se pudo leer el estándar SIAT {schema_path}: {e}")
+        return []
+
+def schema_fingerprint(schema_path=SCHEMA_FILE):
+    """Huella del estándar y de la lógica de tipado, usada en la clave de caché."""
+    digest = hashlib.sha256(SIAT_SCHEMA_VERSION.encode())
+    try:
+        digest.update(_read_schema_file(schema_path)[0])
+    except Exception:
+        pass
+    return digest.hexdigest()[:12]
+
+def build_column_plan(columns, schema=None):
+    """
+    Asociar cada columna del Excel con su definición en el estándar.
+
+    Args:
+        columns (iterable): Encabezados leídos del Excel
+        schema (list, optional): Definiciones del estándar; por defecto el JSON del repositorio
+
+    Returns:
+        dict: Encabezado del Excel -> definición del estándar (solo columnas conocidas)
+    """
+    if schema is None:
+        schema = load_siat_schema()
+    by_name = {normalize_column_name(col['nombre_columna']): col for col in schema}
+    plan = {}
+    for column in columns:
+        spec = by_name.get(normalize_column_name(column))
+        if spec is not None:
+            plan[column] = spec
+    return plan
+
+def read_dtypes(plan, columns=()):
+    """
+    Tipos a fijar durante la lectura del Excel.
+
+    Las columnas de texto se leen como ``str`` para que el parser no las
+    convierta a número (perdiendo ceros a la izquierda o pasando a float).
+    Las columnas de ``columns`` que no están en el estándar también se leen
+    como ``str``, así cada bloque de una lectura por partes tiene los mismos
+    tipos en lugar de inferirlos por separado.
+    """
+    dtypes = {column: str for column in columns if column not in plan}
+    dtypes.update({column: str for column, spec in plan.items() if spec.get('tipo_dato') in TEXT_TYPES})
+    return dtypes
+
+def _clean_text(series):
+    text = series.astype('str').str.strip()
+    return text.where(series.notna() & (text != ''), None)
+
+def _to_integer(series):
+    values = pd.to_numeric(series, errors='coerce')
+    if (values.dropna() % 1 == 0).all():
+        return values.astype('Int64')
+    return values
+
+def _to_amount(series, decimals):
+    return pd.to_numeric(series, errors='coerce').round(decimals)
+
+def _to_date_text(series):
+    # Acepta texto DD/MM/AAAA y también celdas que Excel guardó como fecha
+    parsed = pd.to_datetime(series, format=DATE_FORMAT, errors='coerce')
+    text = parsed.dt.strftime(DATE_FORMAT)
+    # Los valores que no son fechas válidas se conservan tal cual para reportarlos
+    return text.where(parsed.notna(), series.astype(object))
+
+def apply_siat_schema(df, plan=None):
+    """
+    Aplicar el tipado del estándar a un DataFrame leído del Excel del SIAT.
+
+    Args:
+        df (DataFrame): Datos crudos (o un bloque) del Excel
+        plan (dict, optional): Resultado de build_column_plan; se calcula si no se indica
+
+    Returns:
+        DataFrame: Datos con las columnas del estándar tipadas
+    """
+    if plan is None:
+        plan = build_column_plan(df.columns)
+    if not plan:
+        return df
+    df = df.copy()
+    for column, spec in plan.items():
+        if column not in df.columns:
+            continue
+        tipo = spec.get('tipo_dato')
+        if tipo in TEXT_TYPES:
+            df[column] = _clean_text(df[column])
+        elif tipo == INTEGER_TYPE:
+            df[column] = _to_integer(df[column])
+        elif tipo == NUMERIC_TYPE:
+            df[column] = _to_amount(df[column], int(spec.get('decimales', 2)))
+        elif tipo == DATE_TYPE:
+            df[column] = _to_date_text(df[column])
+    return df
@@ -0,0 +1,103 @@
+"""
+Importación de un periodo mediante una tabla de staging.
+
+La importación borraba el periodo, confirmaba y luego insertaba; un error en
+medio dejaba el mes vacío y, mientras corría la inserción, los lectores veían
+datos parciales. Aquí las filas se cargan primero en una copia vacía de la
+tabla (``CREATE TABLE ... LIKE``), se validan allí la cantidad de filas y los
+totales, y recién entonces el periodo se reemplaza en una sola transacción
+corta (DELETE del periodo + INSERT ... SELECT desde staging).
+"""
+
+# Diferencia máxima aceptada entre los totales esperados y los de staging
+TOTAL_TOLERANCE = 0.01
+
+def staging_table_name(table, year, month):
+    """Nombre de la tabla de staging de un periodo."""
+    return f"{table}_staging_{int(year)}_{int(month):02d}"
+
+def prepare_staging(conn, table, staging):
+    """Crear (o recrear vacía) la tabla de staging con la estructura e índices de ``table``."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(f"CREATE TABLE {staging} LIKE {table}")
+    finally:
+        cursor.close()
+
+def drop_staging(conn, staging):
+    """Eliminar la tabla de staging."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    finally:
+        cursor.close()
+
+def staging_summary(conn, staging, sum_columns):
+    """
+    Cantidad de filas y totales de la tabla de staging.
+
+    Returns:
+        dict: 'filas' y un total (float) por cada columna de ``sum_columns``
+    """
+    sums = "".join(f", COALESCE(SUM({col}), 0)" for col in sum_columns)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*){sums} FROM {staging}")
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    summary = {'filas': int(row[0])}
+    summary.update({col: float(value) for col, value in zip(sum_columns, row[1:])})
+    return summary
+
+def validate_staging(summary, expected):
+    """
+    Comparar el resumen de staging con el esperado.
+
+    Args:
+        summary (dict): Resultado de staging_summary
+        expected (dict): Mismas claves, calculadas de las filas a cargar
+
+    Returns:
+        list: Descripción de cada diferencia (vacía si todo coincide)
+    """
+    problems = []
+    if summary['filas'] != expected['filas']:
+        problems.append(f"filas: staging {summary['filas']:,}, esperadas {expected['filas']:,}")
+    for col, value in expected.items():
+        if col != 'filas' and abs(summary.get(col, 0.0) - value) > TOTAL_TOLERANCE:
+            problems.append(f"{col}: staging {summary.get(col, 0.0):,.2f}, esperado {value:,.2f}")
+    return problems
+
+def swap_period(conn, table, staging, columns, date_column, start, end):
+    """
+    Reemplazar el periodo de ``table`` por el contenido de staging en una
+    sola transacción.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        staging (str): Tabla de staging ya validada
+        columns (list): Columnas a copiar
+        date_column (str): Columna de fecha que define el periodo
+        start (str): Fecha inicial (inclusive)
+        end (str): Fecha final (inclusive)
+
+    Returns:
+        tuple: (filas eliminadas, filas insertadas)
+    """
+    column_list = ", ".join(columns)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM {table} WHERE {date_column} >= %s AND {date_column} <= %s", (start, end))
+        deleted = cursor.rowcount
+        cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging}")
+        inserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return deleted, inserted
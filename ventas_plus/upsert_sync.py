@@ -0,0 +1,212 @@
+"""
+Sincronización por diferencias de un periodo en una tabla con clave única.
+
+Reimportar un mes borraba todo el periodo y volvía a insertar cada fila
+aunque solo cambiaran unas pocas facturas. Aquí cada fila se reduce a un hash
+de sus columnas; los hashes de las filas existentes se calculan a partir de
+una sola consulta del periodo y se comparan por la clave única
+(``authorization_code``): solo se insertan las claves nuevas, se actualizan
+las que cambiaron y se eliminan las que ya no están. Las claves que no están
+en el periodo se buscan además en toda la tabla: si la factura ya existe con
+otra fecha, se actualiza en lugar de insertarse de nuevo.
+"""
+import hashlib
+import math
+from datetime import date, datetime
+from decimal import Decimal
+import pandas as pd
+from ventas_plus.bulk_loader import DEFAULT_BATCH_SIZE, bulk_insert, dataframe_rows
+from ventas_plus.db_utils import fetch_dataframe
+
+SYNC_KEY = 'authorization_code'
+_SEPARATOR = "\x1f"
+
+def _normalize(value):
+    """
+    Texto canónico de un valor para el hash.
+
+    Los importes llegan como float desde el archivo y como DECIMAL desde la
+    base; se comparan redondeados a centavos (y sin decimales si son enteros,
+    para que 12 y 12.0 coincidan).
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (float, Decimal)):
+        if isinstance(value, float) and math.isnan(value):
+            return "\\N"
+        rounded = round(float(value), 2)
+        return str(int(rounded)) if rounded.is_integer() else f"{rounded:.2f}"
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return _normalize(value.item())
+    return str(value)
+
+def row_hashes(df, columns):
+    """
+    Hash MD5 de cada fila sobre ``columns``.
+
+    Args:
+        df (DataFrame): Filas a resumir
+        columns (list): Columnas que entran en el hash, en orden
+
+    Returns:
+        list: Hash hexadecimal por fila, en el orden de ``df``
+    """
+    return [
+        hashlib.md5(_SEPARATOR.join(_normalize(value) for value in row).encode("utf-8")).hexdigest()
+        for row in df[columns].to_numpy(dtype=object)
+    ]
+
+def plan_sync(new_df, existing_df, columns, key=SYNC_KEY):
+    """
+    Comparar las filas nuevas con las existentes por clave y hash.
+
+    Args:
+        new_df (DataFrame): Filas a dejar en la tabla (incluye ``key``)
+        existing_df (DataFrame): Filas actuales del periodo (incluye ``key`` y ``columns``)
+        columns (list): Columnas comparadas
+        key (str): Columna de clave única
+
+    Returns:
+        dict: 'insert' y 'update' (DataFrames de new_df), 'delete' (lista de
+        claves) y 'unchanged' (cantidad de filas iguales)
+    """
+    new_keys = new_df[key].astype(str).to_numpy()
+    existing = dict(zip(existing_df[key].astype(str), row_hashes(existing_df, columns)))
+    new_hashes = row_hashes(new_df, columns)
+
+    is_new = [code not in existing for code in new_keys]
+    is_changed = [code in existing and existing[code] != digest for code, digest in zip(new_keys, new_hashes)]
+    kept = set(new_keys)
+    return {
+        'insert': new_df[is_new],
+        'update': new_df[is_changed],
+        'delete': [code for code in existing if code not in kept],
+        'unchanged': len(new_df) - sum(is_new) - sum(is_changed),
+    }
+
+def apply_sync(conn, table, columns, plan, key=SYNC_KEY, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Aplicar un plan de sincronización en una sola transacción.
+
+    Primero se eliminan las claves que desaparecieron, luego se actualizan las
+    filas cambiadas y al final se insertan las nuevas por lotes; la
+    confirmación final de bulk_insert confirma todo el conjunto. Si algo
+    falla, incluida la inserción, se revierte la transacción completa.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        columns (list): Columnas a escribir (incluye ``key``)
+        plan (dict): Resultado de plan_sync
+        key (str): Columna de clave única
+        batch_size (int): Claves por DELETE y filas por INSERT
+
+    Returns:
+        dict: Filas insertadas, actualizadas y eliminadas
+    """
+    try:
+        cursor = conn.cursor()
+        try:
+            deleted = 0
+            codes = plan['delete']
+            for start in range(0, len(codes), batch_size):
+                chunk = codes[start:start + batch_size]
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {key} IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+                deleted += cursor.rowcount
+
+            set_columns = [col for col in columns if col != key]
+            updates = len(plan['update'])
+            if updates:
+                cursor.executemany(
+                    f"UPDATE {table} SET {', '.join(f'{col} = %s' for col in set_columns)} WHERE {key} = %s",
+                    list(dataframe_rows(plan['update'], set_columns + [key]))
+                )
+        finally:
+            cursor.close()
+
+        inserted = bulk_insert(
+            conn, table, columns, dataframe_rows(plan['insert'], columns),
+            batch_size=batch_size, commit_mode="run", total=len(plan['insert'])
+        )
+    except Exception:
+        conn.rollback()
+        raise
+    return {'insertadas': inserted, 'actualizadas': updates, 'eliminadas': deleted}
+
+def fetch_rows_by_key(conn, table, columns, codes, key=SYNC_KEY, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Leer de toda la tabla (sin filtro de fecha) las filas con las claves dadas.
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        columns (list): Columnas a leer (incluye ``key``)
+        codes (list): Claves a buscar
+        key (str): Columna de clave única
+        batch_size (int): Claves por consulta
+
+    Returns:
+        DataFrame: Filas encontradas, con ``columns``
+    """
+    parts = [
+        fetch_dataframe(
+            conn,
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {key} IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk)
+        ).reindex(columns=columns)
+        for chunk in (codes[start:start + batch_size] for start in range(0, len(codes), batch_size))
+    ]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+def sync_period(conn, table, new_df, columns, date_column, start, end, key=SYNC_KEY, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Sincronizar un periodo: leer las filas existentes en una consulta,
+    calcular el plan y aplicarlo.
+
+    Las claves nuevas que no están en el periodo se buscan en toda la tabla;
+    las que ya existen con una fecha fuera del periodo se tratan como
+    actualizaciones (no se insertan de nuevo ni se eliminan).
+
+    Args:
+        conn (MySQLConnection): Conexión abierta
+        table (str): Tabla destino
+        new_df (DataFrame): Filas del periodo ya preparadas para insertar
+        columns (list): Columnas a comparar y escribir (incluye ``key``)
+        date_column (str): Columna de fecha que define el periodo
+        start (str): Fecha inicial (inclusive)
+        end (str): Fecha final (inclusive)
+        key (str): Columna de clave única
+        batch_size (int): Tamaño de lote para DELETE e INSERT
+
+    Returns:
+        dict: Resultado de apply_sync más 'sin_cambios'
+    """
+    existing_df = fetch_dataframe(
+        conn,
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {date_column} >= %s AND {date_column} <= %s",
+        (start, end)
+    ).reindex(columns=columns)
+    in_period = set(existing_df[key].astype(str))
+    outside = [code for code in new_df[key].astype(str).unique() if code not in in_period]
+    moved = fetch_rows_by_key(conn, table, columns, outside, key, batch_size)
+    if len(moved):
+        print(f"   Facturas registradas con fecha fuera del periodo: {len(moved):,} (se actualizan)")
+        existing_df = pd.concat([existing_df, moved], ignore_index=True)
+    plan = plan_sync(new_df, existing_df, columns, key)
+    print(
+        f"   Nuevas: {len(plan['insert']):,} | Cambiadas: {len(plan['update']):,} | "
+        f"Eliminadas: {len(plan['delete']):,} | Sin cambios: {plan['unchanged']:,}"
+    )
+    result = apply_sync(conn, table, columns, plan, key, batch_size)
+    result['sin_cambios'] = plan['unchanged']
+    return result
@@ -2,100 +2,277 @@
 Módulo para el procesamiento y análisis de los datos de ventas.
 """
 import pandas as pd
+from ventas_plus.branch_rules import BRANCH_RULES, SECTOR_ALQUILERES, compile_branch_rules
+from ventas_plus.cuf_decoder import decode_cuf_series, report_cuf_errors
 
 def process_sales_data(sales_data):
+    """
+    Procesar y limpiar los datos de ventas.
+    
+    Args:
+        sales_data (DataFrame): Datos crudos de ventas
+        
+    Returns:
+        DataFrame: Datos procesados
+    """
+    # Hacer una copia para no alterar el original
     df = sales_data.copy()
+    
+    # Convertir valores numéricos
     numeric_columns = ['IMPORTE TOTAL DE LA VENTA'] if 'IMPORTE TOTAL DE LA VENTA' in df.columns else []
     for col in numeric_columns:
         df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Eliminar filas completamente vacías
     df = df.dropna(how='all')
+    
+    # Crear nuevas columnas para información extraída del CODIGO DE AUTORIZACIÓN
     if 'CODIGO DE AUTORIZACIÓN' in df.columns:
-        df['SUCURSAL'] = ''
-        df['MODALIDAD'] = ''
-        df['TIPO EMISION'] = ''
-        df['TIPO FACTURA'] = ''
-        df['SECTOR'] = ''
-        df['NUM FACTURA'] = ''
-        df['PV'] = ''
-        df['CODIGO AUTOVERIFICADOR'] = ''
-        for index, row in df.iterrows():
-            try:
-                codigo = row['CODIGO DE AUTORIZACIÓN']
-                if isinstance(codigo, str) and len(codigo) >= 42:
-                    hexadecimal = codigo[:42]
-                    decimal = int(hexadecimal, 16)
-                    cadena = str(decimal)
-                    if len(cadena) > 27:
-                        cadena = cadena[27:]
-                        if len(cadena) >= 24:
-                            sucursal = cadena[:4]
-                            modalidad = cadena[4:5] if len(cadena) > 4 else ''
-                            tipo_emision = cadena[5:6] if len(cadena) > 5 else ''
-                            tipo_factura = cadena[6:7] if len(cadena) > 6 else ''
-                            tipo_documento_sector = cadena[7:9] if len(cadena) > 8 else ''
-                            num_factura = cadena[9:19] if len(cadena) > 18 else ''
-                            pv = cadena[19:23] if len(cadena) > 22 else ''
-                            codigo_autoverificador = cadena[23:24] if len(cadena) > 23 else ''
-                            df.at[index, 'SUCURSAL'] = sucursal
-                            df.at[index, 'MODALIDAD'] = modalidad
-                            df.at[index, 'TIPO EMISION'] = tipo_emision
-                            df.at[index, 'TIPO FACTURA'] = tipo_factura
-                            df.at[index, 'SECTOR'] = tipo_documento_sector
-                            df.at[index, 'NUM FACTURA'] = num_factura
-                            df.at[index, 'PV'] = pv
-                            df.at[index, 'CODIGO AUTOVERIFICADOR'] = codigo_autoverificador
-            except Exception as e:
-                print(f"Error al procesar el código de autorización en la fila {index}: {str(e)}")
-                continue
+        # Decodificar toda la columna de una vez y reportar los códigos inválidos en bloque
+        cuf_columns, cuf_errors = decode_cuf_series(df['CODIGO DE AUTORIZACIÓN'])
+        for col in cuf_columns.columns:
+            df[col] = cuf_columns[col]
+        report_cuf_errors(cuf_errors)
+    
     return df
 
 def analyze_sales_data_basic(df):
+    """
+    Realizar un análisis básico de los datos de ventas.
+    
+    Args:
+        df (DataFrame): Datos procesados de ventas
+        
+    Returns:
+        dict: Estadísticas básicas de los datos
+    """
     results = {
         "total_records": len(df),
         "columns": list(df.columns),
     }
+    
+    # Si existen las columnas necesarias, agregar estadísticas
     if 'IMPORTE TOTAL DE LA VENTA' in df.columns:
         results['total_ventas'] = df['IMPORTE TOTAL DE LA VENTA'].sum()
         results['promedio_venta'] = df['IMPORTE TOTAL DE LA VENTA'].mean()
         results['venta_maxima'] = df['IMPORTE TOTAL DE LA VENTA'].max()
+    
     if 'ESTADO' in df.columns:
         results['conteo_estados'] = df['ESTADO'].value_counts().to_dict()
+    
+    # Añadir análisis de las nuevas columnas extraídas del código de autorización
     if 'SUCURSAL' in df.columns:
         results['conteo_sucursales'] = df['SUCURSAL'].value_counts().to_dict()
+    
     if 'TIPO EMISION' in df.columns:
         results['conteo_tipo_emision'] = df['TIPO EMISION'].value_counts().to_dict()
+        
     if 'SECTOR' in df.columns:
         results['conteo_sector'] = df['SECTOR'].value_counts().to_dict()
+    
+    return results
+
+def summarize_by_branch_sector_state(df):
+    """
+    Cantidad de facturas e importe total por (SUCURSAL, SECTOR, ESTADO) en un solo recorrido.
+
+    Args:
+        df (DataFrame): Datos procesados de ventas
+
+    Returns:
+        DataFrame: Índice (SUCURSAL, SECTOR, ESTADO) con columnas 'cantidad' y 'total'
+    """
+    grouped = df.groupby(['SUCURSAL', 'SECTOR', 'ESTADO'], dropna=False, sort=False)['IMPORTE TOTAL DE LA VENTA']
+    return pd.DataFrame({'cantidad': grouped.size(), 'total': grouped.sum()})
+
+def _select_group(resumen, sectores=None, excluir_sectores=None, estado=None):
+    """Sumar cantidad e importe de las combinaciones del resumen que cumplen los filtros."""
+    mask = pd.Series(True, index=resumen.index)
+    if sectores is not None:
+        mask &= resumen.index.get_level_values('SECTOR').isin(sectores)
+    if excluir_sectores is not None:
+        mask &= ~resumen.index.get_level_values('SECTOR').isin(excluir_sectores)
+    if estado is not None:
+        mask &= resumen.index.get_level_values('ESTADO') == estado
+    selected = resumen[mask]
+    return {'cantidad': int(selected['cantidad'].sum()), 'total': selected['total'].sum()}
+
+def summarize_branches(resumen, rules=BRANCH_RULES):
+    """
+    Cifras por sucursal del reporte a partir del resumen por (SUCURSAL, SECTOR, ESTADO).
+
+    Las reglas se compilan en una tabla de búsqueda que se cruza con el
+    resumen (que tiene una fila por combinación, no por factura), así que
+    agregar sucursales no agrega recorridos sobre los datos.
+
+    Args:
+        resumen (DataFrame): Resultado de summarize_by_branch_sector_state
+        rules (list): Reglas de sucursal (ver branch_rules.BRANCH_RULES)
+
+    Returns:
+        dict: Clave de sucursal -> total_facturado, cantidades de válidas por
+        campo, cantidad_anuladas y cantidad_total
+    """
+    lookup = compile_branch_rules(rules)
+    grupos = resumen.reset_index().merge(lookup.reset_index(), on=['SUCURSAL', 'SECTOR'], how='inner')
+    validas = grupos[grupos['ESTADO'] == 'VALIDA']
+    anuladas = grupos[grupos['ESTADO'] == 'ANULADA']
+    cantidad_validas = validas.groupby(['clave', 'campo'])['cantidad'].sum()
+    total_validas = validas.groupby('clave')['total'].sum()
+    cantidad_anuladas = anuladas.groupby('clave')['cantidad'].sum()
+
+    results = {}
+    for rule in rules:
+        clave = rule['clave']
+        entry = {'total_facturado': total_validas.get(clave, 0.0)}
+        validas_total = 0
+        for campo in dict.fromkeys(campo for campo, _ in rule['sectores'].values()):
+            entry[campo] = int(cantidad_validas.get((clave, campo), 0))
+            validas_total += entry[campo]
+        entry['cantidad_anuladas'] = int(cantidad_anuladas.get(clave, 0))
+        entry['cantidad_total'] = validas_total + entry['cantidad_anuladas']
+        results[clave] = entry
     return results
 
 def analyze_sales_data_detailed(df):
-    # Puedes copiar aquí la función completa si lo deseas
-    pass
+    """
+    Realizar un análisis detallado de datos de ventas por sucursal y sector.
+    
+    Args:
+        df (DataFrame): Datos procesados de ventas
+        
+    Returns:
+        dict: Estadísticas detalladas de los datos por sucursal y sector
+    """
+    results = {}
+    
+    # Verificar que existen las columnas necesarias
+    required_columns = ['ESTADO', 'SECTOR', 'SUCURSAL', 'IMPORTE TOTAL DE LA VENTA']
+    for col in required_columns:
+        if col not in df.columns:
+            print(f"Advertencia: No se encontró la columna {col}, análisis detallado limitado")
+            return {"error": f"Falta la columna {col} para el análisis detallado"}
+    
+    # Un solo recorrido: cantidad e importe por (SUCURSAL, SECTOR, ESTADO).
+    # Todas las cifras siguientes se leen de esta tabla pequeña.
+    resumen = summarize_by_branch_sector_state(df)
+    
+    # ANÁLISIS DE ALQUILERES (SECTOR 02)
+    alq_validas = _select_group(resumen, sectores=[SECTOR_ALQUILERES], estado='VALIDA')
+    alq_anuladas = _select_group(resumen, sectores=[SECTOR_ALQUILERES], estado='ANULADA')
+    
+    # Total facturado en alquileres
+    total_facturado_alquiler = alq_validas['total']
+    results['alquileres'] = {
+        'total_facturado': total_facturado_alquiler,
+        'cantidad_validas': alq_validas['cantidad'],
+        'cantidad_anuladas': alq_anuladas['cantidad'],
+        'cantidad_total': _select_group(resumen, sectores=[SECTOR_ALQUILERES])['cantidad']
+    }
+    
+    # ANÁLISIS GENERAL
+    # Facturas válidas y total facturado
+    validas = _select_group(resumen, estado='VALIDA')
+    total_venta_valida = validas['total']
+    
+    results['general'] = {
+        'total_facturado_valida': total_venta_valida,
+        'total_facturado_sin_alquiler': total_venta_valida - total_facturado_alquiler,
+        'total_facturas': len(df),
+        'cantidad_validas': validas['cantidad'],
+        'cantidad_anuladas': _select_group(resumen, estado='ANULADA')['cantidad']
+    }
+    
+    # ANÁLISIS POR SUCURSAL Y SECTOR (según las reglas de branch_rules)
+    results.update(summarize_branches(resumen))
+    
+    # RESUMEN TOTAL DE FACTURAS
+    total_cantidad_facturas = sum(
+        results[rule['clave']]['cantidad_total'] for rule in BRANCH_RULES
+    ) + results['alquileres']['cantidad_total']
+    results['total_facturas_desglosado'] = total_cantidad_facturas
+    
+    return results
+
+def _merge_additive(total, partial):
+    """Sumar recursivamente dos diccionarios de resultados con valores numéricos."""
+    if total is None:
+        total = {}
+    for key, value in partial.items():
+        if isinstance(value, dict):
+            total[key] = _merge_additive(total.get(key), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+def _sort_counts(counts):
+    """Ordenar un conteo de mayor a menor, como value_counts()."""
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+def analyze_sales_chunks(chunks):
+    """
+    Realizar el análisis básico y detallado consumiendo los datos por bloques.
+
+    Cada bloque se resume y se descarta, de modo que la memoria usada depende
+    del tamaño del bloque y no del volumen del mes. Todas las cifras del
+    análisis son sumas o conteos, por lo que los resultados parciales se
+    combinan sumándolos.
+
+    Args:
+        chunks (iterable): Bloques de datos ya procesados con process_sales_data
+
+    Returns:
+        tuple: (resultados de analyze_sales_data_basic, resultados de
+        analyze_sales_data_detailed) equivalentes a analizar el DataFrame completo
+    """
+    basic = None
+    detailed = None
+    importe_count = 0
+    count_keys = ('conteo_estados', 'conteo_sucursales', 'conteo_tipo_emision', 'conteo_sector')
+
+    for chunk in chunks:
+        partial = analyze_sales_data_basic(chunk)
+        if basic is None:
+            basic = {'total_records': 0, 'columns': partial['columns']}
+        basic['total_records'] += partial['total_records']
+        if 'total_ventas' in partial:
+            importe_count += int(chunk['IMPORTE TOTAL DE LA VENTA'].count())
+            basic['total_ventas'] = basic.get('total_ventas', 0) + partial['total_ventas']
+            if not pd.isna(partial['venta_maxima']):
+                basic['venta_maxima'] = max(basic.get('venta_maxima', partial['venta_maxima']), partial['venta_maxima'])
+        for key in count_keys:
+            if key in partial:
+                basic[key] = _merge_additive(basic.get(key), partial[key])
+
+        if detailed is None or 'error' not in detailed:
+            partial_detailed = analyze_sales_data_detailed(chunk)
+            if 'error' in partial_detailed:
+                detailed = partial_detailed
+            else:
+                detailed = _merge_additive(detailed, partial_detailed)
+
+    if basic is None:
+        return None, None
+    if 'total_ventas' in basic:
+        basic['promedio_venta'] = basic['total_ventas'] / importe_count if importe_count else float('nan')
+        basic.setdefault('venta_maxima', float('nan'))
+    for key in count_keys:
+        if key in basic:
+            basic[key] = _sort_counts(basic[key])
+    return basic, detailed
 
 def get_siat_sales_totals(df):
     """
     Calcula los totales de ventas SIAT por sucursal y general, usando la misma lógica que el reporte principal:
-    - CENTRAL: suma sector 01 y 35
-    - SANTA CRUZ y POTOSI: solo sector 01
+    - Cada sucursal suma sus sectores según branch_rules (CENTRAL: 01 y 35; SANTA CRUZ y POTOSI: 01)
     - GENERAL: suma todas las ventas válidas excepto sector 02 (alquileres)
     Retorna: dict con claves por sucursal y 'GENERAL'.
     """
-    sucursales = {
-        'CENTRAL': '0000',
-        'SANTA CRUZ': '0005',
-        'POTOSI': '0006',
-    }
+    resumen = summarize_by_branch_sector_state(df)
+    por_sucursal = summarize_branches(resumen)
     totales = {}
-    # CENTRAL: sector 01 y 35
-    cod = sucursales['CENTRAL']
-    total_central = df[(df['SUCURSAL'] == cod) & (df['ESTADO'] == 'VALIDA') & (df['SECTOR'].isin(['01', '35']))]['IMPORTE TOTAL DE LA VENTA'].sum()
-    totales['CENTRAL'] = float(total_central)
-    # SANTA CRUZ y POTOSI: solo sector 01
-    for nombre in ['SANTA CRUZ', 'POTOSI']:
-        cod = sucursales[nombre]
-        total = df[(df['SUCURSAL'] == cod) & (df['ESTADO'] == 'VALIDA') & (df['SECTOR'] == '01')]['IMPORTE TOTAL DE LA VENTA'].sum()
-        totales[nombre] = float(total)
+    for rule in BRANCH_RULES:
+        totales[rule['nombre']] = float(por_sucursal[rule['clave']]['total_facturado'])
     # GENERAL: todas las ventas válidas excepto sector 02
-    total_general = df[(df['ESTADO'] == 'VALIDA') & (df['SECTOR'] != '02')]['IMPORTE TOTAL DE LA VENTA'].sum()
-    totales['GENERAL'] = float(total_general)
+    totales['GENERAL'] = float(_select_group(resumen, excluir_sectores=[SECTOR_ALQUILERES], estado='VALIDA')['total'])
     return totales